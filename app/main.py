@@ -5,14 +5,61 @@ This is the entry point for the Smart Plant Growth Assistant API.
 It configures the FastAPI app, CORS, middleware, and includes all routes.
 """
 
+import time
+
+_import_started = time.perf_counter()
+
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
-import os
 from app.services.plant import router as plant_router
-from fastapi.staticfiles import StaticFiles
+from app.services.ppt_service import ppt_service
+from app.routes.gemini import gemini_service
+from app.routes.notebooklm import notebooklm_service
+from app.utils.admin import ADMIN_TOKEN
+from app.utils.loop_monitor import loop_monitor, LOOP_MONITOR
+from app.utils.memory import memory_tracer, TRACEMALLOC
+from app.utils.profiling import ProfilingMiddleware, PROFILE_URL_HEADER
+from app.utils.shared_cache import shared_cache
+from app.utils.startup import startup_state
+
+startup_state.import_seconds = time.perf_counter() - _import_started
+
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Application lifespan: warm up, serve, then clean up.
+    
+    Each warmup step is timed, and the readiness flag only flips once
+    all of them have run.
+    """
+    if TRACEMALLOC:
+        memory_tracer.start()
+    await startup_state.run_step("http_client", gemini_service.warmup)
+    await startup_state.run_step("ppt_template", ppt_service.warmup)
+    await startup_state.run_step("shared_cache", shared_cache.warmup)
+    startup_state.ready = True
+    if LOOP_MONITOR:
+        loop_monitor.start()
+    
+    if gemini_service.cassette_mode != "off":
+        mode = f"{gemini_service.cassette_mode} ({gemini_service.cassettes.directory})"
+    else:
+        mode = "live" if gemini_service.api_key else "demo (mock data)"
+    timings = ", ".join(f"{name} {seconds:.3f}s" for name, seconds in startup_state.warmup_seconds.items())
+    print(f"🌱 PlantCare API ready: imports {startup_state.import_seconds:.3f}s, warmup {timings}; Gemini {mode}")
+    
+    yield
+    
+    startup_state.ready = False
+    await loop_monitor.stop()
+    await gemini_service.aclose()
+    await notebooklm_service.aclose()
+    print("🌱 PlantCare API shut down")
 
 
 # Create FastAPI application instance
@@ -39,7 +86,8 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
-    openapi_url="/openapi.json"
+    openapi_url="/openapi.json",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -49,8 +97,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allow all HTTP methods
     allow_headers=["*"],  # Allow all headers
+    expose_headers=["Location", "ETag", "Last-Modified", PROFILE_URL_HEADER],  # Readable by the frontend
 )
 
+# Per-request profiling for admins; not installed at all without a token
+if ADMIN_TOKEN:
+    app.add_middleware(ProfilingMiddleware)
+
 
 # Global exception handler
 @app.exception_handler(Exception)
@@ -68,12 +121,6 @@ async def global_exception_handler(request, exc):
         }
     )
 
-app.mount(
-    "/files",
-    StaticFiles(directory="generated_files"),
-    name="files"
-)
-
 # Include routers
 app.include_router(
     plant_router,
@@ -83,67 +130,7 @@ app.include_router(
 # Mount static files directory for generated PPT files
 generated_files_dir = "generated_files"
 os.makedirs(generated_files_dir, exist_ok=True)
-
-try:
-    app.mount("/files", StaticFiles(directory=generated_files_dir), name="files")
-except Exception as e:
-    print(f"Warning: Could not mount static files directory: {e}")
-
-
-# Startup event
-@app.on_event("startup")
-async def startup_event():
-    """
-    Execute on application startup.
-    
-    Perform any initialization tasks here.
-    """
-    import os
-    print("=" * 80)
-    print("🌱 PlantCare Backend - Smart Plant Growth Assistant API".center(80))
-    print("=" * 80)
-    print()
-    print("  📍 Server Status:")
-    print(f"     • Host: 0.0.0.0:8000")
-    print(f"     • Environment: {'DEBUG' if os.getenv('DEBUG', 'False').lower() == 'true' else 'PRODUCTION'}")
-    print()
-    print("  🔐 API Security:")
-    gemini_key = os.getenv("GEMINI_API_KEY", "")
-    notebooklm_key = os.getenv("NOTEBOOKLM_API_KEY", "")
-    print(f"     • Gemini API: {'✓ Configured' if gemini_key else '✗ Demo Mode (using mock data)'}")
-    print(f"     • NotebookLM: {'✓ Configured' if notebooklm_key else '✗ Demo Mode (PPT generation enabled)'}")
-    print()
-    print("  📁 Generated Files:")
-    os.makedirs("generated_files", exist_ok=True)
-    print(f"     • Location: ./generated_files/")
-    print(f"     • Access: http://localhost:8000/files/{{filename}}")
-    print()
-    print("  🌐 Frontend Integration:")
-    cors_origins = os.getenv("CORS_ORIGINS", "http://localhost:3000,http://localhost:5173")
-    print(f"     • URLs: {cors_origins}")
-    print()
-    print("  📚 Documentation:")
-    print("     • Swagger UI: http://localhost:8000/docs")
-    print("     • ReDoc: http://localhost:8000/redoc")
-    print("     • OpenAPI: http://localhost:8000/openapi.json")
-    print()
-    print("=" * 80)
-    print()
-    print("✨ API is ready! Send first request to /generate-plant-guide".center(80))
-    print("=" * 80)
-
-
-# Shutdown event
-@app.on_event("shutdown")
-async def shutdown_event():
-    """
-    Execute on application shutdown.
-    
-    Perform cleanup tasks here.
-    """
-    print("=" * 60)
-    print("🌱 Smart Plant Growth Assistant API Shutting Down...")
-    print("=" * 60)
+app.mount("/files", StaticFiles(directory=generated_files_dir), name="files")
 
 
 # Root endpoint (also available in routes, but good to have here)
@@ -166,10 +153,11 @@ async def root():
 
 if __name__ == "__main__":
     import uvicorn
+    from app.utils.config import settings
     
     # Run the application
     uvicorn.run(
-        "main:app",
+        "app.main:app",
         host=settings.host,
         port=settings.port,
         reload=settings.debug,
@@ -0,0 +1,219 @@
+"""
+Bulk Guide Pre-generation CLI
+
+Warms the guide store from a catalog of known plant requests so daytime
+traffic is served from cache instead of live Gemini calls.
+
+Usage:
+    python -m app.pregenerate catalog.csv --concurrency 4 --rate 2
+    python -m app.pregenerate catalog.jsonl --with-decks
+    python -m app.pregenerate catalog.csv --priority batch
+
+The catalog is a CSV with a header row, or JSON Lines, whose fields
+match PlantInputData; invalid or malformed records are reported and
+skipped. Completed guide ids are appended to a checkpoint file, so an
+interrupted run resumes where it stopped. Guides that came out degraded
+(fallback sections, a failed visual guide, ...) are not checkpointed, so
+the next run retries them. Runs with and without decks keep separate
+checkpoints, so a warm run does not mark decks as rendered.
+
+Without --with-decks only the Gemini responses are warmed: guides
+lacking their visual guide are not stored, so the first live request
+still renders and stores the full guide.
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import sys
+import time
+from typing import Iterator, List, Optional, Set, Tuple
+
+from pydantic import ValidationError
+
+from app.schemas.plant import PlantInputData
+from app.services.guide_store import guide_store, guide_id_for
+from app.services.guide_pipeline import guide_pipeline, is_degraded
+from app.utils.canonical import canonicalizer
+from app.utils.scheduler import BATCH, PREWARM
+
+
+class RateLimiter:
+    """
+    Spaces out calls so no more than `rate` start per second.
+    """
+
+    def __init__(self, rate: float):
+        """Initialize the limiter; a rate of 0 disables limiting."""
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_start = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        """Block until the next call is allowed to start."""
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_start - now
+            self._next_start = max(now, self._next_start) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def read_catalog(path: str) -> Iterator[Tuple[int, Optional[dict]]]:
+    """
+    Yield (line number, raw record) pairs from a CSV or JSONL catalog.
+
+    JSONL lines that are not valid JSON yield None as their record, so
+    the caller can report them and carry on.
+
+    Args:
+        path: Catalog file path; ".csv" selects CSV, anything else JSONL
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.lower().endswith(".csv"):
+            for line_no, row in enumerate(csv.DictReader(f), start=2):
+                yield line_no, row
+        else:
+            for line_no, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_no, json.loads(line)
+                except json.JSONDecodeError:
+                    yield line_no, None
+
+
+def load_checkpoint(path: str) -> Set[str]:
+    """Return the guide ids already recorded as done."""
+    if not os.path.exists(path):
+        return set()
+    with open(path, encoding="utf-8") as f:
+        return {line.strip() for line in f if line.strip()}
+
+
+async def pregenerate(
+    items: List[PlantInputData],
+    checkpoint_path: str,
+    concurrency: int,
+    rate: float,
+    with_decks: bool,
+    priority: str = PREWARM
+) -> Tuple[int, int]:
+    """
+    Generate and store guides for every catalog item not yet done.
+
+    Args:
+        items: Validated plant inputs
+        checkpoint_path: File that completed, non-degraded guide ids are
+            appended to
+        concurrency: Maximum generations in flight
+        rate: Maximum generations started per second (0 for unlimited)
+        with_decks: Whether to also render PPT decks; guides are only
+            stored when they are
+        priority: Scheduling class for upstream calls
+
+    Returns:
+        Tuple of (succeeded, failed) counts; degraded guides count as
+        failed
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    limiter = RateLimiter(rate)
+    succeeded = 0
+    failed = 0
+
+    with open(checkpoint_path, "a", encoding="utf-8") as checkpoint:
+
+        async def worker(plant_data: PlantInputData) -> None:
+            nonlocal succeeded, failed
+            guide_id = guide_id_for(plant_data)
+            async with semaphore:
+                await limiter.wait()
+                try:
+                    # Another worker or the live API may have filled it meanwhile
+                    stored = guide_store.get(guide_id)
+                    if stored is None:
+                        stored = await guide_pipeline.run(
+                            plant_data,
+                            render_visual=with_decks,
+                            priority=priority,
+                            store=with_decks
+                        )
+                except Exception as e:
+                    failed += 1
+                    print(f"Failed {plant_data.plant_name} ({guide_id}): {e}", file=sys.stderr)
+                    return
+            if is_degraded(json.loads(stored.body)["metadata"]):
+                failed += 1
+                print(f"Degraded {plant_data.plant_name} ({guide_id}), will retry next run", file=sys.stderr)
+                return
+            checkpoint.write(guide_id + "\n")
+            checkpoint.flush()
+            succeeded += 1
+
+        await asyncio.gather(*(worker(item) for item in items))
+
+    return succeeded, failed
+
+
+def main(argv: List[str] = None) -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(
+        prog="python -m app.pregenerate",
+        description="Pre-generate plant guides into the shared guide store."
+    )
+    parser.add_argument("catalog", help="CSV or JSONL file of PlantInputData records")
+    parser.add_argument("--concurrency", type=int, default=4, help="Generations in flight (default: 4)")
+    parser.add_argument("--rate", type=float, default=1.0, help="Generations started per second, 0 for unlimited (default: 1)")
+    parser.add_argument("--with-decks", action="store_true", help="Also render PPT visual guides")
+    parser.add_argument("--checkpoint", help="Progress file (default: <catalog>.done, or <catalog>.decks.done with --with-decks)")
+    parser.add_argument(
+        "--priority",
+        choices=[PREWARM, BATCH],
+        default=PREWARM,
+        help="Scheduling class: prewarm yields to all other traffic, batch only to interactive (default: prewarm)"
+    )
+    args = parser.parse_args(argv)
+
+    checkpoint_path = args.checkpoint or f"{args.catalog}{'.decks' if args.with_decks else ''}.done"
+    done = load_checkpoint(checkpoint_path)
+
+    items = []
+    seen = set(done)
+    invalid = 0
+    for line_no, record in read_catalog(args.catalog):
+        if not isinstance(record, dict):
+            invalid += 1
+            print(f"Skipping line {line_no}: not a JSON object", file=sys.stderr)
+            continue
+        try:
+            plant_data = canonicalizer.canonicalize(PlantInputData(**record))
+        except ValidationError as e:
+            invalid += 1
+            print(f"Skipping line {line_no}: {e.errors()[0]['msg']}", file=sys.stderr)
+            continue
+        guide_id = guide_id_for(plant_data)
+        if guide_id not in seen:
+            seen.add(guide_id)
+            items.append(plant_data)
+
+    print(f"{len(items)} guides to generate ({len(done)} already done, {invalid} invalid)")
+    start_time = time.time()
+    succeeded, failed = asyncio.run(pregenerate(
+        items,
+        checkpoint_path,
+        max(1, args.concurrency),
+        args.rate,
+        args.with_decks,
+        args.priority
+    ))
+    print(f"Generated {succeeded}, failed {failed} in {time.time() - start_time:.1f} seconds")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,16 +6,156 @@ It constructs prompts, sends requests, and parses structured JSON responses.
 """
 import json
 
+import asyncio
+from contextvars import ContextVar
+import hashlib
 import httpx
 import os
-from typing import Dict, Any
-from app.schemas.plant import PlantInputData, GeminiResponse
+import time
+from typing import Dict, Any, List, Optional, Tuple
+from pydantic import TypeAdapter
+from app.schemas.plant import (
+    PlantInputData,
+    GeminiResponse,
+    ExperienceLevel,
+    PlantOverview,
+    GrowthStage,
+    DailyCare,
+    Problem
+)
+from app.utils.cassettes import CassetteStore, CASSETTE_DIR, CASSETTE_LATENCY, CASSETTE_MODE
+from app.utils.context_cache import ContextCache
+from app.utils.deadline import Deadline, DeadlineExceeded, GEMINI_CALL_COST
+from app.utils.json_repair import loads_lenient
+from app.utils.metrics import metrics
+from app.utils.model_router import ModelRouter
+from app.utils.scheduler import PriorityScheduler
+from app.utils.shared_cache import shared_cache
+from app.utils.token_usage import BudgetExceeded, TokenUsage
 import re
 
 
 # Configuration
 API_KEY = os.getenv("GEMINI_API_KEY", "")
+MODELS = [model.strip() for model in os.getenv("GEMINI_MODELS", "gemini-1.5-flash").split(",") if model.strip()]
+API_ROOT = os.getenv("GEMINI_BASE_URL", "https://generativelanguage.googleapis.com/v1beta")  # Point at a local stand-in for tests
 DEBUG_MODE = os.getenv("DEBUG", "False").lower() == "true"
+GENERATION_MODE = os.getenv("GEMINI_GENERATION_MODE", "sections").lower()  # "sections" or "single"
+MAX_CONTINUATIONS = int(os.getenv("GEMINI_MAX_CONTINUATIONS", "2"))
+# Output still cut off after the continuations is repaired, but may have
+# lost items, so it is cached only briefly
+TRUNCATED_TTL = int(os.getenv("GEMINI_TRUNCATED_TTL", "300"))
+# Generate experience-dependent sections for every level in one call
+EXPERIENCE_VARIANTS = os.getenv("GEMINI_EXPERIENCE_VARIANTS", "False").lower() == "true"
+EXPERIENCE_LEVELS = [level.value for level in ExperienceLevel]
+# Serve static prompt preambles from Gemini context caching (cachedContents)
+CONTEXT_CACHE = os.getenv("GEMINI_CONTEXT_CACHE", "False").lower() == "true"
+CONTEXT_CACHE_TTL = int(os.getenv("GEMINI_CONTEXT_CACHE_TTL", "3600"))
+CONTEXT_CACHE_REFRESH = float(os.getenv("GEMINI_CONTEXT_CACHE_REFRESH", "300"))  # Renew this long before expiry
+CONTEXT_CACHE_RETRY = float(os.getenv("GEMINI_CONTEXT_CACHE_RETRY", "600"))  # Back-off after a failed registration
+# Smallest cacheable content for the configured models (32768 for 1.5,
+# 1024 for 2.x Flash); smaller preambles are always sent inline
+CONTEXT_CACHE_MIN_TOKENS = int(os.getenv("GEMINI_CONTEXT_CACHE_MIN_TOKENS", "32768"))
+# Routing across GEMINI_MODELS by rolling latency and error rate
+ROUTER_WINDOW = int(os.getenv("GEMINI_ROUTER_WINDOW", "50"))
+ROUTER_MAX_ERROR_RATE = float(os.getenv("GEMINI_ROUTER_MAX_ERROR_RATE", "0.5"))
+ROUTER_COOLDOWN = float(os.getenv("GEMINI_ROUTER_COOLDOWN", "30"))
+MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "8"))
+INTERACTIVE_RESERVED = int(os.getenv("GEMINI_INTERACTIVE_RESERVED", "2"))  # Slots background work can't use
+STARVATION_LIMIT = float(os.getenv("GEMINI_STARVATION_LIMIT", "10"))  # Seconds before a waiter jumps the queue
+CONTINUATION_PROMPT = (
+    "Your previous response was cut off. Continue the JSON exactly where it stopped, "
+    "without repeating any text and without markdown."
+)
+
+
+FIELD_LABELS = {
+    "plant_name": "Name",
+    "plant_type": "Type",
+    "climate": "Climate",
+    "sunlight_hours": "Daily Sunlight",
+    "soil_type": "Soil Type",
+    "watering_frequency": "Current Watering Frequency",
+    "experience_level": "Gardener Experience Level",
+}
+
+# Per-section generation specs. "fields" lists the only inputs a section
+# depends on; its prompt and cache key are built from those alone.
+SECTIONS: Dict[str, Dict[str, Any]] = {
+    "plant_overview": {
+        "fields": ["plant_name", "plant_type", "climate", "sunlight_hours", "soil_type", "experience_level"],
+        "schema": PlantOverview,
+        "max_tokens": 512,
+        "skeleton": """{
+    "description": "Detailed description of the plant (2-3 sentences)",
+    "ideal_conditions": {
+      "temperature": "Temperature range",
+      "humidity": "Humidity percentage",
+      "sunlight": "Sunlight requirements",
+      "soil_ph": "Ideal pH range"
+    },
+    "benefits": ["Benefit 1", "Benefit 2", "Benefit 3"],
+    "difficulty_level": "Beginner/Intermediate/Advanced"
+  }""",
+        "instructions": "Rate difficulty_level for a gardener at the given experience level.",
+    },
+    "growth_stages": {
+        "fields": ["plant_name", "plant_type", "climate", "experience_level"],
+        "schema": List[GrowthStage],
+        "max_tokens": 768,
+        "skeleton": """[
+    {
+      "stage_name": "Germination/Seedling/etc.",
+      "duration": "Time period",
+      "care_instructions": "Specific care during this stage",
+      "key_indicators": ["Indicator 1", "Indicator 2"]
+    }
+  ]""",
+        "instructions": "Include 3-4 growth stages, with care instructions tailored to the gardener's experience level.",
+    },
+    "daily_care": {
+        "fields": ["plant_name", "plant_type", "climate", "sunlight_hours", "soil_type", "watering_frequency"],
+        "schema": DailyCare,
+        "max_tokens": 512,
+        "skeleton": """{
+    "morning_routine": ["Task 1", "Task 2"],
+    "afternoon_routine": ["Task 1", "Task 2"],
+    "evening_routine": ["Task 1", "Task 2"],
+    "weekly_tasks": ["Task 1", "Task 2", "Task 3"]
+  }""",
+        "instructions": "Adjust the routines to the current watering frequency and conditions.",
+    },
+    "common_problems": {
+        "fields": ["plant_name", "plant_type", "climate"],
+        "schema": List[Problem],
+        "max_tokens": 768,
+        "skeleton": """[
+    {
+      "problem": "Problem name",
+      "symptoms": ["Symptom 1", "Symptom 2"],
+      "solution": "Detailed solution",
+      "prevention": "Prevention tips"
+    }
+  ]""",
+        "instructions": "Include 4-5 common problems for this plant in this climate.",
+    },
+    "additional_tips": {
+        "fields": list(FIELD_LABELS),
+        "schema": List[str],
+        "max_tokens": 384,
+        "skeleton": """["Tip 1", "Tip 2", "Tip 3"]""",
+        "instructions": "Include 5-7 tips tailored to these exact conditions and experience level.",
+    },
+}
+
+SECTION_ADAPTERS = {name: TypeAdapter(spec["schema"]) for name, spec in SECTIONS.items()}
+
+# Models that answered calls made for the guide being generated
+_models_used: ContextVar[Optional[set]] = ContextVar("models_used", default=None)
+# Tokens used by those calls
+_usage: ContextVar[Optional[TokenUsage]] = ContextVar("usage", default=None)
+# Sections whose output was truncated and repaired
+_truncated: ContextVar[Optional[set]] = ContextVar("truncated", default=None)
 
 
 class GeminiService:
@@ -28,82 +168,213 @@ class GeminiService:
     def __init__(self):
         """Initialize Gemini service with API configuration."""
         self.api_key = API_KEY
-        self.base_url = "https://generativelanguage.googleapis.com/v1beta/models"
-        self.model = "gemini-1.5-flash"
+        self.base_url = f"{API_ROOT}/models"
+        # The primary model keys the response caches; calls are routed across all
+        self.model = MODELS[0]
+        self.router = ModelRouter(MODELS, ROUTER_WINDOW, ROUTER_MAX_ERROR_RATE, ROUTER_COOLDOWN)
         self.timeout = 30.0
+        self._client: Optional[httpx.AsyncClient] = None
+        # Upstream calls are granted by priority class (see priority_scope)
+        self.scheduler = PriorityScheduler("gemini", MAX_CONCURRENCY, INTERACTIVE_RESERVED, STARVATION_LIMIT)
+        self.cassette_mode = CASSETTE_MODE
+        self.cassettes = CassetteStore(CASSETTE_DIR)
+        # Cassettes are keyed by payload, which would include the cache name
+        self.context_cache = ContextCache(
+            CONTEXT_CACHE_TTL, CONTEXT_CACHE_REFRESH, CONTEXT_CACHE_RETRY, CONTEXT_CACHE_MIN_TOKENS
+        )
+        self.use_context_cache = CONTEXT_CACHE and CASSETTE_MODE == "off"
     
-    def _build_prompt(self, plant_data: PlantInputData) -> str:
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the pooled HTTP client, creating it on first use."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(timeout=self.timeout)
+        return self._client
+    
+    async def warmup(self) -> None:
         """
-        Build a structured prompt for Gemini AI based on plant data.
-        
-        Args:
-            plant_data: Validated plant input data
-            
-        Returns:
-            Formatted prompt string
+        Create the pooled HTTP client and, when an API key is set, open a
+        connection to the Gemini endpoint so the first request skips the
+        TCP and TLS handshakes.
         """
-        prompt = f"""You are an expert botanist and plant care specialist. Based on the following plant information, 
+        client = self._get_client()
+        if self.api_key:
+            await client.get(f"{self.base_url}/{self.model}?key={self.api_key}")
+    
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    def _guide_preamble(self) -> str:
+        """Static instructions and JSON skeleton for a whole guide."""
+        return """You are an expert botanist and plant care specialist. Based on the plant information at the end of this prompt, 
 provide comprehensive care guidance in strict JSON format.
 
-Plant Information:
-- Name: {plant_data.plant_name}
-- Type: {plant_data.plant_type}
-- Climate: {plant_data.climate}
-- Daily Sunlight: {plant_data.sunlight_hours} hours
-- Soil Type: {plant_data.soil_type}
-- Current Watering Frequency: {plant_data.watering_frequency}
-- Gardener Experience Level: {plant_data.experience_level}
-
 Provide a detailed plant care guide with the following structure (respond ONLY with valid JSON, no markdown):
 
-{{
-  "plant_overview": {{
+{
+  "plant_overview": {
    "description": "Detailed description of the plant (2-3 sentences)",
-    "ideal_conditions": {{
+    "ideal_conditions": {
       "temperature": "Temperature range",
       "humidity": "Humidity percentage",
       "sunlight": "Sunlight requirements",
       "soil_ph": "Ideal pH range"
-    }},
+    },
     "benefits": ["Benefit 1", "Benefit 2", "Benefit 3"],
     "difficulty_level": "Beginner/Intermediate/Advanced"
-  }},
+  },
   "growth_stages": [
-    {{
+    {
       "stage_name": "Germination/Seedling/etc.",
       "duration": "Time period",
       "care_instructions": "Specific care during this stage",
       "key_indicators": ["Indicator 1", "Indicator 2"]
-    }}
+    }
   ],
-   "daily_care": {{
+   "daily_care": {
     "morning_routine": ["Task 1", "Task 2"],
     "afternoon_routine": ["Task 1", "Task 2"],
     "evening_routine": ["Task 1", "Task 2"],
     "weekly_tasks": ["Task 1", "Task 2", "Task 3"]
-  }},
+  },
   "common_problems": [
-    {{
+    {
       "problem": "Problem name",
       "symptoms": ["Symptom 1", "Symptom 2"],
       "solution": "Detailed solution",
       "prevention": "Prevention tips"
-    }}
+    }
   ],
   "additional_tips": ["Tip 1", "Tip 2", "Tip 3"]
-    }}
-Tailor the advice to the gardener's experience level: {plant_data.experience_level}. 
+    }
 Include at least 3-4 growth stages, 4-5 common problems, and 5-7 additional tips.
-Respond with ONLY the JSON object, no additional text or markdown formatting."""
+Respond with ONLY the JSON object, no additional text or markdown formatting.
+
+"""
+    
+    def _build_prompt(self, plant_data: PlantInputData) -> str:
+        """
+        Build a structured prompt for Gemini AI based on plant data.
+        
+        The prompt is the static guide preamble followed by the plant
+        information, so the preamble can be served from context cache.
+        
+        Args:
+            plant_data: Validated plant input data
+            
+        Returns:
+            Formatted prompt string
+        """
+        return self._guide_preamble() + f"""Plant Information:
+- Name: {plant_data.plant_name}
+- Type: {plant_data.plant_type}
+- Climate: {plant_data.climate}
+- Daily Sunlight: {plant_data.sunlight_hours} hours
+- Soil Type: {plant_data.soil_type}
+- Current Watering Frequency: {plant_data.watering_frequency}
+- Gardener Experience Level: {plant_data.experience_level}
+
+Tailor the advice to the gardener's experience level: {plant_data.experience_level}."""
+    
+    def _plant_information(self, fields: List[str], plant_data: PlantInputData) -> str:
+        """Format the given input fields as the prompt's plant information block."""
+        return "Plant Information:\n" + "\n".join(
+            f"- {FIELD_LABELS[field]}: {getattr(plant_data, field)}" + (" hours" if field == "sunlight_hours" else "")
+            for field in fields
+        )
+    
+    def _section_preamble(self, section: str) -> str:
+        """Static instructions and JSON skeleton for one guide section."""
+        spec = SECTIONS[section]
+        return f"""You are an expert botanist and plant care specialist. Based on the plant information at the end of this prompt, 
+provide one section of a plant care guide in strict JSON format.
+
+Respond ONLY with a JSON object of this structure (no markdown):
+
+{{
+  "{section}": {spec["skeleton"]}
+}}
+{spec["instructions"]}
+Respond with ONLY the JSON object, no additional text or markdown formatting.
+
+"""
+    
+    def _build_section_prompt(self, section: str, plant_data: PlantInputData) -> str:
+        """
+        Build the prompt for a single guide section.
+        
+        Only the input fields the section depends on are included, so the
+        prompt (and therefore its cache key) changes only when they do.
+        
+        Args:
+            section: Name of the GeminiResponse field to generate
+            plant_data: Validated plant input data
+            
+        Returns:
+            Formatted prompt string
+        """
+        return self._section_preamble(section) + self._plant_information(SECTIONS[section]["fields"], plant_data)
+    
+    def _variant_preamble(self, section: str) -> str:
+        """Static instructions and JSON skeleton for a section at every level."""
+        spec = SECTIONS[section]
+        variants = ",\n  ".join(f'"{level}": {spec["skeleton"]}' for level in EXPERIENCE_LEVELS)
+        return f"""You are an expert botanist and plant care specialist. Based on the plant information at the end of this prompt, 
+provide one section of a plant care guide for each gardener experience level ({", ".join(EXPERIENCE_LEVELS)}) in strict JSON format.
 
-        return prompt
+Respond ONLY with a JSON object of this structure, one entry per experience level (no markdown):
+
+{{
+  {variants}
+}}
+{spec["instructions"]} Tailor each entry to its experience level.
+Respond with ONLY the JSON object, no additional text or markdown formatting.
+
+"""
+    
+    def _build_variant_prompt(self, section: str, plant_data: PlantInputData) -> str:
+        """
+        Build the prompt for one section at every experience level.
+        
+        Args:
+            section: Name of an experience-dependent GeminiResponse field
+            plant_data: Validated plant input data
+            
+        Returns:
+            Formatted prompt string asking for one entry per level
+        """
+        fields = [field for field in SECTIONS[section]["fields"] if field != "experience_level"]
+        return self._variant_preamble(section) + self._plant_information(fields, plant_data)
     
-    async def generate_plant_guide(self, plant_data: PlantInputData) -> GeminiResponse:
+    async def generate_plant_guide(
+        self,
+        plant_data: PlantInputData,
+        deadline: Optional[Deadline] = None,
+        cache_only: bool = False
+    ) -> GeminiResponse:
         """
         Generate comprehensive plant care guidance using Gemini AI.
         
+        In "sections" mode (the default) each guide section is requested
+        concurrently and cached on only the inputs it depends on; in
+        "single" mode the whole guide comes from one call.
+        
+        With a deadline, calls are only started while the budget covers
+        GEMINI_CALL_COST and are timed out at the deadline; sections that
+        miss it are filled from stale cache or the mock guide, as are
+        uncached sections in cache-only mode.
+        
+        Token counts and cost of the calls made are left in the guide's
+        `_usage`. Sections built from output that was still truncated
+        after the continuations are listed in `_truncated_sections`.
+        
         Args:
             plant_data: Validated plant input data
+            deadline: Optional time budget for this stage
+            cache_only: Serve only cached responses; set when a token
+                budget is used up
             
         Returns:
             Structured Gemini response with plant care guidance
@@ -111,69 +382,23 @@ Respond with ONLY the JSON object, no additional text or markdown formatting."""
         Raises:
             Exception: If API call fails or response is invalid
         """
-        if not self.api_key:
+        if not self.api_key and self.cassette_mode != "replay":
             # Return mock response if no API key is configured
-            return self._generate_mock_response(plant_data)
+            guide = self._generate_mock_response(self._for_prompt(plant_data))
+            guide._models = ["mock"]
+            return guide
         
+        models_used = set()
+        usage = TokenUsage()
+        truncated = set()
+        token = _models_used.set(models_used)
+        usage_token = _usage.set(usage)
+        truncated_token = _truncated.set(truncated)
         try:
-            # Build the prompt
-            prompt = self._build_prompt(plant_data)
-            
-            # Prepare API request
-            url = f"{self.base_url}/{self.model}:generateContent?key={self.api_key}"
-            
-            payload = {
-                "contents": [{
-                    "parts": [{
-                        "text": prompt
-                    }]
-                }],
-                "generationConfig": {
-                    "temperature": 0.7,
-                    "topK": 40,
-                    "topP": 0.95,
-                    "maxOutputTokens": 2048,
-                }
-            }
-            
-            # Make async API call
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(url, json=payload)
-                response.raise_for_status()
-
-
-            
-            # Parse response
-            result = response.json()
-            
-            if DEBUG_MODE:
-                print("Gemini raw response:", result)
-            # Extract text from Gemini response
-            if "candidates" in result and len(result["candidates"]) > 0:
-                try:
-                    parts = result["candidates"][0]["content"]["parts"]
-                    text_content = "".join(p.get("text", "") for p in parts)
-                except (KeyError, IndexError):
-                    raise Exception("Malformed Gemini response")
-
-                
-                # Clean up markdown formatting if present
-                text_content = text_content.strip()
-                text_content = text_content.removeprefix("```json")
-                text_content = text_content.removeprefix("```")
-                text_content = text_content.removesuffix("```")
-                text_content = text_content.strip()
-                text_content = re.sub(r"```(?:json)?", "", text_content)
-                text_content = text_content.strip()
-
-                
-                # Parse JSON response
-                json_response = json.loads(text_content)
-                
-                # Validate and return as Pydantic model
-                return GeminiResponse(**json_response)
+            if GENERATION_MODE == "sections":
+                guide = await self._generate_by_sections(plant_data, deadline, cache_only)
             else:
-                raise Exception("No valid response from Gemini API")
+                guide = await self._generate_single(plant_data, deadline, cache_only)
                 
         except httpx.HTTPError as e:
             raise Exception(f"Gemini API request failed: {str(e)}")
@@ -181,6 +406,594 @@ Respond with ONLY the JSON object, no additional text or markdown formatting."""
             raise Exception(f"Failed to parse Gemini response as JSON: {str(e)}")
         except Exception as e:
             raise RuntimeError(f"Gemini service failed: {str(e)}") from e
+        finally:
+            _models_used.reset(token)
+            _usage.reset(usage_token)
+            _truncated.reset(truncated_token)
+        
+        guide._models = sorted(models_used)
+        guide._usage = usage
+        guide._truncated_sections = sorted(truncated)
+        return guide
+    
+    async def _generate_single(
+        self,
+        plant_data: PlantInputData,
+        deadline: Optional[Deadline] = None,
+        cache_only: bool = False
+    ) -> GeminiResponse:
+        """Generate the whole guide with one Gemini call."""
+        # Identical prompts share one cached response across workers
+        cache_key = self._cache_key(self._build_prompt(plant_data))
+        cached = self._cache_get("gemini", cache_key)
+        if cached is not None:
+            return GeminiResponse.model_validate_json(cached[0])
+        if cache_only:
+            print("Gemini budget exceeded, serving fallbacks for an uncached guide")
+            return self._with_fallbacks({}, list(SECTIONS), plant_data)
+        
+        try:
+            text_content, truncated = await self._call_gemini(
+                self._build_prompt(self._for_prompt(plant_data)),
+                max_output_tokens=2048,
+                deadline=deadline,
+                preamble=self._guide_preamble()
+            )
+        except DeadlineExceeded as e:
+            print(f"Gemini call skipped: {str(e)}")
+            return self._with_fallbacks({}, list(SECTIONS), plant_data)
+        data = self._parse_json(text_content)
+        if not isinstance(data, dict):
+            raise Exception("Gemini response is not a JSON object")
+        
+        # Validate section by section so one bad section doesn't sink the guide
+        values = {}
+        failed = []
+        for section, adapter in SECTION_ADAPTERS.items():
+            try:
+                values[section] = adapter.validate_python(data[section])
+            except (KeyError, ValueError) as e:
+                print(f"Gemini section {section} invalid: {str(e)}")
+                failed.append(section)
+        
+        if len(failed) == len(SECTIONS):
+            raise Exception("Gemini response contained no valid sections")
+        
+        guide = self._with_fallbacks(values, failed, plant_data)
+        if truncated:
+            self._note_truncated(*values)
+        if not failed:
+            self._cache_set(
+                "gemini",
+                cache_key,
+                guide.model_dump_json().encode("utf-8"),
+                ttl=TRUNCATED_TTL if truncated else None
+            )
+        return guide
+    
+    async def _generate_by_sections(
+        self,
+        plant_data: PlantInputData,
+        deadline: Optional[Deadline] = None,
+        cache_only: bool = False
+    ) -> GeminiResponse:
+        """Generate all sections concurrently and merge them into one guide."""
+        names = list(SECTIONS)
+        results = await asyncio.gather(
+            *(self._generate_section(name, plant_data, deadline, cache_only) for name in names),
+            return_exceptions=True
+        )
+        
+        values = {}
+        failed = []
+        for name, result in zip(names, results):
+            if isinstance(result, BaseException):
+                print(f"Gemini section {name} failed: {str(result)}")
+                failed.append(name)
+            else:
+                values[name] = result
+        
+        # Sections skipped on purpose are filled in rather than failing the guide
+        skipped = any(isinstance(result, (DeadlineExceeded, BudgetExceeded)) for result in results)
+        if len(failed) == len(names) and not skipped:
+            # Nothing usable was generated; surface the first error
+            raise results[0]
+        
+        return self._with_fallbacks(values, failed, plant_data)
+    
+    def _with_fallbacks(self, values: Dict[str, Any], failed: List[str], plant_data: PlantInputData) -> GeminiResponse:
+        """
+        Fill failed sections and assemble the guide.
+        
+        Each failed section is taken from its last cached value, even if
+        expired, and otherwise from the mock guide. The guide records
+        which sections were filled in `_fallback_sections`.
+        
+        Args:
+            values: Successfully generated sections
+            failed: Names of sections that could not be generated
+            plant_data: Validated plant input data
+            
+        Returns:
+            Complete guide
+        """
+        mock = None
+        for section in failed:
+            stale = self._cache_get(
+                "gemini_section",
+                self._cache_key(self._build_section_prompt(section, plant_data)),
+                allow_expired=True
+            )
+            if stale is not None:
+                values[section] = SECTION_ADAPTERS[section].validate_json(stale[0])
+                continue
+            if mock is None:
+                mock = self._generate_mock_response(self._for_prompt(plant_data))
+            values[section] = getattr(mock, section)
+        
+        guide = GeminiResponse(**values)
+        guide._fallback_sections = list(failed)
+        return guide
+    
+    async def _generate_section(
+        self,
+        section: str,
+        plant_data: PlantInputData,
+        deadline: Optional[Deadline] = None,
+        cache_only: bool = False
+    ) -> Any:
+        """
+        Generate and validate one guide section, using the section cache.
+        
+        Args:
+            section: Name of the GeminiResponse field to generate
+            plant_data: Validated plant input data
+            deadline: Optional time budget for the call
+            cache_only: Raise BudgetExceeded instead of calling Gemini
+                when the section is not cached
+            
+        Returns:
+            Validated section value (model or list of models)
+        """
+        adapter = SECTION_ADAPTERS[section]
+        cache_key = self._cache_key(self._build_section_prompt(section, plant_data))
+        cached = self._cache_get("gemini_section", cache_key)
+        if cached is not None:
+            return adapter.validate_json(cached[0])
+        if cache_only:
+            raise BudgetExceeded(f"Gemini budget exceeded and {section} is not cached")
+        
+        if (
+            EXPERIENCE_VARIANTS
+            and "experience_level" in SECTIONS[section]["fields"]
+            and plant_data.experience_level in EXPERIENCE_LEVELS
+        ):
+            return await self._generate_section_variants(section, plant_data, deadline)
+        
+        text_content, truncated = await self._call_gemini(
+            self._build_section_prompt(section, self._for_prompt(plant_data)),
+            max_output_tokens=SECTIONS[section]["max_tokens"],
+            deadline=deadline,
+            preamble=self._section_preamble(section)
+        )
+        data = self._parse_json(text_content)
+        # Accept both {"section": value} and a bare value
+        if isinstance(data, dict) and section in data:
+            data = data[section]
+        
+        value = adapter.validate_python(data)
+        if truncated:
+            self._note_truncated(section)
+        self._cache_set("gemini_section", cache_key, adapter.dump_json(value), ttl=TRUNCATED_TTL if truncated else None)
+        return value
+    
+    async def _generate_section_variants(
+        self,
+        section: str,
+        plant_data: PlantInputData,
+        deadline: Optional[Deadline] = None
+    ) -> Any:
+        """
+        Generate a section for all experience levels in one call.
+        
+        Each level is cached under the key of its own single-level
+        prompt, so a later request at another level is a cache hit.
+        
+        Args:
+            section: Name of an experience-dependent GeminiResponse field
+            plant_data: Validated plant input data
+            deadline: Optional time budget for the call
+            
+        Returns:
+            Validated section value at the requested experience level
+            
+        Raises:
+            Exception: If the requested level is missing or invalid
+        """
+        adapter = SECTION_ADAPTERS[section]
+        text_content, truncated = await self._call_gemini(
+            self._build_variant_prompt(section, self._for_prompt(plant_data)),
+            max_output_tokens=SECTIONS[section]["max_tokens"] * len(EXPERIENCE_LEVELS),
+            deadline=deadline,
+            preamble=self._variant_preamble(section)
+        )
+        data = self._parse_json(text_content)
+        if not isinstance(data, dict):
+            raise Exception(f"Gemini {section} variants are not a JSON object")
+        
+        requested = None
+        for level in EXPERIENCE_LEVELS:
+            variant = data.get(level)
+            # Accept both {"level": {"section": value}} and a bare value
+            if isinstance(variant, dict) and section in variant:
+                variant = variant[section]
+            try:
+                value = adapter.validate_python(variant)
+            except ValueError as e:
+                print(f"Gemini {section} variant {level} invalid: {str(e)}")
+                continue
+            
+            level_data = plant_data.model_copy(update={"experience_level": level})
+            cache_key = self._cache_key(self._build_section_prompt(section, level_data))
+            self._cache_set("gemini_section", cache_key, adapter.dump_json(value), ttl=TRUNCATED_TTL if truncated else None)
+            if level == plant_data.experience_level:
+                requested = value
+        
+        if requested is None:
+            raise Exception(f"Gemini {section} variants missing level {plant_data.experience_level}")
+        if truncated:
+            self._note_truncated(section)
+        return requested
+    
+    def _for_prompt(self, plant_data: PlantInputData) -> PlantInputData:
+        """
+        Return the inputs with the name the user typed, for prompt text.
+        
+        Cache keys are built from the canonical inputs, so equivalent
+        requests share responses; the prompt keeps the user's wording
+        ("Snake plant" rather than its synonym "Sansevieria").
+        """
+        if not plant_data._display_name:
+            return plant_data
+        return plant_data.model_copy(update={"plant_name": plant_data._display_name})
+    
+    def _cache_get(self, namespace: str, key: str, allow_expired: bool = False) -> Optional[Tuple[bytes, float, float]]:
+        """
+        Read a cached response; nothing is cached while recording or
+        replaying cassettes, so every run reaches them.
+        """
+        if self.cassette_mode != "off":
+            return None
+        return shared_cache.get(namespace, key, allow_expired=allow_expired)
+    
+    def _cache_set(self, namespace: str, key: str, value: bytes, ttl: Optional[int] = None) -> None:
+        """Cache a response, except while recording or replaying cassettes."""
+        if self.cassette_mode == "off":
+            shared_cache.set(namespace, key, value, ttl=ttl)
+    
+    def _note_truncated(self, *sections: str) -> None:
+        """Record sections of the current guide built from truncated output."""
+        truncated = _truncated.get()
+        if truncated is not None:
+            truncated.update(sections)
+    
+    def _cache_key(self, prompt: str) -> str:
+        """
+        Hash the primary model and prompt into a cache key.
+        
+        Responses from any routed model are cached under the primary one,
+        so routing does not split the cache.
+        """
+        return hashlib.sha256(f"{self.model}\n{prompt}".encode("utf-8")).hexdigest()
+    
+    async def _call_gemini(
+        self,
+        prompt: str,
+        max_output_tokens: int,
+        deadline: Optional[Deadline] = None,
+        preamble: Optional[str] = None
+    ) -> Tuple[str, bool]:
+        """
+        Send a prompt to Gemini and return the generated text.
+        
+        If generation stops at maxOutputTokens, up to MAX_CONTINUATIONS
+        follow-up requests ask the same model to continue, and the pieces
+        are stitched together. Continuations are only requested while the
+        deadline leaves room for another call.
+        
+        Args:
+            prompt: Prompt text
+            max_output_tokens: Generation length limit per request
+            deadline: Optional time budget for all requests together
+            preamble: Static leading part of the prompt that may be served
+                from context cache
+            
+        Returns:
+            Tuple of (concatenated text of the first candidate, whether it
+            was still cut off at maxOutputTokens)
+            
+        Raises:
+            httpx.HTTPError: If the request fails on every model
+            DeadlineExceeded: If the budget does not cover the first request
+            Exception: If the response has no usable candidate
+        """
+        text_content, finish_reason, model = await self._request(prompt, preamble, [], max_output_tokens, deadline)
+        
+        for _ in range(MAX_CONTINUATIONS):
+            if finish_reason != "MAX_TOKENS":
+                break
+            if deadline is not None and not deadline.allows(GEMINI_CALL_COST):
+                # Return what we have; the JSON repair closes truncated output
+                print("Gemini output truncated, no time left for a continuation")
+                break
+            print("Gemini output truncated, requesting continuation")
+            turns = [
+                {"role": "model", "parts": [{"text": text_content}]},
+                {"role": "user", "parts": [{"text": CONTINUATION_PROMPT}]}
+            ]
+            more, finish_reason, _ = await self._request(
+                prompt, preamble, turns, max_output_tokens, deadline, models=[model]
+            )
+            # The model sometimes reopens a code fence for the continuation
+            text_content += re.sub(r"^\s*```(?:json)?\s*", "", more)
+        
+        if finish_reason == "MAX_TOKENS":
+            print("Gemini output still truncated, repairing it and caching it briefly")
+        return text_content, finish_reason == "MAX_TOKENS"
+    
+    async def _request(
+        self,
+        prompt: str,
+        preamble: Optional[str],
+        turns: List[Dict[str, Any]],
+        max_output_tokens: int,
+        deadline: Optional[Deadline] = None,
+        models: Optional[List[str]] = None
+    ) -> Tuple[str, str, str]:
+        """
+        Make one generateContent request, routed to the best model.
+        
+        Models are tried in the router's order; rate limiting, server
+        errors and connection failures fall through to the next one. Each
+        attempt waits for a scheduler slot in the caller's priority class,
+        and the deadline is checked again once the slot is granted.
+        
+        Args:
+            prompt: Prompt text of the first user turn
+            preamble: Static leading part of the prompt, if any
+            turns: Later turns (continuations)
+            max_output_tokens: Generation length limit
+            deadline: Optional time budget
+            models: Models to try instead of the router's choice
+            
+        Returns:
+            Tuple of (generated text, finishReason, model)
+            
+        Raises:
+            DeadlineExceeded: If the deadline does not allow the request
+                or it timed out at the deadline
+            httpx.HTTPError: If every model failed
+        """
+        self._check_deadline(deadline)
+        if models is None:
+            models = self.router.candidates(deadline.remaining() if deadline is not None else None)
+        
+        last_error: Optional[Exception] = None
+        for model in models:
+            async with self.scheduler.slot():
+                self._check_deadline(deadline)
+                start = time.perf_counter()
+                try:
+                    text_content, finish_reason = await self._generate(
+                        model, prompt, preamble, turns, max_output_tokens, deadline
+                    )
+                except httpx.HTTPError as e:
+                    if not self._is_upstream_failure(e):
+                        raise
+                    self.router.record(model, time.perf_counter() - start, ok=False)
+                    print(f"Gemini model {model} failed: {str(e)}")
+                    last_error = e
+                    continue
+                self.router.record(model, time.perf_counter() - start, ok=True)
+            
+            used = _models_used.get()
+            if used is not None:
+                used.add(model)
+            return text_content, finish_reason, model
+        
+        raise last_error
+    
+    def _is_upstream_failure(self, error: httpx.HTTPError) -> bool:
+        """Whether an error is the model's fault (worth trying another one)."""
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code == 429 or error.response.status_code >= 500
+        return isinstance(error, httpx.TransportError)
+    
+    def _check_deadline(self, deadline: Optional[Deadline]) -> None:
+        """Raise DeadlineExceeded if the budget can't cover another call."""
+        if deadline is not None and not deadline.allows(GEMINI_CALL_COST):
+            raise DeadlineExceeded(f"{deadline.remaining():.1f}s left, Gemini call needs ~{GEMINI_CALL_COST:.0f}s")
+    
+    async def _generate(
+        self,
+        model: str,
+        prompt: str,
+        preamble: Optional[str],
+        turns: List[Dict[str, Any]],
+        max_output_tokens: int,
+        deadline: Optional[Deadline] = None
+    ) -> Tuple[str, str]:
+        """
+        Call one model, referencing the preamble as cached content if possible.
+        
+        With context caching enabled, only the part of the prompt after
+        the preamble is sent. If the cache is unavailable or the model
+        rejects it, the full prompt is sent instead.
+        
+        Returns:
+            Tuple of (generated text, finishReason)
+        """
+        cached_content = None
+        if self.use_context_cache and preamble and prompt.startswith(preamble):
+            cached_content = await self.context_cache.name_for(model, preamble, self._create_cached_content)
+        
+        if cached_content is not None:
+            contents = [{"role": "user", "parts": [{"text": prompt[len(preamble):]}]}] + turns
+            try:
+                return await self._post(model, contents, max_output_tokens, deadline, cached_content)
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code not in (400, 403, 404):
+                    raise
+                # The cached content expired or was deleted upstream
+                print(f"Gemini rejected cached content, sending full prompt: {str(e)}")
+                self.context_cache.invalidate(model, preamble)
+        
+        contents = [{"role": "user", "parts": [{"text": prompt}]}] + turns
+        return await self._post(model, contents, max_output_tokens, deadline)
+    
+    async def _post(
+        self,
+        model: str,
+        contents: List[Dict[str, Any]],
+        max_output_tokens: int,
+        deadline: Optional[Deadline] = None,
+        cached_content: Optional[str] = None
+    ) -> Tuple[str, str]:
+        """Send the generateContent request and extract the first candidate."""
+        payload = {
+            "contents": contents,
+            "generationConfig": {
+                "temperature": 0.7,
+                "topK": 40,
+                "topP": 0.95,
+                "maxOutputTokens": max_output_tokens,
+            }
+        }
+        if cached_content is not None:
+            payload["cachedContent"] = cached_content
+        
+        if self.cassette_mode == "replay":
+            result = await self._replay(model, payload)
+        else:
+            start = time.perf_counter()
+            result = await self._send(model, payload, deadline)
+            if self.cassette_mode == "record":
+                key = self.cassettes.key(payload)
+                self.cassettes.save(key, model, payload, result, time.perf_counter() - start)
+        
+        if DEBUG_MODE:
+            print("Gemini raw response:", result)
+        self._record_usage(model, result.get("usageMetadata"))
+        # Extract text from Gemini response
+        if "candidates" in result and len(result["candidates"]) > 0:
+            try:
+                candidate = result["candidates"][0]
+                parts = candidate["content"]["parts"]
+                text_content = "".join(p.get("text", "") for p in parts)
+            except (KeyError, IndexError):
+                raise Exception("Malformed Gemini response")
+            return text_content, candidate.get("finishReason", "STOP")
+        
+        raise Exception("No valid response from Gemini API")
+    
+    def _record_usage(self, model: str, usage_metadata: Optional[Dict[str, Any]]) -> None:
+        """
+        Count a response's tokens towards the current guide and metrics.
+        
+        Args:
+            model: Model that answered
+            usage_metadata: The response's usageMetadata, if present
+        """
+        if not usage_metadata:
+            return
+        usage = _usage.get()
+        if usage is None:
+            usage = TokenUsage()
+        call = usage.add_metadata(usage_metadata, model)
+        
+        metrics.increment(f"gemini_prompt_tokens_{model}", call.prompt_tokens)
+        metrics.increment(f"gemini_candidate_tokens_{model}", call.candidate_tokens)
+        metrics.increment(f"gemini_cached_tokens_{model}", call.cached_tokens)
+        metrics.increment("gemini_cost_usd", call.cost)
+        # Per-call distributions expose prompts that bloat their output
+        metrics.observe("gemini_prompt_tokens_per_call", call.prompt_tokens)
+        metrics.observe("gemini_candidate_tokens_per_call", call.candidate_tokens)
+    
+    async def _send(self, model: str, payload: Dict[str, Any], deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        """
+        POST a generateContent payload on the pooled client.
+        
+        Returns:
+            Parsed JSON response body
+        """
+        timeout = self.timeout if deadline is None else deadline.timeout(self.timeout)
+        url = f"{self.base_url}/{model}:generateContent?key={self.api_key}"
+        
+        try:
+            response = await self._get_client().post(url, json=payload, timeout=timeout)
+        except httpx.TimeoutException:
+            if timeout < self.timeout:
+                raise DeadlineExceeded("Gemini call timed out at the request deadline")
+            raise
+        response.raise_for_status()
+        return response.json()
+    
+    async def _create_cached_content(self, model: str, preamble: str, ttl: int) -> str:
+        """
+        Register a preamble with the cachedContents API.
+        
+        Args:
+            model: Model the cached content is for
+            preamble: Static prompt text, cached as the system instruction
+            ttl: Lifetime in seconds
+            
+        Returns:
+            The cached content name (e.g. "cachedContents/abc123")
+            
+        Raises:
+            httpx.HTTPError: If the upstream rejects it (e.g. the preamble
+                is below the model's minimum cacheable size)
+        """
+        url = f"{API_ROOT}/cachedContents?key={self.api_key}"
+        payload = {
+            "model": f"models/{model}",
+            "systemInstruction": {"parts": [{"text": preamble}]},
+            "ttl": f"{ttl}s"
+        }
+        response = await self._get_client().post(url, json=payload)
+        response.raise_for_status()
+        return response.json()["name"]
+    
+    async def _replay(self, model: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Serve a recorded response for a payload.
+        
+        Returns:
+            The recorded JSON response body, after the recorded latency
+            when GEMINI_CASSETTE_LATENCY is set
+            
+        Raises:
+            Exception: If no cassette was recorded for the payload
+        """
+        key = self.cassettes.key(payload)
+        cassette = self.cassettes.load(key)
+        if cassette is None:
+            raise Exception(f"No Gemini cassette recorded for request {key[:12]}")
+        if CASSETTE_LATENCY:
+            await asyncio.sleep(cassette.get("elapsed_seconds", 0))
+        return cassette["response"]
+    
+    def _parse_json(self, text_content: str) -> Any:
+        """
+        Parse generated text as JSON, repairing common defects.
+        
+        Markdown fences, trailing commas, surrounding prose and unclosed
+        strings or brackets are fixed before giving up.
+        
+        Raises:
+            json.JSONDecodeError: If the text cannot be repaired
+        """
+        return loads_lenient(text_content)
 
     
     def _generate_mock_response(self, plant_data: PlantInputData) -> GeminiResponse:
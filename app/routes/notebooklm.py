@@ -4,17 +4,39 @@ NotebookLM Service Module
 This module handles interactions with the NotebookLM API (or provides mock responses).
 It generates visual guides (PPT/images) based on plant care data.
 
-Note: As of January 2025, NotebookLM may not have a public API. This module 
-provides a mock implementation that can be replaced with actual API calls when available.
+Generation is a long-running operation: the request is submitted, the
+returned operation is polled at exponentially growing intervals until
+it is done, and the finished artifact is streamed into generated_files.
+Requests share one pooled HTTP client and are capped in number, and
+waiting is asynchronous, so a slow generation costs no worker thread.
+
+Note: As of January 2025, NotebookLM may not have a public API. Without an
+API key this module returns mock responses; NOTEBOOKLM_BASE_URL can point
+the client at a local stand-in server.
 """
 
+import asyncio
 import httpx
 import os
-from typing import Dict, Any
+import uuid
+from typing import Dict, Any, Optional
 from app.schemas.plant import GeminiResponse, NotebookLMResponse
+from app.services.slide_service import slide_service
+from app.utils.deadline import Deadline, NOTEBOOKLM_COST
 
 # Configuration
 DEBUG_MODE = os.getenv("DEBUG", "False").lower() == "true"
+BASE_URL = os.getenv("NOTEBOOKLM_BASE_URL", "https://api.notebooklm.google.com/v1")  # Point at a local stand-in for tests
+MAX_CONCURRENCY = int(os.getenv("NOTEBOOKLM_MAX_CONCURRENCY", "4"))  # Generations in flight at once
+OPERATION_TIMEOUT = float(os.getenv("NOTEBOOKLM_OPERATION_TIMEOUT", "60"))  # Submit, poll and download
+POLL_INITIAL = float(os.getenv("NOTEBOOKLM_POLL_INITIAL", "0.5"))  # First wait before polling
+POLL_MAX = float(os.getenv("NOTEBOOKLM_POLL_MAX", "8"))  # Longest wait between polls
+POLL_MULTIPLIER = 2.0
+REQUEST_TIMEOUT = 10.0  # Per HTTP request
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+# File types an artifact may be stored as; the type comes from the API
+# response and becomes the file extension
+ARTIFACT_FILE_TYPES = {"pptx", "pdf", "png", "jpg", "jpeg", "svg", "webp"}
 
 
 class NotebookLMService:
@@ -27,14 +49,36 @@ class NotebookLMService:
     def __init__(self):
         """Initialize NotebookLM service with API configuration."""
         self.api_key = os.getenv("NOTEBOOKLM_API_KEY", "")
-        # Placeholder URL - update when NotebookLM API becomes available
-        self.base_url = "https://api.notebooklm.google.com/v1"
-        self.timeout = 60.0  # Longer timeout for file generation
+        self.base_url = BASE_URL.rstrip("/")
+        self.timeout = OPERATION_TIMEOUT  # Longer timeout for file generation
+        self.output_dir = "generated_files"
+        self._client: Optional[httpx.AsyncClient] = None
+        self._slots = asyncio.Semaphore(MAX_CONCURRENCY)
+    
+    def _has_api_key(self) -> bool:
+        """Whether a real API key is configured."""
+        return bool(self.api_key) and self.api_key != "your_notebooklm_api_key_here"
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the pooled HTTP client, creating it on first use."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=REQUEST_TIMEOUT,
+                limits=httpx.Limits(max_connections=MAX_CONCURRENCY * 2)
+            )
+        return self._client
+    
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
     
     async def generate_visual_guide(
         self, 
         plant_care_data: GeminiResponse, 
-        plant_name: str
+        plant_name: str,
+        deadline: Optional[Deadline] = None
     ) -> NotebookLMResponse:
         """
         Generate a visual guide (PPT/PDF) from plant care data.
@@ -42,60 +86,88 @@ class NotebookLMService:
         Args:
             plant_care_data: Structured plant care guidance from Gemini
             plant_name: Name of the plant
+            deadline: Optional time budget; the request is skipped when it
+                leaves less than NOTEBOOKLM_COST and is timed out at it
             
         Returns:
-            NotebookLM response with file link or mock response
-            
-        Note:
-            Currently returns a mock response. Replace with actual API call
-            when NotebookLM API becomes publicly available.
+            NotebookLM response with a link to the downloaded file, or a
+            mock response when no API key is configured
         """
-        if not self.api_key or self.api_key == "your_notebooklm_api_key_here":
+        if not self._has_api_key():
             # Return mock response if no API key is configured
             return self._generate_mock_response(plant_name)
         
-        try:
-            # This is a placeholder for the actual NotebookLM API call
-            # Update this section when the API becomes available
-            
-            # Example API structure (hypothetical):
-            url = f"{self.base_url}/generate-presentation"
-            
-            payload = {
-                "title": f"{plant_name} Care Guide",
-                "content": plant_care_data.dict(),
-                "format": "pptx",  # or "pdf", "docx"
-                "template": "botanical",
-                "include_images": True
-            }
-            
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            # Uncomment when API is available:
-            # async with httpx.AsyncClient(timeout=self.timeout) as client:
-            #     response = await client.post(url, json=payload, headers=headers)
-            #     response.raise_for_status()
-            #     result = response.json()
-            #     
-            #     return NotebookLMResponse(
-            #         status="success",
-            #         file_url=result.get("file_url"),
-            #         file_type=result.get("file_type", "pptx"),
-            #         message="Visual guide generated successfully"
-            #     )
-            
-            # For now, return mock response
-            return self._generate_mock_response(plant_name)
+        return await self._generate_artifact(
+            "generate-presentation",
+            "pptx",
+            "guide",
+            plant_care_data,
+            plant_name,
+            deadline
+        )
+    
+    async def _generate_artifact(
+        self,
+        endpoint: str,
+        file_format: str,
+        kind: str,
+        plant_care_data: GeminiResponse,
+        plant_name: str,
+        deadline: Optional[Deadline] = None
+    ) -> NotebookLMResponse:
+        """
+        Run one generation operation and store its artifact.
+        
+        Args:
+            endpoint: API method that starts the operation
+            file_format: Requested output format (e.g. "pptx", "png")
+            kind: Artifact name used in the stored filename and messages
+            plant_care_data: Structured plant care guidance
+            plant_name: Name of the plant
+            deadline: Optional time budget, as for generate_visual_guide
             
+        Returns:
+            NotebookLM response; failures and timeouts have status "error"
+        """
+        timeout = self.timeout
+        if deadline is not None:
+            if not deadline.allows(NOTEBOOKLM_COST):
+                return NotebookLMResponse(
+                    status="skipped",
+                    file_url=None,
+                    file_type=None,
+                    message=f"Visual {kind} skipped to meet the request deadline"
+                )
+            timeout = deadline.timeout(self.timeout)
+        
+        payload = {
+            "title": f"{plant_name} Care Guide",
+            "content": self._convert_to_presentation_structure(plant_care_data, plant_name),
+            "format": file_format,
+            "template": "botanical",
+            "include_images": True
+        }
+        slug = slide_service.build_deck(plant_care_data, plant_name).slug
+        
+        try:
+            # Waiting for a free slot counts against the same budget
+            return await asyncio.wait_for(
+                self._run_operation(endpoint, payload, f"{slug}_notebooklm_{kind}", kind),
+                timeout
+            )
+        except asyncio.TimeoutError:
+            return NotebookLMResponse(
+                status="error",
+                file_url=None,
+                file_type=None,
+                message=f"Visual {kind} was not ready within {timeout:.0f}s"
+            )
         except httpx.HTTPError as e:
             return NotebookLMResponse(
                 status="error",
                 file_url=None,
                 file_type=None,
-                message=f"Failed to generate visual guide: {str(e)}"
+                message=f"Failed to generate visual {kind}: {str(e)}"
             )
         except Exception as e:
             return NotebookLMResponse(
@@ -105,6 +177,120 @@ class NotebookLMService:
                 message=f"Unexpected error: {str(e)}"
             )
     
+    async def _run_operation(
+        self,
+        endpoint: str,
+        payload: Dict[str, Any],
+        file_stem: str,
+        kind: str
+    ) -> NotebookLMResponse:
+        """
+        Submit a generation, poll it until done and download the result.
+        
+        If the caller gives up while the operation is still running, the
+        operation is cancelled upstream.
+        
+        Raises:
+            httpx.HTTPError: If a request to the API or the download fails
+            RuntimeError: If the operation finishes with an error or an
+                unexpected file type
+        """
+        async with self._slots:
+            operation = await self._api_request("POST", endpoint, json=payload)
+            try:
+                operation = await self._poll(operation)
+            except asyncio.CancelledError:
+                if operation.get("name"):
+                    asyncio.ensure_future(self._cancel_operation(operation["name"]))
+                raise
+            
+            result = operation.get("response") or {}
+            file_type = str(result.get("file_type", payload["format"])).lower()
+            if file_type not in ARTIFACT_FILE_TYPES:
+                raise RuntimeError(f"NotebookLM returned unexpected file type {file_type[:20]!r}")
+            filename = f"{file_stem}.{file_type}"
+            await self._download(result["file_url"], filename)
+        
+        return NotebookLMResponse(
+            status="success",
+            file_url=f"/files/{filename}",
+            file_type=file_type,
+            message=f"Visual {kind} generated successfully"
+        )
+    
+    async def _api_request(self, method: str, path: str, **kwargs: Any) -> Dict[str, Any]:
+        """
+        Send an authenticated API request on the pooled client.
+        
+        Returns:
+            Parsed JSON response body
+        """
+        response = await self._get_client().request(
+            method,
+            f"{self.base_url}/{path}",
+            headers={"Authorization": f"Bearer {self.api_key}"},
+            **kwargs
+        )
+        response.raise_for_status()
+        return response.json()
+    
+    async def _poll(self, operation: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Poll a long-running operation until it is done.
+        
+        The wait between polls starts at POLL_INITIAL and doubles up to
+        POLL_MAX, so quick generations are picked up promptly and slow
+        ones are not polled needlessly often.
+        
+        Args:
+            operation: Operation returned when the generation was submitted
+            
+        Returns:
+            The finished operation
+            
+        Raises:
+            RuntimeError: If the operation finished with an error
+        """
+        interval = POLL_INITIAL
+        while not operation.get("done"):
+            await asyncio.sleep(interval)
+            interval = min(interval * POLL_MULTIPLIER, POLL_MAX)
+            operation = await self._api_request("GET", operation["name"])
+        
+        if operation.get("error"):
+            raise RuntimeError(f"NotebookLM generation failed: {operation['error'].get('message', 'unknown error')}")
+        return operation
+    
+    async def _cancel_operation(self, name: str) -> None:
+        """Ask the API to stop an operation nobody is waiting for."""
+        try:
+            await self._api_request("POST", f"{name}:cancel")
+        except httpx.HTTPError as e:
+            if DEBUG_MODE:
+                print(f"Could not cancel NotebookLM operation {name}: {str(e)}")
+    
+    async def _download(self, file_url: str, filename: str) -> None:
+        """
+        Stream a finished artifact into the output directory.
+        
+        The file is written under a temporary name and moved into place
+        once complete, so a partial download is never served.
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, filename)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"  # Concurrent downloads of one file don't collide
+        try:
+            # Signed download URLs need no credentials; don't send ours
+            async with self._get_client().stream("GET", file_url) as response:
+                response.raise_for_status()
+                with open(tmp_path, "wb") as f:
+                    async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                        f.write(chunk)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    
     def _generate_mock_response(self, plant_name: str) -> NotebookLMResponse:
         """
         Generate a mock response for testing without API access.
@@ -128,7 +314,8 @@ class NotebookLMService:
     async def generate_infographic(
         self,
         plant_care_data: GeminiResponse,
-        plant_name: str
+        plant_name: str,
+        deadline: Optional[Deadline] = None
     ) -> NotebookLMResponse:
         """
         Generate an infographic from plant care data.
@@ -136,14 +323,12 @@ class NotebookLMService:
         Args:
             plant_care_data: Structured plant care guidance
             plant_name: Name of the plant
+            deadline: Optional time budget, as for generate_visual_guide
             
         Returns:
             NotebookLM response with infographic link or mock response
         """
-        # Similar implementation to generate_visual_guide
-        # but specifically for infographic format
-        
-        if not self.api_key or self.api_key == "your_notebooklm_api_key_here":
+        if not self._has_api_key():
             return NotebookLMResponse(
                 status="mock",
                 file_url=f"https://storage.googleapis.com/notebooklm-mock/{plant_name.lower().replace(' ', '-')}-infographic.png",
@@ -151,96 +336,38 @@ class NotebookLMService:
                 message=f"Mock infographic for {plant_name}. NotebookLM API integration pending."
             )
         
-        # Placeholder for actual API implementation
-        return self._generate_mock_response(plant_name)
+        return await self._generate_artifact(
+            "generate-infographic",
+            "png",
+            "infographic",
+            plant_care_data,
+            plant_name,
+            deadline
+        )
     
-    # Used when NotebookLM API becomes available
     def _convert_to_presentation_structure(
         self, 
-        plant_care_data: GeminiResponse
+        plant_care_data: GeminiResponse,
+        plant_name: str
     ) -> Dict[str, Any]:
         """
         Convert plant care data to a presentation-friendly structure.
         
+        Uses the same cached SlideDeck that the local renderers consume.
+        
         Args:
             plant_care_data: Structured plant care guidance
+            plant_name: Name of the plant
             
         Returns:
             Dictionary formatted for presentation generation
         """
-        slides = []
-        
-        # Slide 1: Title slide
-        slides.append({
-            "type": "title",
-            "content": {
-                "title": f"{plant_care_data.plant_overview.description}",
-                "subtitle": f"Difficulty: {plant_care_data.plant_overview.difficulty_level}"
-            }
-        })
-        
-        # Slide 2: Ideal conditions
-        conditions = plant_care_data.plant_overview.ideal_conditions
-        # Handle both dict and object access patterns
-        conditions_text = {}
-        if isinstance(conditions, dict):
-            conditions_text = conditions
-        else:
-            conditions_text = {
-                'temperature': getattr(conditions, 'temperature', 'Not specified'),
-                'humidity': getattr(conditions, 'humidity', 'Not specified'),
-                'sunlight': getattr(conditions, 'light', 'Not specified'),
-                'soil_ph': getattr(conditions, 'soil_ph', 'Not specified'),
-            }
-        
-        slides.append({
-            "type": "content",
-            "title": "Ideal Growing Conditions",
-            "content": conditions_text
-        })
-        
-        # Slides 3-N: Growth stages
-        for stage in plant_care_data.growth_stages:
-            slides.append({
-                "type": "content",
-                "title": stage.stage_name,
-                "content": {
-                    "duration": stage.duration,
-                    "care": stage.care_instructions,
-                    "indicators": stage.key_indicators
-                }
-            })
-        
-        # Daily care slide
-        slides.append({
-            "type": "content",
-            "title": "Daily Care Routine",
-            "content": plant_care_data.daily_care.dict()
-        })
-        
-        # Common problems slides
-        for problem in plant_care_data.common_problems:
-            slides.append({
-                "type": "problem_solution",
-                "title": problem.problem,
-                "content": {
-                    "symptoms": problem.symptoms,
-                    "solution": problem.solution,
-                    "prevention": problem.prevention
-                }
-            })
-        
-        # Final tips slide
-        slides.append({
-            "type": "tips",
-            "title": "Additional Tips",
-            "content": plant_care_data.additional_tips
-        })
+        deck = slide_service.build_deck(plant_care_data, plant_name)
         
         return {
-            "slides": slides,
-            "total_slides": len(slides),
-            "theme": "botanical"
+            "slides": [slide.model_dump() for slide in deck.slides],
+            "total_slides": deck.total_slides,
+            "theme": deck.theme
         }
 
 
@@ -9,8 +9,11 @@ from .plant import (
     GrowthStage,
     Problem,
     PlantOverview,
-    DailyCare
+    DailyCare,
+    WateringFrequency,
+    ExperienceLevel
 )
+from .slides import Slide, SlideDeck, SlideSection
 
 __all__ = [
     "PlantInputData",
@@ -22,5 +25,10 @@ __all__ = [
     "GrowthStage",
     "Problem",
     "PlantOverview",
-    "DailyCare"
+    "DailyCare",
+    "WateringFrequency",
+    "ExperienceLevel",
+    "Slide",
+    "SlideDeck",
+    "SlideSection"
 ]
@@ -3,9 +3,30 @@ Pydantic schemas for request and response validation.
 These models ensure type safety and automatic validation.
 """
 
-from pydantic import BaseModel, Field, validator
+from enum import Enum
+from pydantic import BaseModel, Field, PrivateAttr, validator
 from typing import List, Dict, Any, Optional
 
+from app.utils.token_usage import TokenUsage
+
+
+class WateringFrequency(str, Enum):
+    """Canonical watering frequencies."""
+    
+    DAILY = "Daily"
+    EVERY_FEW_DAYS = "Every few days"
+    WEEKLY = "Weekly"
+    BI_WEEKLY = "Bi-weekly"
+    MONTHLY = "Monthly"
+
+
+class ExperienceLevel(str, Enum):
+    """Canonical gardener experience levels."""
+    
+    BEGINNER = "Beginner"
+    INTERMEDIATE = "Intermediate"
+    ADVANCED = "Advanced"
+
 
 class PlantInputData(BaseModel):
     """
@@ -68,6 +89,10 @@ class PlantInputData(BaseModel):
         """Remove leading and trailing whitespace from string fields."""
         return v.strip() if isinstance(v, str) else v
     
+    # Name as the user typed it, set on canonical inputs (see
+    # app.utils.canonical); the prompt uses it, cache keys do not
+    _display_name: Optional[str] = PrivateAttr(default=None)
+    
     class Config:
         """Pydantic configuration"""
         json_schema_extra = {
@@ -132,6 +157,15 @@ class GeminiResponse(BaseModel):
     daily_care: DailyCare
     common_problems: List[Problem]
     additional_tips: List[str]
+    
+    # Sections filled from stale cache or mock data after generation failed
+    _fallback_sections: List[str] = PrivateAttr(default_factory=list)
+    # Models that answered live calls for this guide
+    _models: List[str] = PrivateAttr(default_factory=list)
+    # Tokens and cost of those calls
+    _usage: TokenUsage = PrivateAttr(default_factory=TokenUsage)
+    # Sections built from output that was truncated and then repaired
+    _truncated_sections: List[str] = PrivateAttr(default_factory=list)
 
 
 class NotebookLMResponse(BaseModel):
@@ -145,6 +179,7 @@ class NotebookLMResponse(BaseModel):
     file_url: Optional[str] = None
     file_type: Optional[str] = None
     message: str
+    artifact: Optional[str] = None  # Which configured output this is, e.g. "pptx"
 
 
 class PlantGuideResponse(BaseModel):
@@ -156,7 +191,8 @@ class PlantGuideResponse(BaseModel):
     
     success: bool
     plant_care_guidance: GeminiResponse
-    visual_guide: NotebookLMResponse
+    visual_guide: NotebookLMResponse  # The first of visual_guides
+    visual_guides: List[NotebookLMResponse] = []
     metadata: Dict[str, Any]
     
     class Config:
@@ -187,6 +223,22 @@ class PlantGuideResponse(BaseModel):
                     "file_type": "pptx",
                     "message": "Visual guide generated successfully"
                 },
+               "visual_guides": [
+                    {
+                        "status": "success",
+                        "file_url": "/files/tomato_care_guide.pptx",
+                        "file_type": "pptx",
+                        "message": "PPT visual guide generated successfully",
+                        "artifact": "pptx"
+                    },
+                    {
+                        "status": "success",
+                        "file_url": "/files/tomato_notebooklm_infographic.png",
+                        "file_type": "png",
+                        "message": "Visual infographic generated successfully",
+                        "artifact": "infographic"
+                    }
+                ],
                "metadata": {
                     "timestamp": "2026-01-27T10:00:00Z",
                     "processing_time_seconds": 2.5
@@ -202,6 +254,8 @@ class HealthCheckResponse(BaseModel):
     status: str
     message: str
     version: str = "1.0.0"
+    ready: bool = True
+    startup: Optional[Dict[str, Any]] = None  # Import and warmup timings
 
 
 class ErrorResponse(BaseModel):
@@ -0,0 +1,48 @@
+"""
+Pydantic schemas for the format-neutral slide representation.
+
+A SlideDeck is built once per plant guide and consumed by every
+renderer (PPTX, PDF, HTML) as well as the NotebookLM payload.
+"""
+
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+class SlideSection(BaseModel):
+    """A labelled block of slide content (paragraph and/or bullet list)."""
+
+    heading: Optional[str] = None
+    text: Optional[str] = None
+    bullets: List[str] = []
+    inline: bool = False  # Render as a single "heading: text" line
+
+
+class Slide(BaseModel):
+    """
+    Schema for a single slide.
+
+    `body` holds the pre-joined plain-text rendering of `sections`, so
+    text-based renderers never rebuild it.
+    """
+
+    type: str  # "title", "content", "problem_solution" or "tips"
+    title: str
+    subtitle: Optional[str] = None
+    sections: List[SlideSection] = []
+    body: str = ""
+
+
+class SlideDeck(BaseModel):
+    """Schema for a complete, renderer-agnostic presentation."""
+
+    title: str
+    # Safe file-name stem, unique to the guide's content
+    slug: str
+    theme: str = "botanical"
+    slides: List[Slide]
+
+    @property
+    def total_slides(self) -> int:
+        """Number of slides in the deck."""
+        return len(self.slides)
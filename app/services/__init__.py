@@ -2,10 +2,15 @@
 
 Orchestrates all services including:
 - Gemini AI for plant guidance generation
-- PPT Service for visual guide creation
+- Slide Service for the shared, format-neutral slide deck
+- PPT, PDF and HTML services for visual guide creation
+- Guide Store for cross-worker caching of generated guides
 """
 
-from .plant import router as plant_router
+from .slide_service import slide_service
 from .ppt_service import ppt_service
+from .pdf_service import pdf_service
+from .html_service import html_service
+from .guide_store import guide_store
 
-__all__ = ["plant_router", "ppt_service"]
\ No newline at end of file
+__all__ = ["slide_service", "ppt_service", "pdf_service", "html_service", "guide_store"]
\ No newline at end of file
@@ -0,0 +1,272 @@
+"""
+Guide Generation Pipeline
+
+Runs the full Gemini -> visual guide -> response flow for one set of
+plant inputs and writes the serialized result into the guide store.
+Shared by the API endpoint and the offline pre-generation CLI so both
+produce identical stored guides.
+"""
+
+import asyncio
+import os
+import time
+from datetime import datetime
+from typing import List, Optional
+
+from app.schemas.plant import GeminiResponse, PlantInputData, PlantGuideResponse, NotebookLMResponse
+from app.routes.gemini import gemini_service
+from app.routes.notebooklm import notebooklm_service
+from app.services.pdf_service import pdf_service
+from app.services.html_service import html_service
+from app.services.ppt_service import ppt_service
+from app.services.guide_store import guide_store, guide_id_for, StoredGuide
+from app.services.readiness import readiness_probe
+from app.services.usage_ledger import usage_ledger
+from app.utils.canonical import canonicalizer
+from app.utils.deadline import Deadline, NOTEBOOKLM_COST, PPT_RENDER_COST
+from app.utils.metrics import metrics
+from app.utils.scheduler import INTERACTIVE, priority_scope
+
+
+# Guides with sections filled from fallbacks are kept only briefly, so the
+# next request after the upstream recovers regenerates them
+FALLBACK_GUIDE_TTL = int(os.getenv("FALLBACK_GUIDE_TTL", "300"))
+
+# Visual outputs produced for each guide, in response order; the first is
+# also returned as `visual_guide`. Each has its own timeout in seconds.
+ARTIFACT_GENERATORS = {
+    "pptx": ppt_service.generate,
+    "infographic": notebooklm_service.generate_infographic,
+    "pdf": pdf_service.generate,
+    "html": html_service.generate
+}
+ARTIFACT_COSTS = {
+    "pptx": PPT_RENDER_COST,
+    "infographic": NOTEBOOKLM_COST,
+    "pdf": PPT_RENDER_COST,
+    "html": PPT_RENDER_COST
+}
+VISUAL_ARTIFACTS = [name.strip() for name in os.getenv("VISUAL_ARTIFACTS", "pptx").split(",") if name.strip()]
+ARTIFACT_TIMEOUTS = {
+    "pptx": float(os.getenv("VISUAL_TIMEOUT_PPTX", "10")),
+    "infographic": float(os.getenv("VISUAL_TIMEOUT_INFOGRAPHIC", "60")),
+    "pdf": float(os.getenv("VISUAL_TIMEOUT_PDF", "10")),
+    "html": float(os.getenv("VISUAL_TIMEOUT_HTML", "10"))
+}
+
+# Metadata keys marking a guide that is not the full result
+DEGRADED_METADATA = ("fallback_sections", "truncated_sections", "visual_guide_degraded", "cache_only")
+
+_unknown = set(VISUAL_ARTIFACTS) - set(ARTIFACT_GENERATORS)
+if _unknown or not VISUAL_ARTIFACTS:
+    raise ValueError(
+        f"VISUAL_ARTIFACTS must list some of {', '.join(ARTIFACT_GENERATORS)}; "
+        f"unknown: {', '.join(sorted(_unknown)) or 'none given'}"
+    )
+
+
+def is_degraded(metadata: dict) -> bool:
+    """
+    Check whether a guide's metadata marks it as less than the full guide.
+
+    Args:
+        metadata: The `metadata` block of a PlantGuideResponse
+
+    Returns:
+        True if it has fallback or truncated sections, a degraded visual
+        guide, or was built from cache only
+    """
+    return any(key in metadata for key in DEGRADED_METADATA)
+
+
+class GuidePipeline:
+    """
+    Orchestrates guide generation and storage.
+    """
+
+    async def run(
+        self,
+        plant_data: PlantInputData,
+        render_visual: bool = True,
+        deadline: Optional[Deadline] = None,
+        priority: str = INTERACTIVE,
+        store: bool = True,
+        client_id: Optional[str] = None
+    ) -> StoredGuide:
+        """
+        Generate a plant guide and store it under its stable id.
+
+        Inputs are canonicalized first, so the prompt, the Gemini cache key
+        and the guide id are the same for all equivalent requests.
+
+        The configured visual outputs are produced concurrently, each
+        under its own timeout, so they cost as long as the slowest one
+        rather than their sum; one failing leaves the others intact.
+
+        With a deadline, Gemini gets the budget minus the expected cost of
+        the first visual output, and the outputs share whatever is left.
+        Guides built from fallbacks or truncated output, or with a failed
+        output, are stored only briefly. Guides degraded under a deadline
+        are served once and not stored, so requests without one still get
+        the full guide.
+
+        Gemini usage is charged to the client and the plant. Once either
+        has used up its budget, Gemini runs in cache-only mode and the
+        guide is served once, not stored, so it never reaches clients
+        still within budget.
+
+        Args:
+            plant_data: Validated plant input data
+            render_visual: Whether to produce the visual guides
+            deadline: Optional time budget for the whole run
+            priority: Scheduling class for upstream calls (see
+                app.utils.scheduler)
+            store: Whether to keep the guide in the guide store; partial
+                guides served once (e.g. without their visual guide) are
+                not, so later full requests still render it
+            client_id: Client the Gemini usage is charged to, or None for
+                internal work
+
+        Returns:
+            The stored guide entry
+
+        Raises:
+            Exception: If Gemini generation or rendering fails
+        """
+        start_time = time.time()
+        plant_data = canonicalizer.canonicalize(plant_data)
+        guide_id = guide_id_for(plant_data)
+
+        # Step 1: Generate plant care guidance using Gemini AI
+        print(f"Generating plant guide for: {plant_data.plant_name}")
+        gemini_deadline = deadline
+        if deadline is not None and render_visual:
+            gemini_deadline = deadline.reserve(ARTIFACT_COSTS[VISUAL_ARTIFACTS[0]])
+        over_budget = usage_ledger.over_budget(client_id, plant_data.plant_name)
+        if over_budget is not None:
+            metrics.increment(f"usage_budget_exceeded_{over_budget}")
+            print(f"{over_budget.capitalize()} budget exceeded, serving {plant_data.plant_name} from cache only")
+        with priority_scope(priority):
+            gemini_response = await gemini_service.generate_plant_guide(
+                plant_data,
+                gemini_deadline,
+                cache_only=over_budget is not None
+            )
+        usage_ledger.record(client_id, plant_data.plant_name, gemini_response._usage)
+
+        # Step 2: Produce the visual guides
+        if render_visual:
+            print(f"Generating visual guides for: {plant_data.plant_name}")
+            visual_guides = await self._generate_visuals(gemini_response, plant_data.plant_name, deadline)
+            visual_guide = visual_guides[0]
+        else:
+            visual_guides = []
+            visual_guide = NotebookLMResponse(
+                status="skipped",
+                message="Visual guide was not requested"
+            )
+
+        # Step 3: Calculate processing time
+        processing_time = time.time() - start_time
+        metrics.observe("guide_generation_seconds", processing_time)
+        readiness_probe.record_latency(processing_time)
+
+        # Step 4: Format and combine responses
+        metadata = {
+            "plant_name": plant_data.plant_name,
+            "plant_type": plant_data.plant_type,
+            "climate": plant_data.climate,
+            "sunlight_hours": plant_data.sunlight_hours,
+            "soil_type": plant_data.soil_type,
+            "watering_frequency": plant_data.watering_frequency,
+            "experience_level": plant_data.experience_level,
+            "guide_id": guide_id,
+            "ai_model": ", ".join(gemini_response._models) or "cached",
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "processing_time_seconds": round(processing_time, 2)
+        }
+        if gemini_response._usage.calls:
+            metadata["token_usage"] = gemini_response._usage.as_dict()
+        if over_budget is not None:
+            metadata["cache_only"] = f"{over_budget} budget exceeded"
+        if gemini_response._fallback_sections:
+            metadata["fallback_sections"] = gemini_response._fallback_sections
+        if gemini_response._truncated_sections:
+            metadata["truncated_sections"] = gemini_response._truncated_sections
+        if any(guide.status in ("cached", "skipped", "error") for guide in visual_guides):
+            metadata["visual_guide_degraded"] = True
+        degraded = is_degraded(metadata)
+
+        # Both parts are already validated, so skip re-validating them
+        final_response = PlantGuideResponse.model_construct(
+            success=True,
+            plant_care_guidance=gemini_response,
+            visual_guide=visual_guide,
+            visual_guides=visual_guides,
+            metadata=metadata
+        )
+
+        # Step 5: Store the serialized guide for later requests
+        body = final_response.model_dump_json().encode("utf-8")
+        if store and over_budget is None and not (degraded and deadline is not None):
+            stored = guide_store.put(guide_id, body, ttl=FALLBACK_GUIDE_TTL if degraded else None)
+        else:
+            stored = guide_store.transient(guide_id, body)
+
+        print(f"Successfully generated guide in {processing_time:.2f} seconds")
+        return stored
+
+    async def _generate_visuals(
+        self,
+        gemini_response: GeminiResponse,
+        plant_name: str,
+        deadline: Optional[Deadline] = None
+    ) -> List[NotebookLMResponse]:
+        """
+        Produce every configured visual output concurrently.
+
+        Returns:
+            One response per entry of VISUAL_ARTIFACTS, in that order
+        """
+        return list(await asyncio.gather(*(
+            self._generate_visual(name, gemini_response, plant_name, deadline)
+            for name in VISUAL_ARTIFACTS
+        )))
+
+    async def _generate_visual(
+        self,
+        name: str,
+        gemini_response: GeminiResponse,
+        plant_name: str,
+        deadline: Optional[Deadline] = None
+    ) -> NotebookLMResponse:
+        """
+        Produce one visual output, turning a timeout or failure into an
+        error response instead of failing the guide.
+        """
+        # Generators honour the request deadline themselves (skipping or
+        # reusing earlier files), so this only bounds a stuck output. A
+        # render that times out in its thread finishes in the background.
+        timeout = ARTIFACT_TIMEOUTS[name]
+        try:
+            response = await asyncio.wait_for(
+                ARTIFACT_GENERATORS[name](gemini_response, plant_name, deadline),
+                timeout
+            )
+        except asyncio.TimeoutError:
+            response = NotebookLMResponse(
+                status="error",
+                message=f"Visual guide ({name}) timed out after {timeout:g}s"
+            )
+        except Exception as e:
+            print(f"Visual guide ({name}) failed: {str(e)}")
+            response = NotebookLMResponse(
+                status="error",
+                message=f"Failed to generate visual guide ({name}): {str(e)}"
+            )
+        response.artifact = name
+        return response
+
+
+# Singleton
+guide_pipeline = GuidePipeline()
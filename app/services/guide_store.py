@@ -0,0 +1,174 @@
+"""
+Guide Store Service
+
+Keeps generated plant guides under a stable id derived from the request
+inputs, so they can be fetched again with GET /plant-guides/{id} and
+cached by browsers and intermediaries.
+
+Guides live in the host-wide shared cache, fronted by a small
+per-process LRU so hot guides skip the SQLite read entirely. While
+Gemini cassettes are recorded or replayed, guides are kept in the LRU
+only, so a run never serves guides stored by an earlier one.
+"""
+
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from email.utils import formatdate
+from typing import Dict, Optional
+
+from pydantic import BaseModel
+
+from app.schemas.plant import PlantInputData
+from app.utils.cassettes import CASSETTE_MODE
+from app.utils.memory import deep_sizeof
+from app.utils.shared_cache import shared_cache
+
+
+# Configuration
+MAX_ENTRIES = int(os.getenv("GUIDE_STORE_MAX_ENTRIES", "1024"))
+NAMESPACE = "guides"
+CACHE_MAX_AGE = int(os.getenv("GUIDE_CACHE_MAX_AGE", "3600"))
+
+
+def guide_id_for(plant_data: PlantInputData) -> str:
+    """
+    Derive the stable guide id for a set of plant inputs.
+
+    Args:
+        plant_data: Canonical plant input data (see app.utils.canonical)
+
+    Returns:
+        24-character hex id
+    """
+    return hashlib.sha256(plant_data.model_dump_json().encode("utf-8")).hexdigest()[:24]
+
+
+class StoredGuide(BaseModel):
+    """A serialized guide together with its HTTP validators."""
+
+    guide_id: str
+    body: bytes
+    etag: str
+    created_at: float
+    expires_at: float
+
+    @property
+    def last_modified(self) -> str:
+        """Creation time formatted as an HTTP date."""
+        return formatdate(self.created_at, usegmt=True)
+
+    @property
+    def is_transient(self) -> bool:
+        """Whether the guide is served once rather than stored."""
+        return self.expires_at <= self.created_at
+
+
+def _entry(guide_id: str, body: bytes, created_at: float, expires_at: float) -> StoredGuide:
+    """Wrap serialized guide bytes with their validators."""
+    return StoredGuide(
+        guide_id=guide_id,
+        body=body,
+        etag='"' + hashlib.sha256(body).hexdigest()[:32] + '"',
+        created_at=created_at,
+        expires_at=expires_at
+    )
+
+
+class GuideStore:
+    """
+    Store of pre-serialized plant guide responses.
+
+    Reads go to a bounded in-memory LRU first and fall back to the shared
+    cache, so a guide generated by any worker is served by all of them.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, shared: bool = CASSETTE_MODE == "off"):
+        """
+        Initialize an empty store.
+
+        Args:
+            max_entries: Guides kept in the in-process LRU
+            shared: Whether guides are also kept in the shared cache
+        """
+        self.max_entries = max_entries
+        self.shared = shared
+        self._entries: "OrderedDict[str, StoredGuide]" = OrderedDict()
+
+    def get(self, guide_id: str) -> Optional[StoredGuide]:
+        """
+        Look up a stored guide.
+
+        Args:
+            guide_id: Stable guide id
+
+        Returns:
+            Stored guide, or None if unknown
+        """
+        entry = self._entries.get(guide_id)
+        if entry is not None:
+            if entry.expires_at > time.time():
+                self._entries.move_to_end(guide_id)
+                return entry
+            del self._entries[guide_id]
+
+        if not self.shared:
+            return None
+        cached = shared_cache.get(NAMESPACE, guide_id)
+        if cached is None:
+            return None
+
+        entry = _entry(guide_id, *cached)
+        self._remember(entry)
+        return entry
+
+    def put(self, guide_id: str, body: bytes, ttl: Optional[int] = None) -> StoredGuide:
+        """
+        Store a serialized guide response.
+
+        Args:
+            guide_id: Stable guide id
+            body: JSON-encoded PlantGuideResponse
+            ttl: Lifetime in seconds (defaults to the shared cache TTL)
+
+        Returns:
+            The stored entry with its ETag and timestamp
+        """
+        if self.shared:
+            created_at, expires_at = shared_cache.set(NAMESPACE, guide_id, body, ttl=ttl)
+        else:
+            created_at = time.time()
+            expires_at = created_at + (shared_cache.default_ttl if ttl is None else ttl)
+        entry = _entry(guide_id, body, created_at, expires_at)
+        self._remember(entry)
+        return entry
+
+    def transient(self, guide_id: str, body: bytes) -> StoredGuide:
+        """
+        Wrap a serialized guide that is served once and not stored.
+
+        Args:
+            guide_id: Stable guide id
+            body: JSON-encoded PlantGuideResponse
+
+        Returns:
+            An entry that is already expired
+        """
+        now = time.time()
+        return _entry(guide_id, body, now, now)
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Number of guides held in memory and their approximate size."""
+        return {"entries": len(self._entries), "bytes": deep_sizeof(self._entries)}
+
+    def _remember(self, entry: StoredGuide) -> None:
+        """Add an entry to the in-process LRU, evicting the oldest."""
+        self._entries[entry.guide_id] = entry
+        self._entries.move_to_end(entry.guide_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+# Singleton
+guide_store = GuideStore()
@@ -0,0 +1,121 @@
+"""
+HTML Visual Guide Generator Service
+
+Renders the shared SlideDeck as a single static HTML page that can be
+served from /files or opened directly in a browser.
+"""
+
+import asyncio
+import os
+from html import escape
+from typing import Optional
+
+from app.schemas.plant import GeminiResponse, NotebookLMResponse
+from app.schemas.slides import Slide, SlideDeck
+from app.services.slide_service import slide_service
+from app.utils.deadline import Deadline, PPT_RENDER_COST
+
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ font-family: sans-serif; background: #f4f8f2; color: #1f3a1f; margin: 0; }}
+section {{ background: #fff; max-width: 860px; margin: 24px auto; padding: 24px 32px; border-radius: 12px; }}
+h1, h2 {{ color: #2e7d32; }}
+</style>
+</head>
+<body>
+{slides}
+</body>
+</html>
+"""
+
+
+class HTMLService:
+    """
+    Generates static HTML visual guides from slide decks.
+    """
+
+    def __init__(self):
+        self.output_dir = "generated_files"
+        os.makedirs(self.output_dir, exist_ok=True)
+
+    async def generate(
+        self,
+        plant_care_data: GeminiResponse,
+        plant_name: str,
+        deadline: Optional[Deadline] = None
+    ) -> NotebookLMResponse:
+        """
+        Generate an HTML guide from plant care data.
+
+        The page is "skipped" when the deadline leaves less than
+        PPT_RENDER_COST.
+        """
+        deck = slide_service.build_deck(plant_care_data, plant_name)
+        if deadline is not None and not deadline.allows(PPT_RENDER_COST):
+            return NotebookLMResponse(
+                status="skipped",
+                message="HTML guide skipped to meet the request deadline"
+            )
+        return await asyncio.to_thread(self.render, deck)
+
+    def render(self, deck: SlideDeck) -> NotebookLMResponse:
+        """
+        Render a prepared slide deck to an .html file.
+        """
+        filename = f"{deck.slug}_care_guide.html"
+        file_path = os.path.join(self.output_dir, filename)
+
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write(self.to_html(deck))
+
+        return NotebookLMResponse(
+            status="success",
+            file_url=f"/files/{filename}",
+            file_type="html",
+            message="HTML visual guide generated successfully"
+        )
+
+    def to_html(self, deck: SlideDeck) -> str:
+        """
+        Serialize a slide deck to an HTML document.
+
+        Args:
+            deck: Slide deck to render
+
+        Returns:
+            Complete HTML document
+        """
+        slides = "\n".join(self._render_slide(slide) for slide in deck.slides)
+        return PAGE_TEMPLATE.format(title=escape(deck.title), slides=slides)
+
+    def _render_slide(self, slide: Slide) -> str:
+        """Render a single slide as an HTML section."""
+        if slide.type == "title":
+            parts = [f"<h1>{escape(slide.title)}</h1>"]
+            if slide.subtitle:
+                parts.append(f"<p>{escape(slide.subtitle)}</p>")
+            return "<section>" + "".join(parts) + "</section>"
+
+        parts = [f"<h2>{escape(slide.title)}</h2>"]
+        for section in slide.sections:
+            if section.inline:
+                parts.append(f"<p><strong>{escape(section.heading)}:</strong> {escape(section.text)}</p>")
+                continue
+            if section.heading:
+                parts.append(f"<h3>{escape(section.heading)}</h3>")
+            if section.text:
+                parts.append(f"<p>{escape(section.text)}</p>")
+            if section.bullets:
+                items = "".join(f"<li>{escape(item)}</li>" for item in section.bullets)
+                parts.append(f"<ul>{items}</ul>")
+
+        return "<section>" + "".join(parts) + "</section>"
+
+
+# Singleton
+html_service = HTMLService()
@@ -0,0 +1,124 @@
+"""
+Idempotency Key Service
+
+Remembers the outcome of POST /generate-plant-guide per Idempotency-Key
+header, so a client retrying after a timeout gets the original response
+or attaches to the generation that is still running, instead of
+starting a new one.
+
+Each key owns a task that waits on the shared in-flight generation. The
+task keeps the generation alive when the original client disconnects,
+which is exactly when a retry is about to arrive.
+"""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+
+from app.services.guide_store import StoredGuide
+from app.utils.metrics import metrics
+
+
+# Configuration
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+IDEMPOTENCY_TTL = int(os.getenv("IDEMPOTENCY_TTL", "86400"))  # Seconds a finished key is remembered
+MAX_KEYS = int(os.getenv("IDEMPOTENCY_MAX_KEYS", "10000"))
+MAX_KEY_LENGTH = 255
+
+
+class IdempotencyConflict(Exception):
+    """Raised when a key is reused with a different request body."""
+
+
+class _Record:
+    """The request a key was first used with, and its generation."""
+
+    def __init__(self, guide_id: str, task: "asyncio.Task[StoredGuide]"):
+        self.guide_id = guide_id
+        self.task = task
+        self.expires_at: Optional[float] = None  # Set once the task finishes
+
+
+class IdempotencyStore:
+    """
+    Bounded map from idempotency key to generation, evicting least
+    recently used keys first.
+    """
+
+    def __init__(self, max_keys: int = MAX_KEYS, ttl: int = IDEMPOTENCY_TTL):
+        """Initialize an empty store."""
+        self.max_keys = max_keys
+        self.ttl = ttl
+        self._records: "OrderedDict[str, _Record]" = OrderedDict()
+
+    def __len__(self) -> int:
+        """Number of keys remembered."""
+        return len(self._records)
+
+    async def run(
+        self,
+        key: str,
+        guide_id: str,
+        generate: Callable[[], Awaitable[StoredGuide]]
+    ) -> StoredGuide:
+        """
+        Return the stored guide for a key, generating it on first use.
+
+        Cancelling the caller does not cancel the generation; it keeps
+        running so a retry with the same key can pick up its result.
+
+        Args:
+            key: Client-supplied idempotency key
+            guide_id: Id of the guide the request asks for
+            generate: Produces the guide if the key is new
+
+        Returns:
+            The stored guide
+
+        Raises:
+            IdempotencyConflict: If the key was used for a different guide
+            Exception: Whatever the generation raised
+        """
+        record = self._lookup(key)
+        if record is None:
+            record = _Record(guide_id, asyncio.ensure_future(generate()))
+            record.task.add_done_callback(lambda task: self._finished(key, record, task))
+            self._remember(key, record)
+        elif record.guide_id != guide_id:
+            raise IdempotencyConflict(f"{IDEMPOTENCY_HEADER} was already used for a different request")
+        else:
+            metrics.increment("idempotent_replays")
+
+        return await asyncio.shield(record.task)
+
+    def _lookup(self, key: str) -> Optional[_Record]:
+        """Return the live record for a key, dropping it if expired."""
+        record = self._records.get(key)
+        if record is None:
+            return None
+        if record.expires_at is not None and record.expires_at <= time.time():
+            del self._records[key]
+            return None
+        self._records.move_to_end(key)
+        return record
+
+    def _finished(self, key: str, record: _Record, task: "asyncio.Task[StoredGuide]") -> None:
+        """Start a finished key's retention window; forget failed ones."""
+        if task.cancelled() or task.exception() is not None:
+            # Let a retry try again rather than replaying the failure
+            if self._records.get(key) is record:
+                del self._records[key]
+            return
+        record.expires_at = time.time() + self.ttl
+
+    def _remember(self, key: str, record: _Record) -> None:
+        """Add a record, evicting the least recently used keys."""
+        self._records[key] = record
+        while len(self._records) > self.max_keys:
+            self._records.popitem(last=False)
+
+
+# Singleton
+idempotency_store = IdempotencyStore()
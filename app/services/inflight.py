@@ -0,0 +1,78 @@
+"""
+In-flight Generation Registry
+
+Coalesces concurrent requests for the same guide onto one running task
+and tracks how many callers are still waiting on it. When the last
+waiter goes away (e.g. every client disconnected), the shared task is
+cancelled so no upstream work runs for nobody.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+from app.utils.metrics import metrics
+
+
+class _Flight:
+    """A shared task and its number of waiters."""
+
+    def __init__(self, task: "asyncio.Task[Any]"):
+        self.task = task
+        self.waiters = 0
+
+
+class InflightRegistry:
+    """
+    Single-flight execution keyed by guide id.
+    """
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._flights: Dict[str, _Flight] = {}
+
+    def __len__(self) -> int:
+        """Number of distinct generations currently running."""
+        return len(self._flights)
+
+    async def join(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Wait for the result of the work identified by key.
+
+        The first caller starts `factory()` as a task; later callers with
+        the same key attach to it. If a caller is cancelled, it detaches,
+        and the task itself is cancelled only when no waiters remain.
+
+        Args:
+            key: Identity of the work (the guide id)
+            factory: Creates the coroutine to run if none is in flight
+
+        Returns:
+            The task's result
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(factory()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _task: self._discard(key, flight))
+        else:
+            metrics.increment("generations_coalesced")
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if not flight.task.done() and flight.waiters == 1:
+                flight.task.cancel()
+                metrics.increment("generations_cancelled")
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _discard(self, key: str, flight: _Flight) -> None:
+        """Forget a finished flight, unless a newer one replaced it."""
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+
+# Singleton
+inflight_registry = InflightRegistry()
@@ -0,0 +1,148 @@
+"""
+PDF Visual Guide Generator Service
+
+Renders the shared SlideDeck as a simple PDF, one page per slide,
+using the built-in Helvetica fonts so no extra dependency is needed.
+"""
+
+import asyncio
+import os
+import textwrap
+from typing import List, Optional
+
+from app.schemas.plant import GeminiResponse, NotebookLMResponse
+from app.schemas.slides import SlideDeck
+from app.services.slide_service import slide_service
+from app.utils.deadline import Deadline, PPT_RENDER_COST
+
+
+# Landscape A4 in PDF points
+PAGE_WIDTH = 842
+PAGE_HEIGHT = 595
+MARGIN = 50
+TITLE_SIZE = 24
+BODY_SIZE = 13
+LINE_HEIGHT = 18
+WRAP_WIDTH = 105
+
+
+def _escape(text: str) -> bytes:
+    """Escape text for use inside a PDF string literal."""
+    text = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return text.encode("latin-1", "replace")
+
+
+class PDFService:
+    """
+    Generates PDF visual guides from slide decks.
+    """
+
+    def __init__(self):
+        self.output_dir = "generated_files"
+        os.makedirs(self.output_dir, exist_ok=True)
+
+    async def generate(
+        self,
+        plant_care_data: GeminiResponse,
+        plant_name: str,
+        deadline: Optional[Deadline] = None
+    ) -> NotebookLMResponse:
+        """
+        Generate a PDF guide from plant care data.
+
+        The PDF is "skipped" when the deadline leaves less than
+        PPT_RENDER_COST.
+        """
+        deck = slide_service.build_deck(plant_care_data, plant_name)
+        if deadline is not None and not deadline.allows(PPT_RENDER_COST):
+            return NotebookLMResponse(
+                status="skipped",
+                message="PDF guide skipped to meet the request deadline"
+            )
+        return await asyncio.to_thread(self.render, deck)
+
+    def render(self, deck: SlideDeck) -> NotebookLMResponse:
+        """
+        Render a prepared slide deck to a .pdf file.
+        """
+        filename = f"{deck.slug}_care_guide.pdf"
+        file_path = os.path.join(self.output_dir, filename)
+
+        with open(file_path, "wb") as f:
+            f.write(self.to_bytes(deck))
+
+        return NotebookLMResponse(
+            status="success",
+            file_url=f"/files/{filename}",
+            file_type="pdf",
+            message="PDF visual guide generated successfully"
+        )
+
+    def to_bytes(self, deck: SlideDeck) -> bytes:
+        """
+        Serialize a slide deck to PDF bytes.
+
+        Args:
+            deck: Slide deck to render
+
+        Returns:
+            Complete PDF document
+        """
+        # Objects 1-4 are fixed: catalog, page tree, regular and bold fonts.
+        # Each page then takes two objects: the page and its content stream.
+        objects: List[bytes] = [b"", b"", b"", b""]
+        page_ids = []
+
+        for slide in deck.slides:
+            stream = self._page_stream(slide.title, slide.subtitle or slide.body)
+            page_id = len(objects) + 1
+            content_id = page_id + 1
+            page_ids.append(page_id)
+            objects.append(
+                b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] "
+                b"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents %d 0 R >>"
+                % (PAGE_WIDTH, PAGE_HEIGHT, content_id)
+            )
+            objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+
+        kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+        objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+        objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+        objects[2] = b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"
+        objects[3] = b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>"
+
+        out = bytearray(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(len(out))
+            out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+
+        xref_offset = len(out)
+        out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+        for offset in offsets:
+            out += b"%010d 00000 n \n" % offset
+        out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+            len(objects) + 1,
+            xref_offset
+        )
+        return bytes(out)
+
+    def _page_stream(self, title: str, body: str) -> bytes:
+        """Build the content stream for a single page."""
+        y = PAGE_HEIGHT - MARGIN - TITLE_SIZE
+        ops = [b"BT /F2 %d Tf %d %d Td (%s) Tj ET" % (TITLE_SIZE, MARGIN, y, _escape(title))]
+        y -= TITLE_SIZE + LINE_HEIGHT
+
+        for paragraph in body.split("\n"):
+            lines = textwrap.wrap(paragraph, WRAP_WIDTH) or [""]
+            for line in lines:
+                if y < MARGIN:
+                    break
+                ops.append(b"BT /F1 %d Tf %d %d Td (%s) Tj ET" % (BODY_SIZE, MARGIN, y, _escape(line)))
+                y -= LINE_HEIGHT
+
+        return b"\n".join(ops)
+
+
+# Singleton
+pdf_service = PDFService()
@@ -6,21 +6,117 @@ Handles request validation, service orchestration, and response formatting.
 """
 
 import time
-from datetime import datetime
-from fastapi import APIRouter, HTTPException, status
+from email.utils import parsedate_to_datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import FileResponse
 from app.schemas.plant import (
     PlantInputData,
     PlantGuideResponse,
     HealthCheckResponse,
     ErrorResponse
 )
+from app.services.guide_store import guide_store, guide_id_for, StoredGuide, CACHE_MAX_AGE
+from app.services.guide_pipeline import guide_pipeline
+from app.services.idempotency import (
+    idempotency_store,
+    IdempotencyConflict,
+    IDEMPOTENCY_HEADER,
+    MAX_KEY_LENGTH
+)
+from app.services.inflight import inflight_registry
+from app.services.readiness import readiness_probe
+from app.services.usage_ledger import usage_ledger, client_id_for, CLIENT_HEADER
+from app.services.slide_service import slide_service
 from app.routes.gemini import gemini_service
-from app.services.ppt_service import ppt_service
+from app.utils.admin import require_admin
+from app.utils.canonical import canonicalizer
+from app.utils.deadline import Deadline, DEADLINE_HEADER
+from app.utils.disconnect import ClientDisconnected, run_while_connected
+from app.utils.fieldsets import Fieldset, FIELD_NAMES
+from app.utils.memory import memory_tracer, process_memory, GROUP_BY, TRACEMALLOC_FRAMES
+from app.utils.metrics import metrics
+from app.utils.profiling import profile_store
+from app.utils.responses import FastJSONResponse
+from app.utils.scheduler import INTERACTIVE, PRIORITY_HEADER, REQUEST_PRIORITIES
+from app.utils.shared_cache import shared_cache
+from app.utils.startup import startup_state
 from typing import Optional
 
 # Create router
 router = APIRouter()
 
+FIELDS_DESCRIPTION = (
+    "Comma-separated parts of the guide to return: "
+    + ", ".join(FIELD_NAMES)
+    + ". Leaving out visual_guide also skips rendering it."
+)
+COMPACT_DESCRIPTION = "Omit the metadata block"
+GROUP_BY_DESCRIPTION = "Group allocations by " + ", ".join(GROUP_BY)
+
+
+def _cache_headers(entry: StoredGuide) -> dict:
+    """
+    Build the caching headers for a stored guide.
+
+    Clients may cache it for CACHE_MAX_AGE at most, and never past the
+    point where the store drops it, so short-lived fallback guides are
+    not kept downstream after they are regenerated.
+    """
+    max_age = min(CACHE_MAX_AGE, max(0, int(entry.expires_at - time.time())))
+    return {
+        "ETag": entry.etag,
+        "Last-Modified": entry.last_modified,
+        "Cache-Control": f"public, max-age={max_age}"
+    }
+
+
+def _created_headers(entry: StoredGuide) -> dict:
+    """Build the headers for a POST that produced or found a stored guide."""
+    headers = _cache_headers(entry)
+    headers["Location"] = f"/plant-guides/{entry.guide_id}"
+    return headers
+
+
+def _parse_fieldset(fields: Optional[str], compact: bool) -> Fieldset:
+    """Parse the sparse fieldset parameters, rejecting unknown fields."""
+    try:
+        return Fieldset.parse(fields, compact)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+def _select(entry: StoredGuide, fieldset: Fieldset) -> StoredGuide:
+    """Return the requested variant of a guide, with its own ETag."""
+    if fieldset.is_full:
+        return entry
+    return entry.model_copy(update={
+        "body": fieldset.apply(entry.body),
+        "etag": f'{entry.etag[:-1]}-{fieldset.tag()}"'
+    })
+
+
+def _is_not_modified(request: Request, entry: StoredGuide) -> bool:
+    """
+    Check the request's conditional headers against a stored guide.
+
+    If-None-Match takes precedence over If-Modified-Since (RFC 9110).
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or entry.etag in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        # HTTP dates have one-second resolution
+        return int(entry.created_at) <= since
+
+    return False
+
 
 @router.get(
     "/health",
@@ -33,20 +129,64 @@ async def health_check():
     Health check endpoint.
     
     Returns:
-        Health status with API version
+        Health status with API version, readiness and startup timings
     """
     return HealthCheckResponse(
-        status="healthy",
+        status="healthy" if startup_state.ready else "starting",
         message="Smart Plant Growth Assistant API is running",
-        version="1.0.0"
+        version="1.0.0",
+        ready=startup_state.ready,
+        startup=startup_state.summary()
+    )
+
+
+@router.get(
+    "/health/live",
+    summary="Liveness",
+    description="Whether the process is up and its event loop responsive"
+)
+async def liveness():
+    """
+    Liveness endpoint; restart the worker if this stops answering.
+    
+    Returns:
+        Constant status
+    """
+    return {"status": "alive"}
+
+
+@router.get(
+    "/health/ready",
+    summary="Readiness",
+    description="Whether this worker should receive traffic; 503 with the failing checks if not",
+    responses={503: {"description": "Not ready; see checks"}}
+)
+async def readiness():
+    """
+    Readiness endpoint for load balancers and autoscalers.
+    
+    Reflects warmup, upstream model circuits, Gemini queue depth, recent
+    p95 generation time and free disk in generated_files.
+    
+    Returns:
+        The checks, with status 200 if all pass and 503 otherwise
+    """
+    ready, checks = readiness_probe.check()
+    return FastJSONResponse(
+        {"status": "ready" if ready else "not_ready", "checks": checks},
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE
     )
 
 
 @router.post(
     "/generate-plant-guide",
     response_model=PlantGuideResponse,
+    response_class=FastJSONResponse,
     summary="Generate Plant Care Guide",
-    description="Generate comprehensive plant care guidance using AI",
+    description=(
+        "Generate comprehensive plant care guidance using AI. "
+        "`fields` and `compact` return a pruned subset of the response."
+    ),
     responses={
         200: {
             "description": "Successfully generated plant care guide",
@@ -56,24 +196,70 @@ async def health_check():
             "description": "Invalid input data",
             "model": ErrorResponse
         },
+        409: {
+            "description": "Idempotency-Key reused with a different request",
+            "model": ErrorResponse
+        },
         500: {
             "description": "Internal server error",
             "model": ErrorResponse
         }
     }
 )
-async def generate_plant_guide(plant_data: PlantInputData):
+async def generate_plant_guide(
+    plant_data: PlantInputData,
+    request: Request,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    compact: bool = Query(False, description=COMPACT_DESCRIPTION)
+):
     """
     Main endpoint to generate comprehensive plant care guidance.
     
     This endpoint orchestrates the entire AI workflow:
-    1. Validates input data (handled by Pydantic)
+    1. Validates input data (handled by Pydantic) and reduces it to its
+       canonical form, so equivalent requests share one guide
     2. Calls Gemini AI to generate plant care guidance
-    3. Calls PPT Service to generate visual guide
+    3. Produces the configured visual guides (PPT, infographic, PDF, HTML)
+       concurrently
     4. Combines and formats the response
+    5. Stores the serialized guide under a stable id derived from the
+       inputs; repeated requests are served from the store, and the
+       Location header points at GET /plant-guides/{id}
+    
+    Concurrent requests for the same guide share one generation. If the
+    client disconnects, it stops waiting; the shared generation is
+    cancelled once no other request is waiting on it.
+    
+    An optional X-Request-Timeout header (seconds) sets a deadline; stages
+    that would not finish in time return cached or degraded output.
+    Requests with a deadline coalesce only with each other, and a shared
+    generation runs under the deadline of the request that started it:
+    a later request with a looser deadline may get a guide degraded for
+    the first one. Requests without a deadline never join such a
+    generation, so they always get the full guide.
+    
+    Batch jobs send `X-Priority: batch` so their upstream calls queue
+    behind interactive traffic (see app.utils.scheduler).
+    
+    With an Idempotency-Key header, retries with the same key get the
+    original result or wait for the generation still running for it,
+    which keeps going even if the first client disconnected.
+    
+    Gemini usage is charged to the client's address (or X-Client-Id when
+    a trusted gateway sets it) and the plant; over budget, the guide is
+    built from cache only, not stored, and not shared with requests still
+    within budget.
+    
+    `fields` prunes the response to the listed guide sections and/or the
+    visual guide, and `compact` drops the metadata. A guide generated
+    without its visual guide, or degraded to meet a deadline, is returned
+    but not stored.
     
     Args:
         plant_data: Validated plant information
+        request: Incoming request, watched for client disconnects
+        fields: Comma-separated parts of the guide to return
+        compact: Omit the metadata block
         
     Returns:
         Complete plant care guide with visual assets
@@ -81,43 +267,83 @@ async def generate_plant_guide(plant_data: PlantInputData):
     Raises:
         HTTPException: If any step in the process fails
     """
-    start_time = time.time()
-    
     try:
-        # Step 1: Generate plant care guidance using Gemini AI
-        print(f"Generating plant guide for: {plant_data.plant_name}")
-        gemini_response = await gemini_service.generate_plant_guide(plant_data)
-        
-        # Step 2: Generate visual guide using PPT Service
-        print(f"Generating visual guide for: {plant_data.plant_name}")
-        ppt_response = await ppt_service.generate(
-            gemini_response,
-            plant_data.plant_name
+        deadline = Deadline.from_header(request.headers.get(DEADLINE_HEADER))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{DEADLINE_HEADER} must be a positive number of seconds"
         )
+    
+    priority = request.headers.get(PRIORITY_HEADER, INTERACTIVE).strip().lower()
+    if priority not in REQUEST_PRIORITIES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{PRIORITY_HEADER} must be one of: {', '.join(REQUEST_PRIORITIES)}"
+        )
+    
+    idempotency_key = request.headers.get(IDEMPOTENCY_HEADER)
+    if idempotency_key is not None and not 0 < len(idempotency_key) <= MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{IDEMPOTENCY_HEADER} must be 1-{MAX_KEY_LENGTH} characters"
+        )
+    
+    fieldset = _parse_fieldset(fields, compact)
+    
+    plant_data = canonicalizer.canonicalize(plant_data)
+    guide_id = guide_id_for(plant_data)
+    
+    # Serve previously generated guides straight from their stored bytes
+    stored = guide_store.get(guide_id)
+    if stored is not None:
+        stored = _select(stored, fieldset)
+        return FastJSONResponse(stored.body, headers=_created_headers(stored))
+    
+    # Generations without the visual guide are a different piece of work
+    render_visual = fieldset.wants_visual
+    work_key = guide_id if render_visual else f"{guide_id}:no-visual"
+    flight_key = work_key if deadline is None else f"{work_key}:deadline"
+    if priority != INTERACTIVE:
+        # Interactive requests must not wait in a batch generation's queue
+        flight_key += f":{priority}"
+    client_id = client_id_for(request.headers.get(CLIENT_HEADER), request.client.host if request.client else None)
+    if usage_ledger.over_budget(client_id, plant_data.plant_name) is not None:
+        # Requests within budget must not get a cache-only guide
+        flight_key += ":cache-only"
+    
+    def generate():
+        return inflight_registry.join(flight_key, lambda: guide_pipeline.run(
+            plant_data,
+            render_visual=render_visual,
+            deadline=deadline,
+            priority=priority,
+            store=render_visual,
+            client_id=client_id
+        ))
+    
+    try:
+        if idempotency_key is not None:
+            work = idempotency_store.run(idempotency_key, work_key, generate)
+        else:
+            work = generate()
+        stored = _select(await run_while_connected(request, work), fieldset)
+        if stored.is_transient:
+            # Not stored, so there is nothing for Location or ETag to refer to
+            return FastJSONResponse(stored.body)
+        return FastJSONResponse(stored.body, headers=_created_headers(stored))
         
-        # Step 3: Calculate processing time
-        processing_time = time.time() - start_time
-        
-        # Step 4: Format and combine responses
-        final_response = PlantGuideResponse(
-            success=True,
-            plant_care_guidance=gemini_response,
-            visual_guide=ppt_response,
-            metadata={
-                "plant_name": plant_data.plant_name,
-                "plant_type": plant_data.plant_type,
-                "climate": plant_data.climate,
-                "sunlight_hours": plant_data.sunlight_hours,
-                "soil_type": plant_data.soil_type,
-                "watering_frequency": plant_data.watering_frequency,
-                "experience_level": plant_data.experience_level,
-                "timestamp": datetime.utcnow().isoformat() + "Z",
-                "processing_time_seconds": round(processing_time, 2)
-            }
+    except IdempotencyConflict as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
         )
         
-        print(f"Successfully generated guide in {processing_time:.2f} seconds")
-        return final_response
+    except ClientDisconnected:
+        metrics.increment("requests_cancelled")
+        print(f"Client disconnected, abandoned guide for: {plant_data.plant_name}")
+        # Nobody is listening; 499 is the conventional "client closed request"
+        return Response(status_code=499)
         
     except Exception as e:
         # Log error (in production, use proper logging)
@@ -130,6 +356,219 @@ async def generate_plant_guide(plant_data: PlantInputData):
         )
 
 
+@router.get(
+    "/plant-guides/{guide_id}",
+    response_model=PlantGuideResponse,
+    response_class=FastJSONResponse,
+    summary="Get Plant Care Guide",
+    description="Fetch a previously generated guide; supports conditional GET",
+    responses={
+        304: {"description": "Guide not modified since the cached copy"},
+        404: {
+            "description": "Guide not found",
+            "model": ErrorResponse
+        }
+    }
+)
+async def get_plant_guide(
+    guide_id: str,
+    request: Request,
+    fields: Optional[str] = Query(None, description=FIELDS_DESCRIPTION),
+    compact: bool = Query(False, description=COMPACT_DESCRIPTION)
+):
+    """
+    Return a stored plant guide with ETag, Last-Modified and Cache-Control.
+    
+    Pruned variants (`fields`, `compact`) carry their own ETag.
+    
+    Args:
+        guide_id: Stable id returned in the Location header of the POST
+        request: Incoming request, checked for conditional headers
+        fields: Comma-separated parts of the guide to return
+        compact: Omit the metadata block
+        
+    Returns:
+        The stored guide, or 304 Not Modified on successful revalidation
+        
+    Raises:
+        HTTPException: If no guide is stored under the id
+    """
+    fieldset = _parse_fieldset(fields, compact)
+    stored = guide_store.get(guide_id)
+    if stored is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Plant guide {guide_id} not found"
+        )
+    
+    stored = _select(stored, fieldset)
+    headers = _cache_headers(stored)
+    if _is_not_modified(request, stored):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    return FastJSONResponse(stored.body, headers=headers)
+
+
+@router.get(
+    "/metrics",
+    summary="Metrics",
+    description="Counters, gauges and latency summaries for this worker"
+)
+async def get_metrics():
+    """
+    Metrics endpoint.
+    
+    Returns:
+        Snapshot of this worker's metrics and model routing state
+    """
+    metrics.set_gauge("generations_in_flight", len(inflight_registry))
+    snapshot = metrics.snapshot()
+    snapshot["models"] = gemini_service.router.snapshot()
+    return snapshot
+
+
+@router.get(
+    "/admin/profiles/{name}",
+    summary="Request profile",
+    description="Profile report of a request sent with X-Profile; requires X-Admin-Token",
+    dependencies=[Depends(require_admin)]
+)
+async def get_profile(name: str):
+    """
+    Serve a profile report linked from an X-Profile-URL header.
+    
+    Args:
+        name: Report filename
+        
+    Returns:
+        The HTML (pyinstrument) or text (cProfile) report
+        
+    Raises:
+        HTTPException: 404 if the report does not exist or was rotated out
+    """
+    path = profile_store.path(name)
+    if path is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Profile {name} not found")
+    media_type = "text/html" if name.endswith(".html") else "text/plain"
+    return FileResponse(path, media_type=media_type)
+
+
+@router.get(
+    "/admin/usage",
+    summary="Gemini usage",
+    description="Token usage and cost per client and per plant; requires X-Admin-Token",
+    dependencies=[Depends(require_admin)]
+)
+async def get_usage(limit: int = Query(50, ge=1, le=1000)):
+    """
+    Gemini spend in the current budget window.
+    
+    Returns:
+        Budgets and the biggest spenders per client and per plant
+    """
+    return usage_ledger.snapshot(limit)
+
+
+@router.get(
+    "/admin/memory",
+    summary="Memory usage",
+    description="Process, tracemalloc, render and cache memory; requires X-Admin-Token",
+    dependencies=[Depends(require_admin)]
+)
+async def get_memory():
+    """
+    Memory overview for choosing worker recycling limits and cache sizes.
+    
+    Returns:
+        Process RSS, tracemalloc state and snapshots, per-render peak
+        memory of PPT renders (while tracing) and cache sizes
+    """
+    report = process_memory()
+    report["tracemalloc"] = memory_tracer.status()
+    report["ppt_render_peak_bytes"] = metrics.snapshot()["summaries"].get("ppt_render_peak_bytes")
+    report["caches"] = {
+        "guide_store": guide_store.memory_usage(),
+        "slide_decks": slide_service.memory_usage(),
+        "shared_cache": shared_cache.disk_usage(),
+        "idempotency_keys": {"entries": len(idempotency_store)}
+    }
+    return report
+
+
+@router.put(
+    "/admin/memory/tracing",
+    summary="Start tracemalloc",
+    dependencies=[Depends(require_admin)]
+)
+async def start_tracing(frames: int = Query(TRACEMALLOC_FRAMES, ge=1, le=100)):
+    """Start tracing allocations; slows allocation-heavy code while on."""
+    memory_tracer.start(frames)
+    return memory_tracer.status()
+
+
+@router.delete(
+    "/admin/memory/tracing",
+    summary="Stop tracemalloc",
+    dependencies=[Depends(require_admin)]
+)
+async def stop_tracing():
+    """Stop tracing and discard all snapshots."""
+    memory_tracer.stop()
+    return memory_tracer.status()
+
+
+@router.post(
+    "/admin/memory/snapshots",
+    summary="Take a tracemalloc snapshot",
+    dependencies=[Depends(require_admin)]
+)
+async def take_snapshot(
+    limit: int = Query(25, ge=1, le=500),
+    group_by: str = Query("lineno", description=GROUP_BY_DESCRIPTION)
+):
+    """
+    Take a snapshot and return its id and top allocation sites.
+    
+    Raises:
+        HTTPException: 409 if tracing is off, 400 for an unknown group_by
+    """
+    if group_by not in GROUP_BY:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=GROUP_BY_DESCRIPTION)
+    try:
+        snapshot_id = memory_tracer.take_snapshot()
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return {"id": snapshot_id, "top": memory_tracer.top(snapshot_id, limit, group_by)}
+
+
+@router.get(
+    "/admin/memory/snapshots/{snapshot_id}",
+    summary="Top allocation sites of a snapshot",
+    description="With `base`, the sites that changed most since that snapshot",
+    dependencies=[Depends(require_admin)]
+)
+async def get_snapshot(
+    snapshot_id: int,
+    base: Optional[int] = Query(None, description="Earlier snapshot id to diff against"),
+    limit: int = Query(25, ge=1, le=500),
+    group_by: str = Query("lineno", description=GROUP_BY_DESCRIPTION)
+):
+    """
+    Report a snapshot's top allocation sites, or its diff against another.
+    
+    Raises:
+        HTTPException: 404 for an unknown snapshot, 400 for an unknown group_by
+    """
+    if group_by not in GROUP_BY:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=GROUP_BY_DESCRIPTION)
+    try:
+        if base is None:
+            return {"id": snapshot_id, "top": memory_tracer.top(snapshot_id, limit, group_by)}
+        return {"id": snapshot_id, "base": base, "diff": memory_tracer.diff(snapshot_id, base, limit, group_by)}
+    except KeyError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=e.args[0])
+
+
 @router.get(
     "/",
     summary="API Root",
@@ -149,6 +588,8 @@ async def root():
         "endpoints": {
             "health": "/health",
             "generate_guide": "/generate-plant-guide",
+            "get_guide": "/plant-guides/{guide_id}",
+            "metrics": "/metrics",
             "docs": "/docs",
             "openapi": "/openapi.json"
         },
@@ -2,19 +2,21 @@
 PPT Visual Guide Generator Service
 
 Generates a PowerPoint (.pptx) plant care guide
-using structured data from GeminiResponse.
+from the shared SlideDeck built for each GeminiResponse.
 
 This replaces NotebookLM during development and can be
 swapped out for actual NotebookLM API integration later.
 """
 
-import os
 import asyncio
-from datetime import datetime
-from pptx import Presentation
-from pptx.util import Inches, Pt
+import os
+from typing import Optional
 
 from app.schemas.plant import GeminiResponse, NotebookLMResponse
+from app.schemas.slides import SlideDeck
+from app.services.slide_service import slide_service
+from app.utils.deadline import Deadline, PPT_RENDER_COST
+from app.utils.memory import memory_tracer
 
 
 class PPTService:
@@ -27,90 +29,82 @@ class PPTService:
         self.output_dir = "generated_files"
         os.makedirs(self.output_dir, exist_ok=True)
 
+    async def warmup(self) -> None:
+        """
+        Import python-pptx and parse its default template ahead of the
+        first request. python-pptx is imported lazily so that importing
+        the app stays cheap.
+        """
+        from pptx import Presentation
+
+        Presentation()
+
     async def generate(
         self,
         plant_care_data: GeminiResponse,
-        plant_name: str
+        plant_name: str,
+        deadline: Optional[Deadline] = None
     ) -> NotebookLMResponse:
         """
         Generate a PowerPoint presentation from plant care data.
-        """
-
-        filename = f"{plant_name.lower().replace(' ', '_')}_care_guide.pptx"
-        file_path = os.path.join(self.output_dir, filename)
 
-        prs = Presentation()
-
-        # ---------- Slide 1: Title ----------
-        slide = prs.slides.add_slide(prs.slide_layouts[0])
-        slide.shapes.title.text = f"{plant_name} Care Guide"
-        slide.placeholders[1].text = (
-            f"Difficulty: {plant_care_data.plant_overview.difficulty_level}"
-        )
+        If the deadline leaves less than PPT_RENDER_COST, the previously
+        rendered file for this plant is returned with status "cached", or
+        the visual guide is "skipped" when there is none.
+        """
+        deck = slide_service.build_deck(plant_care_data, plant_name)
+        if deadline is not None and not deadline.allows(PPT_RENDER_COST):
+            return self._without_render(deck)
+        # Render off the event loop so other visual outputs proceed meanwhile
+        return await asyncio.to_thread(self.render, deck)
 
-        # ---------- Slide 2: Plant Overview ----------
-        slide = prs.slides.add_slide(prs.slide_layouts[1])
-        slide.shapes.title.text = "Plant Overview"
-        slide.placeholders[1].text = plant_care_data.plant_overview.description
-
-        # ---------- Slide 3: Ideal Conditions ----------
-        slide = prs.slides.add_slide(prs.slide_layouts[1])
-        slide.shapes.title.text = "Ideal Growing Conditions"
-
-        conditions = plant_care_data.plant_overview.ideal_conditions
-        # Handle dict access - ideal_conditions is a dict, not an object
-        temp = conditions.get('temperature', 'Not specified') if isinstance(conditions, dict) else getattr(conditions, 'temperature', 'Not specified')
-        humidity = conditions.get('humidity', 'Not specified') if isinstance(conditions, dict) else getattr(conditions, 'humidity', 'Not specified')
-        sunlight = conditions.get('sunlight', 'Not specified') if isinstance(conditions, dict) else getattr(conditions, 'sunlight', 'Not specified')
-        soil_ph = conditions.get('soil_ph', 'Not specified') if isinstance(conditions, dict) else getattr(conditions, 'soil_ph', 'Not specified')
-        
-        slide.placeholders[1].text = (
-            f"Temperature: {temp}\n"
-            f"Humidity: {humidity}\n"
-            f"Sunlight: {sunlight}\n"
-            f"Soil pH: {soil_ph}"
-        )
+    def _without_render(self, deck: SlideDeck) -> NotebookLMResponse:
+        """
+        Answer without rendering, reusing an earlier file if one exists.
 
-        # ---------- Growth Stages ----------
-        for stage in plant_care_data.growth_stages:
-            slide = prs.slides.add_slide(prs.slide_layouts[1])
-            slide.shapes.title.text = stage.stage_name
-            slide.placeholders[1].text = (
-                f"Duration: {stage.duration}\n\n"
-                f"Care:\n{stage.care_instructions}\n\n"
-                f"Indicators:\n- " + "\n- ".join(stage.key_indicators)
+        File names carry a hash of the guide content (see SlideDeck.slug),
+        so an existing file was rendered from this same guide.
+        """
+        filename = f"{deck.slug}_care_guide.pptx"
+        if os.path.exists(os.path.join(self.output_dir, filename)):
+            return NotebookLMResponse(
+                status="cached",
+                file_url=f"/files/{filename}",
+                file_type="pptx",
+                message="Previously generated PPT reused to meet the request deadline"
             )
-
-        # ---------- Daily Care ----------
-        slide = prs.slides.add_slide(prs.slide_layouts[1])
-        slide.shapes.title.text = "Daily Care Routine"
-
-        daily = plant_care_data.daily_care
-        slide.placeholders[1].text = (
-            "Morning:\n- " + "\n- ".join(daily.morning_routine) + "\n\n"
-            "Afternoon:\n- " + "\n- ".join(daily.afternoon_routine) + "\n\n"
-            "Evening:\n- " + "\n- ".join(daily.evening_routine)
+        return NotebookLMResponse(
+            status="skipped",
+            message="Visual guide skipped to meet the request deadline"
         )
 
-        # ---------- Common Problems ----------
-        for problem in plant_care_data.common_problems:
-            slide = prs.slides.add_slide(prs.slide_layouts[1])
-            slide.shapes.title.text = problem.problem
-            slide.placeholders[1].text = (
-                "Symptoms:\n- " + "\n- ".join(problem.symptoms) + "\n\n"
-                f"Solution:\n{problem.solution}\n\n"
-                f"Prevention:\n{problem.prevention}"
-            )
+    def render(self, deck: SlideDeck) -> NotebookLMResponse:
+        """
+        Render a prepared slide deck to a .pptx file.
 
-        # ---------- Tips ----------
-        slide = prs.slides.add_slide(prs.slide_layouts[1])
-        slide.shapes.title.text = "Additional Tips"
-        slide.placeholders[1].text = "- " + "\n- ".join(
-            plant_care_data.additional_tips
-        )
+        While tracemalloc is tracing, the render's peak memory is recorded
+        in the ppt_render_peak_bytes summary.
+        """
+        from pptx import Presentation
+
+        filename = f"{deck.slug}_care_guide.pptx"
+        file_path = os.path.join(self.output_dir, filename)
 
-        # Save PPT
-        prs.save(file_path)
+        with memory_tracer.measure_peak("ppt_render_peak_bytes"):
+            prs = Presentation()
+
+            for slide_data in deck.slides:
+                if slide_data.type == "title":
+                    slide = prs.slides.add_slide(prs.slide_layouts[0])
+                    slide.shapes.title.text = slide_data.title
+                    slide.placeholders[1].text = slide_data.subtitle or ""
+                else:
+                    slide = prs.slides.add_slide(prs.slide_layouts[1])
+                    slide.shapes.title.text = slide_data.title
+                    slide.placeholders[1].text = slide_data.body
+
+            # Save PPT
+            prs.save(file_path)
 
         return NotebookLMResponse(
             status="success",
@@ -0,0 +1,113 @@
+"""
+Readiness Probe Service
+
+Decides whether this worker should receive traffic. Liveness only says
+the process answers; readiness also requires that warmup finished, at
+least one Gemini model is in rotation, the upstream queue is short,
+recent guide generations were fast enough and generated_files has room
+for more output. Load balancers and autoscalers read the result from
+GET /health/ready.
+"""
+
+import os
+import shutil
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from app.routes.gemini import gemini_service
+from app.utils.scheduler import INTERACTIVE
+from app.utils.startup import startup_state
+
+
+# Configuration
+READY_MAX_QUEUE = int(os.getenv("READY_MAX_QUEUE", "20"))  # Interactive requests waiting for a Gemini slot
+READY_MAX_P95 = float(os.getenv("READY_MAX_P95", "30"))  # Seconds, over recent guide generations
+READY_LATENCY_WINDOW = float(os.getenv("READY_LATENCY_WINDOW", "300"))  # Seconds of generations considered
+READY_MIN_FREE_DISK_MB = float(os.getenv("READY_MIN_FREE_DISK_MB", "100"))
+OUTPUT_DIR = "generated_files"
+MAX_SAMPLES = 1024
+
+
+class ReadinessProbe:
+    """
+    Readiness checks over live state of this worker.
+    """
+
+    def __init__(self, latency_window: float = READY_LATENCY_WINDOW):
+        """Initialize with no recorded generations."""
+        self.latency_window = latency_window
+        self._latencies: Deque[Tuple[float, float]] = deque(maxlen=MAX_SAMPLES)
+
+    def record_latency(self, seconds: float) -> None:
+        """Record how long a guide generation took."""
+        self._latencies.append((time.monotonic(), seconds))
+
+    def recent_p95(self) -> Optional[float]:
+        """
+        p95 of generation times within the latency window.
+
+        Old samples age out, so a worker that was slow and then stopped
+        getting traffic becomes ready again instead of staying drained.
+
+        Returns:
+            Seconds, or None if nothing was generated recently
+        """
+        cutoff = time.monotonic() - self.latency_window
+        while self._latencies and self._latencies[0][0] < cutoff:
+            self._latencies.popleft()
+        if not self._latencies:
+            return None
+        ordered = sorted(seconds for _, seconds in self._latencies)
+        return ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+
+    def check(self) -> Tuple[bool, Dict[str, Dict[str, Any]]]:
+        """
+        Run all readiness checks.
+
+        Returns:
+            Tuple of (ready, checks); each check has "ok" plus the value
+            it measured and the limit it was held to
+        """
+        models = gemini_service.router.snapshot()
+        in_rotation = [model for model, state in models.items() if state["state"] != "open"]
+        queue = gemini_service.scheduler.queue_lengths()
+        p95 = self.recent_p95()
+        free_mb = self._free_disk_mb()
+
+        checks = {
+            "warmup": {"ok": startup_state.ready},
+            "upstream": {
+                "ok": bool(in_rotation),
+                "models_in_rotation": in_rotation,
+                "models": {model: state["state"] for model, state in models.items()}
+            },
+            "queue": {
+                "ok": queue[INTERACTIVE] <= READY_MAX_QUEUE,
+                "waiting": queue,
+                "active_slots": gemini_service.scheduler.active,
+                "limit": READY_MAX_QUEUE
+            },
+            "latency": {
+                "ok": p95 is None or p95 <= READY_MAX_P95,
+                "p95_seconds": round(p95, 3) if p95 is not None else None,
+                "limit": READY_MAX_P95
+            },
+            "disk": {
+                "ok": free_mb is not None and free_mb >= READY_MIN_FREE_DISK_MB,
+                "free_mb": round(free_mb, 1) if free_mb is not None else None,
+                "limit": READY_MIN_FREE_DISK_MB
+            }
+        }
+        return all(check["ok"] for check in checks.values()), checks
+
+    def _free_disk_mb(self) -> Optional[float]:
+        """Free space on the volume holding generated files, None if unknown."""
+        try:
+            return shutil.disk_usage(OUTPUT_DIR).free / (1024 * 1024)
+        except OSError:
+            return None
+
+
+# Singleton
+readiness_probe = ReadinessProbe()
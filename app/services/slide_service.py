@@ -0,0 +1,213 @@
+"""
+Slide Deck Builder Service
+
+Converts a GeminiResponse into the format-neutral SlideDeck
+representation exactly once per guide. PPT, PDF and HTML renderers
+and the NotebookLM payload all consume the same cached deck.
+"""
+
+import hashlib
+import re
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+from app.schemas.plant import GeminiResponse
+from app.schemas.slides import Slide, SlideDeck, SlideSection
+from app.utils.memory import deep_sizeof
+
+
+def _bullets(items: List[str]) -> str:
+    """Join items into a dash-prefixed bullet list."""
+    return "- " + "\n- ".join(items)
+
+
+def _render_body(sections: List[SlideSection]) -> str:
+    """
+    Build the plain-text body of a slide from its sections.
+
+    Consecutive inline sections share a block, one per line; every
+    other section is separated by a blank line.
+    """
+    blocks = []
+    inline_run = []
+
+    for section in sections:
+        if section.inline:
+            inline_run.append(f"{section.heading}: {section.text}")
+            continue
+
+        if inline_run:
+            blocks.append("\n".join(inline_run))
+            inline_run = []
+
+        parts = []
+        if section.heading:
+            parts.append(f"{section.heading}:")
+        if section.text:
+            parts.append(section.text)
+        if section.bullets:
+            parts.append(_bullets(section.bullets))
+        blocks.append("\n".join(parts))
+
+    if inline_run:
+        blocks.append("\n".join(inline_run))
+
+    return "\n\n".join(blocks)
+
+
+def _slug(plant_name: str, plant_care_data: GeminiResponse) -> str:
+    """
+    File-name stem for a guide's rendered outputs.
+
+    The plant name is reduced to [a-z0-9_] so it cannot escape the output
+    directory, and a hash of the name and guide content is appended so
+    different guides for the same plant never share, or overwrite, a file.
+    """
+    name = re.sub(r"[^a-z0-9]+", "_", plant_name.lower()).strip("_")[:48] or "plant"
+    digest = hashlib.sha256(f"{plant_name}\n{plant_care_data.model_dump_json()}".encode("utf-8")).hexdigest()
+    return f"{name}_{digest[:12]}"
+
+
+def _slide(type: str, title: str, sections: List[SlideSection], subtitle: str = None) -> Slide:
+    """Create a slide with its plain-text body pre-rendered."""
+    return Slide(
+        type=type,
+        title=title,
+        subtitle=subtitle,
+        sections=sections,
+        body=_render_body(sections)
+    )
+
+
+class SlideService:
+    """
+    Builds and caches SlideDeck objects for plant care guides.
+
+    Decks are cached per GeminiResponse instance, so rendering a second
+    format for the same guide reuses the already-built slides.
+    """
+
+    def __init__(self, max_entries: int = 128):
+        """Initialize the builder with a bounded deck cache."""
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[int, Tuple[GeminiResponse, str, SlideDeck]]" = OrderedDict()
+
+    def build_deck(self, plant_care_data: GeminiResponse, plant_name: str) -> SlideDeck:
+        """
+        Return the slide deck for a guide, building it on first use.
+
+        Args:
+            plant_care_data: Structured plant care guidance from Gemini
+            plant_name: Name of the plant
+
+        Returns:
+            Format-neutral slide deck
+        """
+        key = id(plant_care_data)
+        entry = self._cache.get(key)
+        # id() values are reused after garbage collection, so confirm identity
+        if entry is not None and entry[0] is plant_care_data and entry[1] == plant_name:
+            self._cache.move_to_end(key)
+            return entry[2]
+
+        deck = self._build(plant_care_data, plant_name)
+        self._cache[key] = (plant_care_data, plant_name, deck)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+
+        return deck
+
+    def memory_usage(self) -> Dict[str, int]:
+        """
+        Number of cached decks and their approximate size, including the
+        guides they were built from.
+        """
+        return {"entries": len(self._cache), "bytes": deep_sizeof(self._cache)}
+
+    def _build(self, plant_care_data: GeminiResponse, plant_name: str) -> SlideDeck:
+        """Walk the guide once and produce the slide deck."""
+        overview = plant_care_data.plant_overview
+        conditions = overview.ideal_conditions
+        slides = []
+
+        # ---------- Title ----------
+        slides.append(_slide(
+            "title",
+            f"{plant_name} Care Guide",
+            [],
+            subtitle=f"Difficulty: {overview.difficulty_level}"
+        ))
+
+        # ---------- Plant Overview ----------
+        slides.append(_slide(
+            "content",
+            "Plant Overview",
+            [SlideSection(text=overview.description)]
+        ))
+
+        # ---------- Ideal Conditions ----------
+        slides.append(_slide(
+            "content",
+            "Ideal Growing Conditions",
+            [
+                SlideSection(inline=True, heading="Temperature", text=conditions.get("temperature", "Not specified")),
+                SlideSection(inline=True, heading="Humidity", text=conditions.get("humidity", "Not specified")),
+                SlideSection(inline=True, heading="Sunlight", text=conditions.get("sunlight", "Not specified")),
+                SlideSection(inline=True, heading="Soil pH", text=conditions.get("soil_ph", "Not specified")),
+            ]
+        ))
+
+        # ---------- Growth Stages ----------
+        for stage in plant_care_data.growth_stages:
+            slides.append(_slide(
+                "content",
+                stage.stage_name,
+                [
+                    SlideSection(inline=True, heading="Duration", text=stage.duration),
+                    SlideSection(heading="Care", text=stage.care_instructions),
+                    SlideSection(heading="Indicators", bullets=stage.key_indicators),
+                ]
+            ))
+
+        # ---------- Daily Care ----------
+        daily = plant_care_data.daily_care
+        slides.append(_slide(
+            "content",
+            "Daily Care Routine",
+            [
+                SlideSection(heading="Morning", bullets=daily.morning_routine),
+                SlideSection(heading="Afternoon", bullets=daily.afternoon_routine),
+                SlideSection(heading="Evening", bullets=daily.evening_routine),
+                SlideSection(heading="Weekly", bullets=daily.weekly_tasks),
+            ]
+        ))
+
+        # ---------- Common Problems ----------
+        for problem in plant_care_data.common_problems:
+            slides.append(_slide(
+                "problem_solution",
+                problem.problem,
+                [
+                    SlideSection(heading="Symptoms", bullets=problem.symptoms),
+                    SlideSection(heading="Solution", text=problem.solution),
+                    SlideSection(heading="Prevention", text=problem.prevention),
+                ]
+            ))
+
+        # ---------- Tips ----------
+        slides.append(_slide(
+            "tips",
+            "Additional Tips",
+            [SlideSection(bullets=plant_care_data.additional_tips)]
+        ))
+
+        return SlideDeck(
+            title=f"{plant_name} Care Guide",
+            slug=_slug(plant_name, plant_care_data),
+            slides=slides
+        )
+
+
+# Singleton
+slide_service = SlideService()
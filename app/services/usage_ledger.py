@@ -0,0 +1,165 @@
+"""
+Usage Ledger Service
+
+Aggregates Gemini token usage and cost per client and per plant over a
+budget window, and tells the pipeline when a client or plant has used up
+its budget. Over-budget requests are served in cache-only mode: cached
+sections as usual, fallbacks instead of new Gemini calls.
+
+Clients are identified by their address. The X-Client-Id header is a
+client-chosen value, so rotating it would reset a budget; it is only
+used when USAGE_TRUST_CLIENT_HEADER is set because a gateway in front
+of the app authenticates clients and sets it. Behind a proxy that does
+not, every client shares the proxy's address and budget. The ledger is
+per worker, like the metrics, so each worker enforces the budgets on
+its own share of the traffic.
+"""
+
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from app.utils.token_usage import TokenUsage
+
+
+# Configuration
+CLIENT_HEADER = "X-Client-Id"
+USAGE_WINDOW = int(os.getenv("USAGE_BUDGET_WINDOW", "86400"))  # Seconds before spend resets
+CLIENT_BUDGET_USD = float(os.getenv("USAGE_CLIENT_BUDGET_USD", "0"))  # Per client per window; 0 = unlimited
+PLANT_BUDGET_USD = float(os.getenv("USAGE_PLANT_BUDGET_USD", "0"))  # Per plant per window; 0 = unlimited
+MAX_TRACKED = int(os.getenv("USAGE_MAX_TRACKED", "10000"))  # Accounts kept per kind
+# Only when a trusted gateway sets X-Client-Id and strips client-sent values
+TRUST_CLIENT_HEADER = os.getenv("USAGE_TRUST_CLIENT_HEADER", "False").lower() == "true"
+
+
+def client_id_for(header_value: Optional[str], address: Optional[str], trust_header: bool = TRUST_CLIENT_HEADER) -> Optional[str]:
+    """
+    Identify the client a request's usage is charged to.
+
+    Args:
+        header_value: The X-Client-Id header, if sent
+        address: The client's network address, if known
+        trust_header: Whether X-Client-Id is set by a trusted gateway
+
+    Returns:
+        The authenticated client id when trusted, else the address
+    """
+    if trust_header and header_value:
+        return f"id:{header_value}"
+    return f"addr:{address}" if address else None
+
+
+class _Account:
+    """Usage of one client or plant in the current window."""
+
+    def __init__(self):
+        self.window_start = time.time()
+        self.usage = TokenUsage()
+
+
+class UsageLedger:
+    """
+    Spend per client and per plant, with budgets.
+    """
+
+    def __init__(
+        self,
+        window: int = USAGE_WINDOW,
+        client_budget: float = CLIENT_BUDGET_USD,
+        plant_budget: float = PLANT_BUDGET_USD,
+        max_tracked: int = MAX_TRACKED
+    ):
+        """
+        Args:
+            window: Seconds after which an account's spend starts over
+            client_budget: USD a client may spend per window (0 = no limit)
+            plant_budget: USD spent per plant per window (0 = no limit)
+            max_tracked: Least recently used accounts beyond this are dropped
+        """
+        self.window = window
+        self.budgets = {"client": client_budget, "plant": plant_budget}
+        self.max_tracked = max_tracked
+        self._accounts: Dict[str, "OrderedDict[str, _Account]"] = {
+            "client": OrderedDict(),
+            "plant": OrderedDict()
+        }
+
+    def over_budget(self, client_id: Optional[str], plant: str) -> Optional[str]:
+        """
+        Check whether a request may make new Gemini calls.
+
+        Args:
+            client_id: Requesting client, or None for internal work
+            plant: Canonical plant name
+
+        Returns:
+            "client" or "plant" if that budget is used up, else None
+        """
+        for kind, key in (("client", client_id), ("plant", plant)):
+            budget = self.budgets[kind]
+            if not budget or key is None:
+                continue
+            account = self._account(kind, key, create=False)
+            if account is not None and account.usage.cost >= budget:
+                return kind
+        return None
+
+    def record(self, client_id: Optional[str], plant: str, usage: TokenUsage) -> None:
+        """
+        Charge a generation's usage to its client and plant.
+
+        Args:
+            client_id: Requesting client, or None for internal work
+            plant: Canonical plant name
+            usage: Tokens and cost of the generation's Gemini calls
+        """
+        if not usage.calls:
+            return
+        for kind, key in (("client", client_id), ("plant", plant)):
+            if key is not None:
+                self._account(kind, key, create=True).usage.add(usage)
+
+    def _account(self, kind: str, key: str, create: bool) -> Optional[_Account]:
+        """Return an account, starting a new window if the old one ended."""
+        accounts = self._accounts[kind]
+        account = accounts.get(key)
+        if account is not None and time.time() - account.window_start >= self.window:
+            account = None
+            del accounts[key]
+        if account is None:
+            if not create:
+                return None
+            account = accounts[key] = _Account()
+            while len(accounts) > self.max_tracked:
+                accounts.popitem(last=False)
+        accounts.move_to_end(key)
+        return account
+
+    def snapshot(self, limit: int = 50) -> Dict[str, Any]:
+        """
+        Report the biggest spenders.
+
+        Args:
+            limit: Accounts listed per kind, highest cost first
+
+        Returns:
+            Window, budgets and per-client / per-plant usage
+        """
+        report: Dict[str, Any] = {"window_seconds": self.window, "budgets_usd": dict(self.budgets)}
+        now = time.time()
+        for kind, accounts in self._accounts.items():
+            live = [
+                (key, account) for key, account in accounts.items()
+                if now - account.window_start < self.window
+            ]
+            live.sort(key=lambda item: item[1].usage.cost, reverse=True)
+            report[f"{kind}s"] = {
+                key: dict(account.usage.as_dict(), window_start=account.window_start)
+                for key, account in live[:limit]
+            }
+        return report
+
+
+# Singleton
+usage_ledger = UsageLedger()
@@ -0,0 +1,46 @@
+"""
+Admin Authentication Module
+
+Guards diagnostic features (profiling, memory snapshots) behind a shared
+admin token sent in the X-Admin-Token header. With no ADMIN_TOKEN
+configured, every admin feature is disabled.
+"""
+
+import hmac
+import os
+from typing import Optional
+
+from fastapi import HTTPException, Request, status
+
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+ADMIN_HEADER = "X-Admin-Token"
+
+
+def is_admin_token(token: Optional[str]) -> bool:
+    """
+    Check a token against ADMIN_TOKEN in constant time.
+
+    Args:
+        token: Token presented by the client, if any
+
+    Returns:
+        True if admin features are enabled and the token matches
+    """
+    if not ADMIN_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token.encode("utf-8"), ADMIN_TOKEN.encode("utf-8"))
+
+
+async def require_admin(request: Request) -> None:
+    """
+    FastAPI dependency that rejects requests without the admin token.
+
+    Raises:
+        HTTPException: 404 when admin features are disabled, 403 when
+            the token is missing or wrong
+    """
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not is_admin_token(request.headers.get(ADMIN_HEADER)):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin token required")
@@ -0,0 +1,261 @@
+"""
+Input Canonicalization Module
+
+Reduces equivalent plant requests to one canonical PlantInputData so
+that cache, coalescing and dedup keys match. "Tomato", "tomatoes",
+"TOMATO " and "Tomato plant" all become "Tomato", and nearby sunlight
+hours fall into the same bucket.
+
+Each step can be switched off through environment variables:
+    CANONICAL_SINGULARIZE   Case-fold and singularize names (default: true)
+    CANONICAL_SYNONYMS      Apply the synonym tables (default: true)
+    CANONICAL_SYNONYMS_PATH JSON file of extra {field: {alias: canonical}}
+    CANONICAL_SUNLIGHT_BUCKETS  Comma-separated bucket lower bounds,
+                            empty to disable (default: 0,3,6,9,12,16)
+    CANONICAL_ENUMS         Map watering frequency and experience level
+                            onto their enums (default: true)
+"""
+
+import json
+import os
+import re
+from enum import Enum
+from typing import Dict, List, Optional
+
+from app.schemas.plant import PlantInputData, WateringFrequency, ExperienceLevel
+
+
+def _env_flag(name: str, default: str = "true") -> bool:
+    """Read a boolean environment variable."""
+    return os.getenv(name, default).lower() == "true"
+
+
+# Configuration
+SINGULARIZE = _env_flag("CANONICAL_SINGULARIZE")
+USE_SYNONYMS = _env_flag("CANONICAL_SYNONYMS")
+SYNONYMS_PATH = os.getenv("CANONICAL_SYNONYMS_PATH", "")
+SUNLIGHT_BUCKETS = [
+    int(bound) for bound in os.getenv("CANONICAL_SUNLIGHT_BUCKETS", "0,3,6,9,12,16").split(",") if bound.strip()
+]
+NORMALIZE_ENUMS = _env_flag("CANONICAL_ENUMS")
+
+
+# Synonym tables, keyed by field, with lower-case singular aliases
+DEFAULT_SYNONYMS: Dict[str, Dict[str, str]] = {
+    "plant_name": {
+        "aubergine": "eggplant",
+        "brinjal": "eggplant",
+        "capsicum": "bell pepper",
+        "coriander": "cilantro",
+        "courgette": "zucchini",
+        "lady finger": "okra",
+        "ladies finger": "okra",
+        "money plant": "pothos",
+        "devil's ivy": "pothos",
+        "snake plant": "sansevieria",
+    },
+    "plant_type": {
+        "veggie": "vegetable",
+        "flowering": "flower",
+        "houseplant": "indoor",
+    },
+    "climate": {
+        "tropic": "tropical",
+        "tropics": "tropical",
+        "humid": "tropical",
+        "desert": "arid",
+        "dry": "arid",
+        "moderate": "temperate",
+        "mild": "temperate",
+    },
+    "soil_type": {
+        "loam": "loamy",
+        "clayey": "clay",
+        "sand": "sandy",
+        "silt": "silty",
+        "peat": "peaty",
+        "potting mix": "potting soil",
+    },
+}
+
+WATERING_ALIASES: Dict[str, WateringFrequency] = {
+    "daily": WateringFrequency.DAILY,
+    "every day": WateringFrequency.DAILY,
+    "everyday": WateringFrequency.DAILY,
+    "once a day": WateringFrequency.DAILY,
+    "twice a day": WateringFrequency.DAILY,
+    "every other day": WateringFrequency.EVERY_FEW_DAYS,
+    "alternate day": WateringFrequency.EVERY_FEW_DAYS,
+    "every few days": WateringFrequency.EVERY_FEW_DAYS,
+    "every 2 days": WateringFrequency.EVERY_FEW_DAYS,
+    "every 3 days": WateringFrequency.EVERY_FEW_DAYS,
+    "twice a week": WateringFrequency.EVERY_FEW_DAYS,
+    "twice weekly": WateringFrequency.EVERY_FEW_DAYS,
+    "weekly": WateringFrequency.WEEKLY,
+    "once a week": WateringFrequency.WEEKLY,
+    "every week": WateringFrequency.WEEKLY,
+    "bi-weekly": WateringFrequency.BI_WEEKLY,
+    "biweekly": WateringFrequency.BI_WEEKLY,
+    "fortnightly": WateringFrequency.BI_WEEKLY,
+    "every 2 weeks": WateringFrequency.BI_WEEKLY,
+    "every two weeks": WateringFrequency.BI_WEEKLY,
+    "monthly": WateringFrequency.MONTHLY,
+    "once a month": WateringFrequency.MONTHLY,
+}
+
+EXPERIENCE_ALIASES: Dict[str, ExperienceLevel] = {
+    "beginner": ExperienceLevel.BEGINNER,
+    "novice": ExperienceLevel.BEGINNER,
+    "new": ExperienceLevel.BEGINNER,
+    "newbie": ExperienceLevel.BEGINNER,
+    "first time": ExperienceLevel.BEGINNER,
+    "intermediate": ExperienceLevel.INTERMEDIATE,
+    "some experience": ExperienceLevel.INTERMEDIATE,
+    "moderate": ExperienceLevel.INTERMEDIATE,
+    "advanced": ExperienceLevel.ADVANCED,
+    "expert": ExperienceLevel.ADVANCED,
+    "experienced": ExperienceLevel.ADVANCED,
+    "professional": ExperienceLevel.ADVANCED,
+}
+
+# Trailing words that do not change the plant being asked about
+_FILLER_SUFFIX = re.compile(r"\s+(plant|plants|seed|seeds|seedling|seedlings)$")
+_WHITESPACE = re.compile(r"\s+")
+
+# Common names in which the filler word is part of the name
+_FILLER_NAMES = {
+    "air", "cast iron", "corn", "ice", "jade", "money", "pitcher", "polka dot",
+    "prayer", "rubber", "snake", "spider", "umbrella", "zebra", "zz"
+}
+
+# Words ending in "s" that are already singular
+_SINGULAR_EXCEPTIONS = {
+    "asparagus", "hibiscus", "cactus", "crocus", "citrus", "iris", "lotus", "narcissus", "brussels",
+    "pothos", "cosmos", "species", "series", "chaos"
+}
+# Plurals the suffix rules below get wrong
+_IRREGULAR_PLURALS = {"aloes": "aloe", "leaves": "leaf", "cacti": "cactus"}
+
+
+def singularize(word: str) -> str:
+    """
+    Reduce a lower-case English word to its singular form.
+
+    Covers the plural patterns common in plant names; unknown or
+    irregular words are returned unchanged.
+    """
+    if word in _IRREGULAR_PLURALS:
+        return _IRREGULAR_PLURALS[word]
+    if len(word) <= 3 or word in _SINGULAR_EXCEPTIONS or word.endswith(("ss", "us", "is")):
+        return word
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith(("oes", "ches", "shes", "xes", "sses")):
+        return word[:-2]
+    if word.endswith("s"):
+        return word[:-1]
+    return word
+
+
+def _load_synonyms(path: str) -> Dict[str, Dict[str, str]]:
+    """Merge the default synonym tables with an optional JSON file."""
+    tables = {field: dict(aliases) for field, aliases in DEFAULT_SYNONYMS.items()}
+    if path:
+        with open(path, encoding="utf-8") as f:
+            for field, aliases in json.load(f).items():
+                tables.setdefault(field, {}).update(
+                    {alias.lower(): canonical.lower() for alias, canonical in aliases.items()}
+                )
+    return tables
+
+
+class Canonicalizer:
+    """
+    Maps validated plant inputs onto their canonical form.
+
+    The result is itself a valid PlantInputData, and canonicalizing it a
+    second time returns an equal object.
+    """
+
+    def __init__(
+        self,
+        singularize_names: bool = SINGULARIZE,
+        use_synonyms: bool = USE_SYNONYMS,
+        sunlight_buckets: Optional[List[int]] = None,
+        normalize_enums: bool = NORMALIZE_ENUMS,
+        synonyms_path: str = SYNONYMS_PATH
+    ):
+        """Initialize the canonicalizer with the enabled steps."""
+        self.singularize_names = singularize_names
+        self.use_synonyms = use_synonyms
+        self.sunlight_buckets = sorted(SUNLIGHT_BUCKETS if sunlight_buckets is None else sunlight_buckets)
+        self.normalize_enums = normalize_enums
+        self.synonyms = _load_synonyms(synonyms_path) if use_synonyms else {}
+
+    def canonicalize(self, plant_data: PlantInputData) -> PlantInputData:
+        """
+        Return the canonical form of the plant inputs.
+
+        Args:
+            plant_data: Validated plant input data
+
+        Returns:
+            Canonical plant input data
+        """
+        # Inputs are already validated and canonical values come from the
+        # lookup tables above, so skip re-validation
+        canonical = PlantInputData.model_construct(
+            plant_name=self._text("plant_name", plant_data.plant_name),
+            plant_type=self._text("plant_type", plant_data.plant_type),
+            climate=self._text("climate", plant_data.climate),
+            sunlight_hours=self._sunlight(plant_data.sunlight_hours),
+            soil_type=self._text("soil_type", plant_data.soil_type),
+            watering_frequency=self._enum(plant_data.watering_frequency, WATERING_ALIASES),
+            experience_level=self._enum(plant_data.experience_level, EXPERIENCE_ALIASES)
+        )
+        canonical._display_name = plant_data._display_name or _WHITESPACE.sub(" ", plant_data.plant_name.strip())
+        return canonical
+
+    def _text(self, field: str, value: str) -> str:
+        """Case-fold, singularize and apply synonyms to a free-text field."""
+        if not (self.singularize_names or self.use_synonyms):
+            return value
+
+        text = _WHITESPACE.sub(" ", value.strip().lower())
+        synonyms = self.synonyms.get(field, {})
+        # Aliases may themselves end in a filler word ("money plant")
+        if text in synonyms:
+            return synonyms[text].capitalize()
+        if self.singularize_names:
+            stripped = _FILLER_SUFFIX.sub("", text)
+            if stripped in _FILLER_NAMES:
+                stripped = text
+            words = (stripped or text).split(" ")
+            words[-1] = singularize(words[-1])
+            text = " ".join(words)
+        text = synonyms.get(text, text)
+        return text.capitalize()
+
+    def _sunlight(self, hours: int) -> int:
+        """Map sunlight hours to the midpoint of their bucket."""
+        if not self.sunlight_buckets:
+            return hours
+        lower = self.sunlight_buckets[0]
+        upper = 24
+        for index, bound in enumerate(self.sunlight_buckets):
+            if hours >= bound:
+                lower = bound
+                upper = self.sunlight_buckets[index + 1] - 1 if index + 1 < len(self.sunlight_buckets) else 24
+        return (lower + upper) // 2
+
+    def _enum(self, value: str, aliases: Dict[str, Enum]) -> str:
+        """Map a free-text value onto its enum member, if recognized."""
+        if not self.normalize_enums:
+            return value
+        key = _WHITESPACE.sub(" ", value.strip().lower())
+        member = aliases.get(key)
+        return member.value if member is not None else value
+
+
+# Singleton instance
+canonicalizer = Canonicalizer()
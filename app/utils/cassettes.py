@@ -0,0 +1,107 @@
+"""
+Cassette Module
+
+Records raw upstream HTTP responses, with their timing, to JSON files
+("cassettes") keyed by a hash of the request, and replays them later.
+Performance runs in CI and on laptops then exercise the real parse,
+validate and render path on production-shaped data without network
+access, and with the same results every run.
+
+Cassettes are keyed by the request payload alone, not the model it was
+routed to, so a different routing order on replay still finds them.
+While recording or replaying, the Gemini response caches are bypassed
+and the guide store keeps guides in process only, so every run reaches
+the upstream (or its recording) instead of a result cached on disk by
+an earlier run.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+
+# Configuration
+CASSETTE_MODE = os.getenv("GEMINI_CASSETTE_MODE", "off").lower()  # "off", "record" or "replay"
+CASSETTE_DIR = os.getenv("GEMINI_CASSETTE_DIR", "cassettes")
+CASSETTE_LATENCY = os.getenv("GEMINI_CASSETTE_LATENCY", "False").lower() == "true"  # Replay with recorded timing
+
+
+class CassetteStore:
+    """
+    Directory of recorded request/response pairs.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory: Where cassette files are read and written
+        """
+        self.directory = directory
+
+    def key(self, payload: Dict[str, Any]) -> str:
+        """
+        Hash a request into its cassette key.
+
+        The model is left out: which model serves a request depends on
+        live routing state, while the logical request does not.
+
+        Args:
+            payload: JSON request body (prompt and generation config)
+
+        Returns:
+            Hex digest identifying the request
+        """
+        canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        """File holding the cassette for a key."""
+        return os.path.join(self.directory, f"{key}.json")
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Read a recorded cassette.
+
+        Returns:
+            Dict with "response" (parsed JSON) and "elapsed_seconds",
+            or None if nothing was recorded for the key
+        """
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save(
+        self,
+        key: str,
+        model: str,
+        payload: Dict[str, Any],
+        response: Dict[str, Any],
+        elapsed_seconds: float
+    ) -> None:
+        """
+        Write a cassette, replacing any earlier recording of the request.
+
+        Args:
+            key: Cassette key from `key()`
+            model: Model name the request was sent to
+            payload: JSON request body
+            response: Parsed JSON response body
+            elapsed_seconds: How long the upstream took to answer
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        cassette = {
+            "model": model,
+            "request": payload,
+            "response": response,
+            "elapsed_seconds": round(elapsed_seconds, 4),
+            "recorded_at": datetime.utcnow().isoformat() + "Z"
+        }
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(cassette, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
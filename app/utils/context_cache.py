@@ -0,0 +1,109 @@
+"""
+Context Cache Module
+
+Tracks upstream cached-content handles for static prompt preambles, so
+requests can reference the preamble instead of re-sending it. Handles
+are renewed shortly before they expire. When registration fails, the
+preamble is left uncached for a while and callers send full prompts.
+
+Gemini only caches content above a per-model minimum size (1,024 tokens
+for Gemini 2.x Flash, 4,096 for 2.5 Pro, 32,768 for 1.5 models).
+Preambles estimated to be below `min_tokens` are never registered, so a
+too-small preamble costs no failing upstream request. The guide and
+section preambles in this repo are a few hundred tokens, so context
+caching only takes effect once preambles grow past the model's minimum.
+"""
+
+import asyncio
+import hashlib
+import time
+from typing import Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from app.utils.metrics import metrics
+
+
+# Rough size of a token in characters of English text
+CHARS_PER_TOKEN = 4
+
+
+class ContextCache:
+    """
+    Map from (model, preamble text) to a live cached-content name.
+    """
+
+    def __init__(self, ttl: int, refresh_margin: float, retry_after: float, min_tokens: int = 0):
+        """
+        Args:
+            ttl: Lifetime requested for each cached content, in seconds
+            refresh_margin: Renew a handle this many seconds before expiry
+            retry_after: Seconds to wait after a failed registration
+            min_tokens: Smallest preamble, in estimated tokens, the
+                upstream accepts for caching
+        """
+        self.ttl = ttl
+        self.refresh_margin = min(refresh_margin, ttl / 2)
+        self.retry_after = retry_after
+        self.min_tokens = min_tokens
+        self._too_small: Set[str] = set()
+        self._entries: Dict[str, Tuple[str, float]] = {}  # key -> (name, expires_at)
+        self._unavailable_until: Dict[str, float] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def _key(self, model: str, preamble: str) -> str:
+        """Hash a model and preamble into a map key; cached content is per model."""
+        return hashlib.sha256(f"{model}\n{preamble}".encode("utf-8")).hexdigest()
+
+    async def name_for(
+        self,
+        model: str,
+        preamble: str,
+        create: Callable[[str, str, int], Awaitable[str]]
+    ) -> Optional[str]:
+        """
+        Return a cached-content name for a preamble, registering it if needed.
+
+        Args:
+            model: Model the cached content is used with
+            preamble: Static prompt text to cache
+            create: Registers (model, preamble) for `ttl` seconds and
+                returns its name
+
+        Returns:
+            Cached-content name, or None if the preamble must be sent inline
+        """
+        key = self._key(model, preamble)
+        if len(preamble) // CHARS_PER_TOKEN < self.min_tokens:
+            if key not in self._too_small:
+                self._too_small.add(key)
+                print(f"Preamble of ~{len(preamble) // CHARS_PER_TOKEN} tokens is below the "
+                      f"{self.min_tokens}-token context cache minimum, sending full prompts")
+            return None
+        entry = self._entries.get(key)
+        now = time.monotonic()
+        if entry is not None and entry[1] - now > self.refresh_margin:
+            return entry[0]
+
+        usable = entry[0] if entry is not None and entry[1] > now else None
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        if self._unavailable_until.get(key, 0) > now or (lock.locked() and usable):
+            # Registration is failing or another caller is already renewing
+            return usable
+
+        async with lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] - time.monotonic() > self.refresh_margin:
+                return entry[0]
+            try:
+                name = await create(model, preamble, self.ttl)
+            except Exception as e:
+                print(f"Context cache unavailable, sending full prompts: {str(e)}")
+                metrics.increment("context_cache_failures")
+                self._unavailable_until[key] = time.monotonic() + self.retry_after
+                return usable
+            self._entries[key] = (name, time.monotonic() + self.ttl)
+            metrics.increment("context_cache_registrations")
+            return name
+
+    def invalidate(self, model: str, preamble: str) -> None:
+        """Forget a handle the upstream no longer accepts."""
+        self._entries.pop(self._key(model, preamble), None)
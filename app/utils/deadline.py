@@ -0,0 +1,82 @@
+"""
+Request Deadline Module
+
+Turns the optional X-Request-Timeout header into a time budget that is
+passed down to every pipeline stage. Stages compare the remaining budget
+with their expected cost and fall back to cached or degraded output
+instead of starting work that would miss the deadline.
+"""
+
+import os
+import time
+from typing import Optional
+
+
+DEADLINE_HEADER = "X-Request-Timeout"  # Seconds the caller is willing to wait
+MAX_DEADLINE = float(os.getenv("MAX_REQUEST_DEADLINE", "120"))
+
+# Expected cost of each stage in seconds, used to decide whether to start it
+GEMINI_CALL_COST = float(os.getenv("DEADLINE_GEMINI_CALL_COST", "4"))
+PPT_RENDER_COST = float(os.getenv("DEADLINE_PPT_RENDER_COST", "1"))
+NOTEBOOKLM_COST = float(os.getenv("DEADLINE_NOTEBOOKLM_COST", "15"))
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a stage is skipped or cut short by the request deadline."""
+
+
+class Deadline:
+    """
+    A point in (monotonic) time by which a request must be answered.
+    """
+
+    def __init__(self, seconds: float):
+        """
+        Start a deadline `seconds` from now.
+
+        Args:
+            seconds: Time budget in seconds
+        """
+        self.expires_at = time.monotonic() + seconds
+
+    @classmethod
+    def from_header(cls, value: Optional[str]) -> Optional["Deadline"]:
+        """
+        Parse the deadline header.
+
+        Args:
+            value: Header value in seconds, or None if absent
+
+        Returns:
+            Deadline capped at MAX_DEADLINE, or None if no header was sent
+
+        Raises:
+            ValueError: If the value is not a positive number
+        """
+        if value is None:
+            return None
+        seconds = float(value)
+        if not seconds > 0:
+            raise ValueError(f"{DEADLINE_HEADER} must be a positive number of seconds")
+        return cls(min(seconds, MAX_DEADLINE))
+
+    def remaining(self) -> float:
+        """Seconds left, never negative."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def allows(self, cost: float) -> bool:
+        """Whether a stage expected to take `cost` seconds still fits."""
+        return self.remaining() >= cost
+
+    def timeout(self, default: float) -> float:
+        """The smaller of a stage's own timeout and the remaining budget."""
+        return min(default, self.remaining())
+
+    def reserve(self, seconds: float) -> "Deadline":
+        """
+        Return a deadline that ends `seconds` earlier, leaving that much
+        of the budget for later stages.
+        """
+        share = Deadline(0)
+        share.expires_at = self.expires_at - seconds
+        return share
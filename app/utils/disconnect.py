@@ -0,0 +1,59 @@
+"""
+Client Disconnect Module
+
+Runs request work while watching the connection, and cancels the work
+as soon as the client goes away.
+"""
+
+import asyncio
+from typing import Any, Awaitable
+
+from fastapi import Request
+
+
+POLL_INTERVAL = 0.25  # Seconds between disconnect checks
+
+
+class ClientDisconnected(Exception):
+    """Raised when the client disconnected before the work finished."""
+
+
+async def _wait_for_disconnect(request: Request) -> None:
+    """Return once the client has disconnected."""
+    while not await request.is_disconnected():
+        await asyncio.sleep(POLL_INTERVAL)
+
+
+async def run_while_connected(request: Request, work: Awaitable[Any]) -> Any:
+    """
+    Await work, cancelling it if the client disconnects first.
+
+    Args:
+        request: The incoming request to watch
+        work: Coroutine producing the response data
+
+    Returns:
+        The work's result
+
+    Raises:
+        ClientDisconnected: If the client went away first
+    """
+    task = asyncio.ensure_future(work)
+    watcher = asyncio.ensure_future(_wait_for_disconnect(request))
+    try:
+        await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+    finally:
+        watcher.cancel()
+
+    if task.done():
+        return task.result()
+
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    raise ClientDisconnected()
@@ -0,0 +1,99 @@
+"""
+Sparse Fieldsets Module
+
+Parses the `fields` and `compact` query parameters of the guide
+endpoints and prunes serialized guide responses to the parts a client
+asked for. Full responses are never re-parsed; only pruned variants pay
+for a JSON round trip.
+"""
+
+import hashlib
+import json
+from typing import FrozenSet, Optional
+
+from pydantic_core import to_json
+
+from app.schemas.plant import GeminiResponse
+
+
+GUIDE_SECTIONS = tuple(GeminiResponse.model_fields)
+VISUAL_GUIDE = "visual_guide"
+VISUAL_GUIDES = "visual_guides"  # Pruned together with VISUAL_GUIDE
+FIELD_NAMES = GUIDE_SECTIONS + (VISUAL_GUIDE,)
+
+
+class Fieldset:
+    """
+    The parts of a guide response a client wants.
+    """
+
+    def __init__(self, fields: Optional[FrozenSet[str]] = None, compact: bool = False):
+        """
+        Args:
+            fields: Guide sections and/or "visual_guide"; None for all
+            compact: Drop the metadata block
+        """
+        self.fields = fields
+        self.compact = compact
+
+    @classmethod
+    def parse(cls, fields: Optional[str], compact: bool = False) -> "Fieldset":
+        """
+        Parse a comma-separated `fields` parameter.
+
+        Raises:
+            ValueError: If a field name is unknown
+        """
+        if fields is None:
+            return cls(None, compact)
+        names = frozenset(name.strip() for name in fields.split(",") if name.strip())
+        unknown = names - set(FIELD_NAMES)
+        if unknown:
+            raise ValueError(
+                f"Unknown fields: {', '.join(sorted(unknown))}; "
+                f"choose from {', '.join(FIELD_NAMES)}"
+            )
+        return cls(names, compact)
+
+    @property
+    def is_full(self) -> bool:
+        """Whether the full response was requested."""
+        return self.fields is None and not self.compact
+
+    @property
+    def wants_visual(self) -> bool:
+        """Whether the visual guide is part of the response."""
+        return self.fields is None or VISUAL_GUIDE in self.fields
+
+    def tag(self) -> str:
+        """Short identifier of this variant, used to derive its ETag."""
+        spec = ",".join(sorted(self.fields)) if self.fields is not None else "*"
+        if self.compact:
+            spec += ";compact"
+        return hashlib.sha256(spec.encode("utf-8")).hexdigest()[:8]
+
+    def apply(self, body: bytes) -> bytes:
+        """
+        Prune a serialized PlantGuideResponse.
+
+        Args:
+            body: JSON-encoded full response
+
+        Returns:
+            JSON-encoded response with only the requested parts
+        """
+        if self.is_full:
+            return body
+
+        data = json.loads(body)
+        if self.fields is not None:
+            guidance = data.get("plant_care_guidance") or {}
+            data["plant_care_guidance"] = {
+                name: value for name, value in guidance.items() if name in self.fields
+            }
+            if VISUAL_GUIDE not in self.fields:
+                data.pop(VISUAL_GUIDE, None)
+                data.pop(VISUAL_GUIDES, None)
+        if self.compact:
+            data.pop("metadata", None)
+        return to_json(data)
@@ -45,7 +45,7 @@ class ResponseFormatter:
             "processing_time_seconds": round(processing_time, 2),
             "plant_name": plant_data.plant_name,
             "plant_type": plant_data.plant_type,
-            "ai_model": "gemini-pro",
+            "ai_model": ", ".join(gemini_response._models) or "cached",
             "version": "1.0.0"
         }
         
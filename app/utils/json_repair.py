@@ -0,0 +1,161 @@
+"""
+JSON Repair Module
+
+Best-effort repair of slightly malformed JSON produced by language
+models: markdown fences, leading or trailing prose, trailing commas,
+and output cut off mid-string, mid-literal or before closing brackets.
+Repaired truncated output may be missing items; callers that know the
+output was truncated should treat the result as partial.
+"""
+
+import json
+import re
+from typing import Any
+
+
+_FENCE = re.compile(r"```(?:json)?", re.IGNORECASE)
+_TRAILING_WORD = re.compile(r"[a-z]+$")
+_TRAILING_NUMBER_PART = re.compile(r"(?<=[0-9])[.eE+-]+$")
+_LITERALS = ("true", "false", "null")
+
+
+def strip_fences(text: str) -> str:
+    """Remove markdown code fences and surrounding whitespace."""
+    return _FENCE.sub("", text).strip()
+
+
+def _remove_trailing_commas(text: str) -> str:
+    """Drop commas directly before a closing bracket, outside strings."""
+    out = []
+    in_string = False
+    escaped = False
+    for index, char in enumerate(text):
+        if in_string:
+            out.append(char)
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+        if char == '"':
+            in_string = True
+        elif char == ",":
+            rest = text[index + 1:].lstrip()
+            if not rest or rest[0] in "}]":
+                continue
+        out.append(char)
+    return "".join(out)
+
+
+def _complete_literal(text: str) -> str:
+    """Finish a true/false/null literal, or a number, cut off at the end."""
+    match = _TRAILING_WORD.search(text)
+    if match:
+        for literal in _LITERALS:
+            if literal.startswith(match.group()):
+                return text + literal[len(match.group()):]
+    return _TRAILING_NUMBER_PART.sub("", text)
+
+
+def _scan(text: str):
+    """
+    Scan text for bracket structure outside strings.
+
+    Returns:
+        Tuple of (text cut after the first complete top-level value,
+        closers still open, whether a string is open, positions of
+        commas and open brackets)
+    """
+    stack = []
+    commas = []
+    opens = []
+    in_string = False
+    escaped = False
+    for index, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == ",":
+            commas.append(index)
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+            opens.append(index)
+        elif char in "}]" and stack:
+            stack.pop()
+            opens.pop()
+            if not stack:
+                # Anything after the top-level value is trailing prose
+                return text[:index + 1], [], False, commas + opens
+    return text, stack, in_string, commas + opens
+
+
+def repair_json(text: str, max_backtracks: int = 20) -> str:
+    """
+    Repair common defects in model-generated JSON.
+
+    Truncated output is closed by completing a cut-off literal and
+    terminating the open string and brackets; if that is still invalid
+    (e.g. cut after a key), the text is cut back to the previous comma,
+    or the innermost open bracket, and closed again.
+
+    Args:
+        text: Raw generated text
+        max_backtracks: How many trailing elements may be dropped
+
+    Returns:
+        Text that is more likely to parse; not guaranteed valid
+    """
+    text = strip_fences(text)
+
+    # Skip any prose before the first bracket
+    starts = [index for index in (text.find("{"), text.find("[")) if index != -1]
+    if starts:
+        text = text[min(starts):]
+
+    candidate = text
+    for _ in range(max_backtracks + 1):
+        text, stack, in_string, cuts = _scan(text)
+        if not stack and not in_string:
+            return _remove_trailing_commas(text)
+        body = text + '"' if in_string else _complete_literal(text.rstrip())
+        candidate = _remove_trailing_commas(body + "".join(reversed(stack)))
+        try:
+            json.loads(candidate)
+            return candidate
+        except json.JSONDecodeError:
+            # Cut back to the last comma or open bracket before the end
+            cuts = [index for index in cuts if index < len(text) - 1]
+            if not cuts:
+                return candidate
+            cut = max(cuts)
+            text = text[:cut + 1] if text[cut] in "{[" else text[:cut]
+
+    return candidate
+
+
+def loads_lenient(text: str) -> Any:
+    """
+    Parse JSON, repairing it if the strict parse fails.
+
+    Args:
+        text: Raw generated text
+
+    Returns:
+        Parsed JSON value
+
+    Raises:
+        json.JSONDecodeError: If the text cannot be repaired
+    """
+    text = strip_fences(text)
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return json.loads(repair_json(text))
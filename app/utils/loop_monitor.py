@@ -0,0 +1,127 @@
+"""
+Event Loop Monitor Module
+
+Measures how late the event loop wakes up a sleeping task ("lag") and
+exports it as the event_loop_lag_seconds gauge and summary. Any
+synchronous work on the loop thread (a render, a large JSON dump, a
+blocking client) shows up as lag for every request on the worker.
+
+A watchdog thread checks the loop's heartbeat. When the loop has been
+stuck for longer than LOOP_LAG_THRESHOLD, it captures the loop thread's
+stack, which shows the code doing the blocking, and logs it. Logs are
+rate limited to one per LOOP_LAG_LOG_INTERVAL; stalls in between are
+only counted.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+
+from app.utils.metrics import metrics
+
+
+LOOP_MONITOR = os.getenv("LOOP_MONITOR", "True").lower() == "true"
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", "0.1"))  # Seconds between heartbeats
+LOOP_LAG_THRESHOLD = float(os.getenv("LOOP_LAG_THRESHOLD", "0.1"))  # Stall long enough to capture a stack
+LOOP_LAG_LOG_INTERVAL = float(os.getenv("LOOP_LAG_LOG_INTERVAL", "60"))  # Seconds between logged stacks
+
+
+class LoopMonitor:
+    """
+    Heartbeat task on the event loop plus a watchdog thread.
+    """
+
+    def __init__(
+        self,
+        interval: float = LOOP_LAG_INTERVAL,
+        threshold: float = LOOP_LAG_THRESHOLD,
+        log_interval: float = LOOP_LAG_LOG_INTERVAL
+    ):
+        """
+        Args:
+            interval: Seconds the heartbeat sleeps between beats
+            threshold: Stall duration that triggers a stack capture
+            log_interval: Minimum seconds between logged stacks
+        """
+        self.interval = interval
+        self.threshold = threshold
+        self.log_interval = log_interval
+        self._heartbeat = time.monotonic()
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._loop_thread_id: Optional[int] = None
+        self._last_logged = 0.0
+        self._suppressed = 0
+
+    def start(self) -> None:
+        """Start monitoring the running event loop."""
+        if self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._beat())
+        self._thread = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        """Stop the heartbeat task and the watchdog thread."""
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    async def _beat(self) -> None:
+        """Sleep in a loop, recording how late each wake-up is."""
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            self._heartbeat = now
+            metrics.set_gauge("event_loop_lag_seconds", lag)
+            metrics.observe("event_loop_lag_seconds", lag)
+
+    def _watch(self) -> None:
+        """Watchdog thread: capture the loop's stack once per stall."""
+        captured_for = None
+        while not self._stop.wait(self.threshold / 2):
+            heartbeat = self._heartbeat
+            stalled = time.monotonic() - heartbeat - self.interval
+            if stalled < self.threshold or captured_for == heartbeat:
+                continue
+            # One capture per stall, however long it lasts
+            captured_for = heartbeat
+            metrics.increment("event_loop_stalls")
+            self._report(stalled)
+
+    def _report(self, stalled: float) -> None:
+        """Log the loop thread's current stack, rate limited."""
+        now = time.monotonic()
+        if now - self._last_logged < self.log_interval:
+            self._suppressed += 1
+            return
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return
+        stack = "".join(traceback.format_stack(frame))
+        suppressed = f" ({self._suppressed} more since last report)" if self._suppressed else ""
+        print(f"Event loop blocked for {stalled:.3f}s+{suppressed}; loop thread stack:\n{stack}")
+        self._last_logged = now
+        self._suppressed = 0
+
+
+# Singleton
+loop_monitor = LoopMonitor()
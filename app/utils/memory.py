@@ -0,0 +1,257 @@
+"""
+Memory Instrumentation Module
+
+Wraps tracemalloc for the admin memory endpoints: tracing can be turned
+on and off at runtime, snapshots are kept by id so any two can be
+diffed, and top allocation sites are reported by line, file or
+traceback. Renders can measure their peak traced memory, and caches
+estimate their own footprint with deep_sizeof.
+
+Tracing slows allocation-heavy code noticeably, so it is off unless
+TRACEMALLOC is set or an admin starts it.
+"""
+
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.utils.metrics import metrics
+
+
+TRACEMALLOC = os.getenv("TRACEMALLOC", "False").lower() == "true"  # Trace from startup
+TRACEMALLOC_FRAMES = int(os.getenv("TRACEMALLOC_FRAMES", "10"))  # Stack depth recorded per allocation
+MAX_SNAPSHOTS = int(os.getenv("TRACEMALLOC_MAX_SNAPSHOTS", "10"))
+GROUP_BY = ("lineno", "filename", "traceback")
+
+# tracemalloc's own bookkeeping is not interesting
+_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>")
+]
+
+
+def deep_sizeof(obj: Any) -> int:
+    """
+    Estimate the memory held by an object and everything it references.
+
+    Follows containers, instance dicts and slots; objects reached more
+    than once are counted once. Types and modules are not followed.
+
+    Args:
+        obj: Root object, e.g. a cache's entry map
+
+    Returns:
+        Approximate size in bytes
+    """
+    seen = set()
+    stack = [obj]
+    total = 0
+    while stack:
+        item = stack.pop()
+        if id(item) in seen or isinstance(item, (type, type(sys))):
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        elif not isinstance(item, (str, bytes, bytearray, int, float)):
+            if hasattr(item, "__dict__"):
+                stack.append(item.__dict__)
+            for slot in getattr(type(item), "__slots__", ()):
+                if hasattr(item, slot):
+                    stack.append(getattr(item, slot))
+    return total
+
+
+def process_memory() -> Dict[str, Optional[int]]:
+    """
+    Return this process's resident set size, current and peak, in bytes.
+
+    Values are None where the platform does not expose them.
+    """
+    rss = None
+    try:
+        with open("/proc/self/statm") as f:
+            rss = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+
+    max_rss = None
+    try:
+        import resource
+
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Kilobytes on Linux, bytes on macOS
+        max_rss *= 1 if sys.platform == "darwin" else 1024
+    except ImportError:
+        pass
+
+    return {"rss_bytes": rss, "max_rss_bytes": max_rss}
+
+
+class MemoryTracer:
+    """
+    tracemalloc control with numbered snapshots.
+    """
+
+    def __init__(self, max_snapshots: int = MAX_SNAPSHOTS):
+        """Initialize with no snapshots."""
+        self.max_snapshots = max_snapshots
+        self._snapshots: "OrderedDict[int, Tuple[float, tracemalloc.Snapshot]]" = OrderedDict()
+        self._next_id = 1
+        self._peak_lock = threading.Lock()
+        self._peak_users = 0
+
+    @property
+    def tracing(self) -> bool:
+        """Whether tracemalloc is running."""
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = TRACEMALLOC_FRAMES) -> None:
+        """Start tracing allocations, keeping `frames` frames each."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    def stop(self) -> None:
+        """Stop tracing and drop all snapshots."""
+        tracemalloc.stop()
+        self._snapshots.clear()
+
+    def status(self) -> Dict[str, Any]:
+        """Tracing state, traced memory and the snapshots kept."""
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "tracing": self.tracing,
+            "frames": tracemalloc.get_traceback_limit() if self.tracing else None,
+            "traced_current_bytes": current,
+            "traced_peak_bytes": peak,
+            "tracemalloc_overhead_bytes": tracemalloc.get_tracemalloc_memory(),
+            "snapshots": [
+                {"id": snapshot_id, "taken_at": taken_at}
+                for snapshot_id, (taken_at, _) in self._snapshots.items()
+            ]
+        }
+
+    def take_snapshot(self) -> int:
+        """
+        Take a snapshot, dropping the oldest beyond MAX_SNAPSHOTS.
+
+        Returns:
+            The snapshot id
+
+        Raises:
+            RuntimeError: If tracing is off
+        """
+        if not self.tracing:
+            raise RuntimeError("tracemalloc is not tracing; start it first")
+        snapshot = tracemalloc.take_snapshot().filter_traces(_FILTERS)
+        snapshot_id = self._next_id
+        self._next_id += 1
+        self._snapshots[snapshot_id] = (time.time(), snapshot)
+        while len(self._snapshots) > self.max_snapshots:
+            self._snapshots.popitem(last=False)
+        return snapshot_id
+
+    def _get(self, snapshot_id: int) -> tracemalloc.Snapshot:
+        """Return a kept snapshot, raising KeyError if unknown."""
+        if snapshot_id not in self._snapshots:
+            raise KeyError(f"Snapshot {snapshot_id} not found")
+        return self._snapshots[snapshot_id][1]
+
+    def top(self, snapshot_id: int, limit: int = 25, group_by: str = "lineno") -> List[Dict[str, Any]]:
+        """
+        Largest allocation sites in a snapshot.
+
+        Args:
+            snapshot_id: Id from take_snapshot()
+            limit: Number of sites to return
+            group_by: "lineno", "filename" or "traceback"
+
+        Raises:
+            KeyError: If the snapshot is unknown
+        """
+        stats = self._get(snapshot_id).statistics(group_by)
+        return [
+            {"site": _site(stat.traceback), "size_bytes": stat.size, "count": stat.count}
+            for stat in stats[:limit]
+        ]
+
+    def diff(
+        self,
+        snapshot_id: int,
+        base_id: int,
+        limit: int = 25,
+        group_by: str = "lineno"
+    ) -> List[Dict[str, Any]]:
+        """
+        Allocation sites that grew or shrank most between two snapshots.
+
+        Args:
+            snapshot_id: Later snapshot
+            base_id: Earlier snapshot to compare against
+            limit: Number of sites to return
+            group_by: "lineno", "filename" or "traceback"
+
+        Raises:
+            KeyError: If either snapshot is unknown
+        """
+        stats = self._get(snapshot_id).compare_to(self._get(base_id), group_by)
+        return [
+            {
+                "site": _site(stat.traceback),
+                "size_bytes": stat.size,
+                "size_diff_bytes": stat.size_diff,
+                "count": stat.count,
+                "count_diff": stat.count_diff
+            }
+            for stat in stats[:limit]
+        ]
+
+    @contextmanager
+    def measure_peak(self, name: str) -> Iterator[None]:
+        """
+        Record the peak traced memory of a block as summary `name`.
+
+        Does nothing unless tracing. The peak counter is process-wide, so
+        when blocks overlap (e.g. concurrent renders) each records the
+        peak of all of them together: an upper bound.
+        """
+        if not self.tracing:
+            yield
+            return
+
+        with self._peak_lock:
+            if self._peak_users == 0:
+                tracemalloc.reset_peak()
+            self._peak_users += 1
+            start, _ = tracemalloc.get_traced_memory()
+        try:
+            yield
+        finally:
+            with self._peak_lock:
+                self._peak_users -= 1
+                _, peak = tracemalloc.get_traced_memory()
+            metrics.observe(name, max(0, peak - start))
+
+
+def _site(traceback: tracemalloc.Traceback) -> str:
+    """Format an allocation traceback, innermost frame first."""
+    # Line numbers are 0 when grouped by filename
+    return " <- ".join(
+        f"{frame.filename}:{frame.lineno}" if frame.lineno else frame.filename
+        for frame in reversed(traceback)
+    )
+
+
+# Singleton
+memory_tracer = MemoryTracer()
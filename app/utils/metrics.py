@@ -0,0 +1,74 @@
+"""
+Metrics Module
+
+In-process counters, gauges and latency summaries for this worker,
+exposed as JSON by GET /metrics. Summaries keep a bounded window of
+recent samples, so percentiles reflect current behaviour.
+"""
+
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, Optional
+
+
+class Metrics:
+    """
+    Registry of named counters, gauges and sample windows.
+    """
+
+    def __init__(self, window: int = 1024):
+        """Initialize empty metrics keeping `window` samples per summary."""
+        self.window = window
+        self.counters: Dict[str, float] = defaultdict(float)
+        self.gauges: Dict[str, float] = {}
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def increment(self, name: str, value: float = 1) -> None:
+        """Add to a counter."""
+        self.counters[name] += value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        """Set a gauge to its current value."""
+        self.gauges[name] = value
+
+    def observe(self, name: str, value: float) -> None:
+        """Record a sample (e.g. a latency in seconds)."""
+        samples = self._samples.get(name)
+        if samples is None:
+            samples = self._samples[name] = deque(maxlen=self.window)
+        samples.append(value)
+
+    def percentile(self, name: str, q: float) -> Optional[float]:
+        """
+        Return the q-th percentile (0-100) of recent samples.
+
+        Returns:
+            Percentile value, or None if no samples were recorded
+        """
+        samples = self._samples.get(name)
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return all metrics as a JSON-friendly dict."""
+        summaries = {}
+        for name, samples in self._samples.items():
+            if samples:
+                summaries[name] = {
+                    "count": len(samples),
+                    "p50": self.percentile(name, 50),
+                    "p95": self.percentile(name, 95),
+                    "p99": self.percentile(name, 99),
+                    "max": max(samples)
+                }
+        return {
+            "counters": dict(self.counters),
+            "gauges": dict(self.gauges),
+            "summaries": summaries
+        }
+
+
+# Singleton instance
+metrics = Metrics()
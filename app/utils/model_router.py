@@ -0,0 +1,168 @@
+"""
+Model Router Module
+
+Spreads upstream generation across a configured list of models. Each
+target keeps a rolling window of latencies and outcomes; requests go to
+the fastest healthy target whose recent latency fits the remaining
+budget, and fall back to the next one when it fails. A target whose
+error rate crosses the threshold is taken out of rotation for a
+cooldown. After that it is half-open: the next request tries it first,
+as the single trial, while concurrent requests keep treating it as out
+of rotation. It rejoins when the trial succeeds and goes back out for
+another cooldown when it fails.
+"""
+
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from app.utils.metrics import metrics
+
+
+class _TargetStats:
+    """Rolling latency and outcome window for one target."""
+
+    def __init__(self, window: int):
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.outcomes: Deque[bool] = deque(maxlen=window)
+        self.open_until = 0.0  # Out of rotation until this (monotonic) time
+        self.probe_started = 0.0  # When the half-open trial was handed out, 0 if none
+
+    def percentile(self, q: float) -> float:
+        """q-th percentile (0-100) of recent successful latencies, 0 if none."""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+    @property
+    def error_rate(self) -> float:
+        """Share of failed requests in the window."""
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+
+class ModelRouter:
+    """
+    Latency- and health-aware choice among upstream targets.
+    """
+
+    def __init__(
+        self,
+        targets: List[str],
+        window: int = 50,
+        max_error_rate: float = 0.5,
+        cooldown: float = 30.0,
+        min_samples: int = 5
+    ):
+        """
+        Args:
+            targets: Model names, in order of preference when nothing is known
+            window: Requests remembered per target
+            max_error_rate: Error rate at which a target is taken out
+            cooldown: Seconds a failing target stays out of rotation; also
+                how long a trial may go unanswered before another is sent
+            min_samples: Requests needed before the error rate counts
+        """
+        if not targets:
+            raise ValueError("ModelRouter needs at least one target")
+        self.targets = list(targets)
+        self.max_error_rate = max_error_rate
+        self.cooldown = cooldown
+        self.min_samples = min_samples
+        self._stats = {target: _TargetStats(window) for target in self.targets}
+
+    def candidates(self, budget: Optional[float] = None) -> List[str]:
+        """
+        Order targets for a request.
+
+        A half-open target with no trial in flight comes first, and this
+        request becomes its trial. Healthy targets follow, fastest (median
+        latency) first, with those whose p95 fits the budget ahead of those
+        that don't. Untried targets count as fastest so they get measured.
+        Targets out of rotation, and half-open ones already being tried,
+        come last, as a final fallback.
+
+        Args:
+            budget: Seconds the request may still take, if limited
+
+        Returns:
+            All targets, best first
+        """
+        now = time.monotonic()
+        trials = []
+        healthy = []
+        out = []
+        for target in self.targets:
+            stats = self._stats[target]
+            if not stats.open_until:
+                healthy.append(target)
+            elif stats.open_until > now or self._probing(stats, now):
+                out.append(target)
+            elif not trials:
+                stats.probe_started = now
+                trials.append(target)
+            else:
+                out.append(target)
+        healthy.sort(key=lambda t: self._stats[t].percentile(50))
+        if budget is not None:
+            healthy.sort(key=lambda t: self._stats[t].percentile(95) > budget)
+        out.sort(key=lambda t: self._stats[t].open_until)
+        return trials + healthy + out
+
+    def _probing(self, stats: _TargetStats, now: float) -> bool:
+        """Whether a trial is in flight; unanswered trials lapse after a cooldown."""
+        return bool(stats.probe_started) and now - stats.probe_started < self.cooldown
+
+    def record(self, target: str, seconds: float, ok: bool) -> None:
+        """
+        Record the outcome of one request.
+
+        Args:
+            target: Model the request went to
+            seconds: How long it took
+            ok: Whether the target answered successfully
+        """
+        stats = self._stats[target]
+        if ok:
+            stats.latencies.append(seconds)
+            if stats.open_until:
+                # The trial after a cooldown succeeded; start afresh
+                stats.open_until = 0.0
+                stats.probe_started = 0.0
+                stats.outcomes.clear()
+            stats.outcomes.append(True)
+        else:
+            stats.outcomes.append(False)
+            tripped = len(stats.outcomes) >= self.min_samples and stats.error_rate >= self.max_error_rate
+            if stats.open_until or tripped:
+                stats.open_until = time.monotonic() + self.cooldown
+                stats.probe_started = 0.0
+                metrics.increment(f"model_taken_out_{target}")
+                print(f"Model {target} taken out of rotation for {self.cooldown:.0f}s")
+
+        metrics.set_gauge(f"model_latency_p50_{target}", stats.percentile(50))
+        metrics.set_gauge(f"model_error_rate_{target}", stats.error_rate)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Return per-target latency, error rate and state."""
+        now = time.monotonic()
+        report = {}
+        for target, stats in self._stats.items():
+            if stats.open_until > now:
+                state = "open"
+            elif stats.open_until and self._probing(stats, now):
+                state = "probing"
+            elif stats.open_until:
+                state = "half_open"
+            else:
+                state = "closed"
+            report[target] = {
+                "state": state,
+                "samples": len(stats.outcomes),
+                "latency_p50": round(stats.percentile(50), 4),
+                "latency_p95": round(stats.percentile(95), 4),
+                "error_rate": round(stats.error_rate, 4)
+            }
+        return report
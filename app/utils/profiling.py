@@ -0,0 +1,195 @@
+"""
+Request Profiling Module
+
+Profiles a single request on demand. An admin sends the X-Profile
+header (or a `profile` query parameter) together with the admin token;
+the request then runs under a sampling profiler and its report is
+written to PROFILE_DIR. The response carries a link to the report in
+the X-Profile-URL header.
+
+pyinstrument is used when installed, since it samples cheaply and
+follows the request across awaits; otherwise the request falls back
+to cProfile, whose report also includes other work that ran on the
+event loop meanwhile. Only one request is profiled at a time.
+
+The middleware is installed only when ADMIN_TOKEN is set, and for
+unflagged requests it only inspects the headers and query string.
+"""
+
+import asyncio
+import io
+import os
+import re
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qs
+
+from app.utils.admin import ADMIN_HEADER, is_admin_token
+
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "50"))  # Oldest reports are deleted beyond this
+PROFILE_HEADER = "X-Profile"
+PROFILE_QUERY = "profile"
+PROFILE_URL_HEADER = "X-Profile-URL"
+PROFILE_NAME = re.compile(r"^[0-9]{8}T[0-9]{12}-[0-9a-f]{8}\.(html|txt)$")
+CPROFILE_ROWS = 80  # Functions listed in a cProfile report
+
+# ASGI header names are lower-case bytes
+_ADMIN_HEADER = ADMIN_HEADER.lower().encode("latin-1")
+_PROFILE_HEADER = PROFILE_HEADER.lower().encode("latin-1")
+
+
+class _Profiler:
+    """pyinstrument if available, cProfile otherwise."""
+
+    def __init__(self):
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            import cProfile
+
+            self._pyinstrument = None
+            self._cprofile = cProfile.Profile()
+            self.extension = "txt"
+        else:
+            self._pyinstrument = Profiler(async_mode="enabled")
+            self._cprofile = None
+            self.extension = "html"
+
+    def start(self) -> None:
+        """Start profiling."""
+        if self._pyinstrument is not None:
+            self._pyinstrument.start()
+        else:
+            self._cprofile.enable()
+
+    def stop(self) -> str:
+        """Stop profiling and return the report."""
+        if self._pyinstrument is not None:
+            self._pyinstrument.stop()
+            return self._pyinstrument.output_html()
+
+        import pstats
+
+        self._cprofile.disable()
+        out = io.StringIO()
+        stats = pstats.Stats(self._cprofile, stream=out)
+        stats.sort_stats("cumulative").print_stats(CPROFILE_ROWS)
+        return out.getvalue()
+
+
+class ProfileStore:
+    """
+    Bounded directory of profile reports.
+    """
+
+    def __init__(self, directory: str = PROFILE_DIR, max_files: int = PROFILE_MAX_FILES):
+        self.directory = directory
+        self.max_files = max_files
+
+    def new_name(self, extension: str) -> str:
+        """Return a fresh, sortable report filename."""
+        now = time.time()
+        stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime(now)) + f"{int(now % 1 * 1e6):06d}"
+        return f"{stamp}-{uuid.uuid4().hex[:8]}.{extension}"
+
+    def path(self, name: str) -> Optional[str]:
+        """
+        Resolve a report name to its file.
+
+        Returns:
+            The file path, or None if the name is not a report name or
+            the report does not exist
+        """
+        if not PROFILE_NAME.match(name):
+            return None
+        path = os.path.join(self.directory, name)
+        return path if os.path.exists(path) else None
+
+    def save(self, name: str, report: str, label: str) -> None:
+        """
+        Write a report and delete the oldest ones beyond the limit.
+
+        Args:
+            name: Filename from new_name()
+            report: Report contents
+            label: Request line, recorded at the top of text reports
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        if name.endswith(".txt"):
+            report = f"{label}\n\n{report}"
+        with open(os.path.join(self.directory, name), "w", encoding="utf-8") as f:
+            f.write(report)
+
+        reports = sorted(entry for entry in os.listdir(self.directory) if PROFILE_NAME.match(entry))
+        for old in reports[:-self.max_files]:
+            try:
+                os.remove(os.path.join(self.directory, old))
+            except FileNotFoundError:
+                pass
+
+
+def _wants_profile(scope: Dict[str, Any]) -> bool:
+    """Whether an admin asked for this request to be profiled."""
+    token = None
+    flagged = False
+    for name, value in scope["headers"]:
+        if name == _ADMIN_HEADER:
+            token = value.decode("latin-1")
+        elif name == _PROFILE_HEADER:
+            flagged = value not in (b"", b"0", b"false")
+    if not flagged and scope.get("query_string"):
+        values = parse_qs(scope["query_string"].decode("latin-1")).get(PROFILE_QUERY)
+        flagged = bool(values) and values[-1] not in ("", "0", "false")
+    return flagged and is_admin_token(token)
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware that profiles requests flagged by an admin.
+    """
+
+    def __init__(self, app: Callable, store: Optional[ProfileStore] = None):
+        self.app = app
+        self.store = store or profile_store
+        self._lock = asyncio.Lock()
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http" or not _wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+        if self._lock.locked():
+            # Profilers don't nest; serve this one unprofiled
+            await self.app(scope, receive, _with_header(send, (PROFILE_URL_HEADER, "busy")))
+            return
+
+        async with self._lock:
+            profiler = _Profiler()
+            name = self.store.new_name(profiler.extension)
+            link = (PROFILE_URL_HEADER, f"/admin/profiles/{name}")
+            profiler.start()
+            try:
+                await self.app(scope, receive, _with_header(send, link))
+            finally:
+                report = profiler.stop()
+                label = f"{scope['method']} {scope['path']}"
+                self.store.save(name, report, label)
+                print(f"Profiled {label} -> {name}")
+
+
+def _with_header(send: Callable, header: Tuple[str, str]) -> Callable:
+    """Wrap an ASGI send callable to add a header to the response."""
+    async def wrapped(message: Dict[str, Any]) -> None:
+        if message["type"] == "http.response.start":
+            message = dict(message)
+            message["headers"] = list(message.get("headers", [])) + [
+                (header[0].lower().encode("latin-1"), header[1].encode("latin-1"))
+            ]
+        await send(message)
+    return wrapped
+
+
+# Singleton
+profile_store = ProfileStore()
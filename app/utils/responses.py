@@ -0,0 +1,35 @@
+"""
+Fast Response Classes
+
+JSON responses serialized directly by pydantic-core, bypassing
+FastAPI's response_model re-validation and the stdlib json encoder.
+"""
+
+from typing import Any
+
+from fastapi.responses import Response
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+
+class FastJSONResponse(Response):
+    """
+    JSON response that trusts its content.
+
+    Accepts a Pydantic model (serialized with model_dump_json), raw bytes
+    that are already valid JSON (sent as-is, e.g. from a cache), or any
+    other JSON-compatible value (serialized with pydantic_core.to_json).
+
+    Returning this from an endpoint skips response_model validation, so
+    only pass models that were built or validated by the application.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        """Serialize content to JSON bytes."""
+        if isinstance(content, bytes):
+            return content
+        if isinstance(content, BaseModel):
+            return content.model_dump_json().encode("utf-8")
+        return to_json(content)
@@ -0,0 +1,188 @@
+"""
+Priority Scheduler Module
+
+Limits concurrent upstream calls and hands free slots out by priority
+class, so interactive requests go ahead of queued batch and pre-warming
+work. Background classes never hold the slots reserved for interactive
+traffic, and a request that has waited longer than the starvation limit
+is served before higher classes, which bounds how long it can starve.
+
+The caller's class is carried in a context variable, so pipeline code
+sets it once with `priority_scope` and every upstream call made on its
+behalf (including concurrent section calls) is scheduled accordingly.
+API clients running batch jobs mark their requests with the
+`X-Priority: batch` header; the pre-generation CLI runs as pre-warming,
+or as batch with --priority batch.
+"""
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Deque, Dict, Iterator, Optional, Tuple
+
+from app.utils.metrics import metrics
+
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+PREWARM = "prewarm"
+PRIORITIES = (INTERACTIVE, BATCH, PREWARM)  # Highest first
+PRIORITY_HEADER = "X-Priority"
+REQUEST_PRIORITIES = (INTERACTIVE, BATCH)  # Classes API requests may ask for
+
+_current_priority: ContextVar[str] = ContextVar("priority", default=INTERACTIVE)
+
+
+@contextmanager
+def priority_scope(priority: str) -> Iterator[None]:
+    """
+    Run the enclosed code, and tasks it starts, in a priority class.
+
+    Args:
+        priority: One of PRIORITIES
+
+    Raises:
+        ValueError: If the priority class is unknown
+    """
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown priority class: {priority}")
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_priority() -> str:
+    """Return the priority class of the running code."""
+    return _current_priority.get()
+
+
+class PriorityScheduler:
+    """
+    Bounded pool of slots granted in priority order.
+    """
+
+    def __init__(self, name: str, capacity: int, reserved: int, starvation_limit: float):
+        """
+        Initialize the scheduler.
+
+        Args:
+            name: Prefix for exported metrics
+            capacity: Maximum number of concurrent slots
+            reserved: Slots only interactive requests may use
+            starvation_limit: Seconds after which a waiter is served first
+        """
+        self.name = name
+        self.capacity = max(1, capacity)
+        self.reserved = min(max(0, reserved), self.capacity - 1)
+        self.starvation_limit = starvation_limit
+        self._active = 0
+        self._active_background = 0
+        self._queues: Dict[str, Deque[Tuple[float, asyncio.Future]]] = {
+            priority: deque() for priority in PRIORITIES
+        }
+
+    @asynccontextmanager
+    async def slot(self, priority: Optional[str] = None) -> AsyncIterator[None]:
+        """
+        Hold one slot for the duration of the block.
+
+        Args:
+            priority: Priority class; defaults to the current scope's
+        """
+        priority = priority or current_priority()
+        await self._acquire(priority)
+        try:
+            yield
+        finally:
+            self._release(priority)
+
+    async def _acquire(self, priority: str) -> None:
+        """Wait until a slot is granted to this priority class."""
+        enqueued = time.monotonic()
+        ahead = PRIORITIES[:PRIORITIES.index(priority) + 1]
+        if self._can_run(priority) and not any(self._queues[p] for p in ahead):
+            self._start(priority)
+            metrics.observe(f"{self.name}_queue_wait_seconds_{priority}", 0.0)
+            return
+
+        entry = (enqueued, asyncio.get_running_loop().create_future())
+        queue = self._queues[priority]
+        queue.append(entry)
+        self._update_gauges()
+        try:
+            await entry[1]
+        except asyncio.CancelledError:
+            if entry[1].done() and not entry[1].cancelled():
+                # Granted just as we were cancelled; hand the slot on
+                self._release(priority)
+            elif entry in queue:
+                queue.remove(entry)
+                self._update_gauges()
+            raise
+        metrics.observe(f"{self.name}_queue_wait_seconds_{priority}", time.monotonic() - enqueued)
+
+    def _can_run(self, priority: str) -> bool:
+        """Whether a slot is free for this priority class."""
+        if self._active >= self.capacity:
+            return False
+        if priority != INTERACTIVE and self._active_background >= self.capacity - self.reserved:
+            return False
+        return True
+
+    def _start(self, priority: str) -> None:
+        """Account for a granted slot."""
+        self._active += 1
+        if priority != INTERACTIVE:
+            self._active_background += 1
+
+    def _release(self, priority: str) -> None:
+        """Free a slot and grant free slots to waiters."""
+        self._active -= 1
+        if priority != INTERACTIVE:
+            self._active_background -= 1
+
+        while True:
+            chosen = self._next_priority()
+            if chosen is None:
+                break
+            _enqueued, future = self._queues[chosen].popleft()
+            if future.cancelled():
+                continue
+            self._start(chosen)
+            future.set_result(None)
+        self._update_gauges()
+
+    def _next_priority(self) -> Optional[str]:
+        """
+        Pick the class to grant the next slot to.
+
+        The oldest waiter past the starvation limit wins; otherwise the
+        highest class that may run.
+        """
+        runnable = [p for p in PRIORITIES if self._queues[p] and self._can_run(p)]
+        if not runnable:
+            return None
+        now = time.monotonic()
+        starving = [p for p in runnable if now - self._queues[p][0][0] >= self.starvation_limit]
+        if starving:
+            return min(starving, key=lambda p: self._queues[p][0][0])
+        return runnable[0]
+
+    def queue_lengths(self) -> Dict[str, int]:
+        """Number of waiters per priority class."""
+        return {priority: len(queue) for priority, queue in self._queues.items()}
+
+    @property
+    def active(self) -> int:
+        """Number of slots in use."""
+        return self._active
+
+    def _update_gauges(self) -> None:
+        """Export queue lengths and slot usage."""
+        for priority, queue in self._queues.items():
+            metrics.set_gauge(f"{self.name}_queue_length_{priority}", len(queue))
+        metrics.set_gauge(f"{self.name}_active_slots", self._active)
@@ -0,0 +1,154 @@
+"""
+Shared Cache Module
+
+A host-wide key/value cache backed by SQLite in WAL mode, so every
+uvicorn worker on the host reads and writes the same entries instead of
+warming its own copy. WAL lets readers run without blocking on writers,
+keeping the read path to a single indexed SELECT.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+
+# Configuration
+CACHE_PATH = os.getenv("SHARED_CACHE_PATH", os.path.join("cache_data", "shared_cache.db"))
+DEFAULT_TTL = int(os.getenv("SHARED_CACHE_TTL", str(7 * 24 * 3600)))
+PURGE_EVERY = 500  # Writes between sweeps of expired rows
+
+
+class SharedCache:
+    """
+    Cross-process cache of byte values grouped into namespaces.
+
+    Each thread gets its own SQLite connection; connections are cheap
+    and SQLite handles locking between processes.
+    """
+
+    def __init__(self, path: str = CACHE_PATH, default_ttl: int = DEFAULT_TTL):
+        """Initialize the cache and create its table if needed."""
+        self.path = path
+        self.default_ttl = default_ttl
+        self._local = threading.local()
+        self._writes = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " namespace TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " value BLOB NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " PRIMARY KEY (namespace, key))"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    async def warmup(self) -> None:
+        """Open this thread's connection and touch the table."""
+        self._connection().execute("SELECT 1 FROM cache LIMIT 1").fetchall()
+
+    def get(self, namespace: str, key: str, allow_expired: bool = False) -> Optional[Tuple[bytes, float, float]]:
+        """
+        Read a cached value.
+
+        Args:
+            namespace: Logical group, e.g. "guides" or "gemini"
+            key: Entry key within the namespace
+            allow_expired: Also return entries past their TTL that have not
+                been purged yet (stale-if-error fallbacks)
+
+        Returns:
+            Tuple of (value, created_at, expires_at), or None if missing
+            or expired
+        """
+        row = self._connection().execute(
+            "SELECT value, created_at, expires_at FROM cache WHERE namespace = ? AND key = ? AND expires_at > ?",
+            (namespace, key, 0.0 if allow_expired else time.time())
+        ).fetchone()
+        if row is None:
+            return None
+        return bytes(row[0]), row[1], row[2]
+
+    def set(self, namespace: str, key: str, value: bytes, ttl: Optional[int] = None) -> Tuple[float, float]:
+        """
+        Write a value, replacing any existing entry.
+
+        Args:
+            namespace: Logical group, e.g. "guides" or "gemini"
+            key: Entry key within the namespace
+            value: Bytes to store
+            ttl: Lifetime in seconds (defaults to SHARED_CACHE_TTL)
+
+        Returns:
+            Tuple of the entry's (created_at, expires_at) timestamps
+        """
+        now = time.time()
+        expires_at = now + (self.default_ttl if ttl is None else ttl)
+        conn = self._connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache (namespace, key, value, created_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+            (namespace, key, value, now, expires_at)
+        )
+
+        self._writes += 1
+        if self._writes % PURGE_EVERY == 0:
+            self.purge_expired()
+
+        return now, expires_at
+
+    def delete(self, namespace: str, key: str) -> None:
+        """Remove an entry if present."""
+        self._connection().execute(
+            "DELETE FROM cache WHERE namespace = ? AND key = ?",
+            (namespace, key)
+        )
+
+    def purge_expired(self) -> int:
+        """
+        Delete all expired entries.
+
+        Returns:
+            Number of rows removed
+        """
+        cursor = self._connection().execute(
+            "DELETE FROM cache WHERE expires_at <= ?",
+            (time.time(),)
+        )
+        return cursor.rowcount
+
+    def disk_usage(self) -> Dict[str, int]:
+        """
+        Number of rows and bytes on disk, including the WAL.
+
+        The cache lives in SQLite files, not in this process's memory;
+        only SQLite's page cache is held per connection.
+        """
+        (rows,) = self._connection().execute("SELECT COUNT(*) FROM cache").fetchone()
+        size = 0
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                size += os.path.getsize(self.path + suffix)
+            except OSError:
+                pass
+        return {"entries": rows, "disk_bytes": size}
+
+
+# Singleton
+shared_cache = SharedCache()
@@ -0,0 +1,53 @@
+"""
+Startup State Module
+
+Tracks how long the application took to import and warm up, and whether
+it is ready to serve traffic. The readiness flag only flips after the
+warmup phase in the lifespan handler has finished.
+"""
+
+import time
+from typing import Awaitable, Callable, Dict
+
+
+class StartupState:
+    """
+    Readiness flag and startup timings for this worker.
+    """
+
+    def __init__(self):
+        """Initialize a not-yet-ready state."""
+        self.ready = False
+        self.import_seconds = 0.0
+        self.warmup_seconds: Dict[str, float] = {}
+
+    async def run_step(self, name: str, step: Callable[[], Awaitable[None]]) -> None:
+        """
+        Run and time one warmup step.
+
+        Failures are reported but do not stop startup; the affected
+        component initializes lazily on first use instead.
+
+        Args:
+            name: Label used in the timing report
+            step: Coroutine function performing the warmup
+        """
+        start = time.perf_counter()
+        try:
+            await step()
+        except Exception as e:
+            print(f"Warmup step '{name}' failed: {str(e)}")
+        self.warmup_seconds[name] = round(time.perf_counter() - start, 4)
+
+    def summary(self) -> Dict[str, object]:
+        """Return the timings as a JSON-friendly dict."""
+        return {
+            "ready": self.ready,
+            "import_seconds": round(self.import_seconds, 4),
+            "warmup_seconds": dict(self.warmup_seconds),
+            "total_warmup_seconds": round(sum(self.warmup_seconds.values()), 4)
+        }
+
+
+# Singleton instance
+startup_state = StartupState()
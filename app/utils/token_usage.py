@@ -0,0 +1,122 @@
+"""
+Token Usage Module
+
+Accumulates the usageMetadata Gemini returns with every response:
+prompt, candidate (output) and context-cached token counts, and their
+cost at the answering model's per-million-token prices.
+
+MODEL_PRICES holds list prices (prompts up to 128k tokens) for common
+models. Versioned names ("gemini-1.5-flash-002") use the longest listed
+prefix. GEMINI_PRICES overrides or adds models as JSON
+{"model": [input, output, cached]}. Models not listed at all are
+charged at the GEMINI_PRICE_* defaults.
+"""
+
+import json
+import os
+from typing import Any, Dict, Tuple
+
+
+# USD per million tokens: (input, output, cached input)
+MODEL_PRICES: Dict[str, Tuple[float, float, float]] = {
+    "gemini-1.5-flash": (0.075, 0.30, 0.01875),
+    "gemini-1.5-flash-8b": (0.0375, 0.15, 0.01),
+    "gemini-1.5-pro": (1.25, 5.00, 0.3125),
+    "gemini-2.0-flash": (0.10, 0.40, 0.025),
+    "gemini-2.0-flash-lite": (0.075, 0.30, 0.01875),
+    "gemini-2.5-flash": (0.30, 2.50, 0.075),
+    "gemini-2.5-pro": (1.25, 10.00, 0.31),
+}
+MODEL_PRICES.update({
+    model: tuple(float(price) for price in prices)
+    for model, prices in json.loads(os.getenv("GEMINI_PRICES", "{}")).items()
+})
+# Prices for models not in MODEL_PRICES
+PRICE_INPUT = float(os.getenv("GEMINI_PRICE_INPUT", "0.075"))
+PRICE_OUTPUT = float(os.getenv("GEMINI_PRICE_OUTPUT", "0.30"))
+PRICE_CACHED = float(os.getenv("GEMINI_PRICE_CACHED", "0.01875"))  # Prompt tokens served from context cache
+
+
+def prices_for(model: str) -> Tuple[float, float, float]:
+    """
+    Return (input, output, cached input) USD per million tokens for a model.
+
+    Args:
+        model: Model name, optionally with a version suffix
+    """
+    matches = [name for name in MODEL_PRICES if model == name or model.startswith(name + "-")]
+    if not matches:
+        return PRICE_INPUT, PRICE_OUTPUT, PRICE_CACHED
+    return MODEL_PRICES[max(matches, key=len)]
+
+
+class BudgetExceeded(Exception):
+    """Raised instead of calling Gemini when a token budget is used up."""
+
+
+class TokenUsage:
+    """
+    Running token counts and cost for one or more Gemini calls.
+    """
+
+    def __init__(self):
+        """Initialize with nothing used."""
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.candidate_tokens = 0
+        self.cached_tokens = 0
+        self.cost = 0.0  # USD, priced per call at the answering model's rates
+
+    @property
+    def total_tokens(self) -> int:
+        """Prompt plus candidate tokens."""
+        return self.prompt_tokens + self.candidate_tokens
+
+    def add_metadata(self, usage_metadata: Dict[str, Any], model: str) -> "TokenUsage":
+        """
+        Count one response.
+
+        Args:
+            usage_metadata: The response's usageMetadata block
+            model: Model that answered, which sets the prices
+
+        Returns:
+            The usage of that response alone
+        """
+        call = TokenUsage()
+        call.calls = 1
+        call.prompt_tokens = int(usage_metadata.get("promptTokenCount", 0))
+        # Thinking models bill their thoughts as output
+        call.candidate_tokens = (
+            int(usage_metadata.get("candidatesTokenCount", 0))
+            + int(usage_metadata.get("thoughtsTokenCount", 0))
+        )
+        call.cached_tokens = int(usage_metadata.get("cachedContentTokenCount", 0))
+        # Cached prompt tokens are billed at the cached rate
+        price_input, price_output, price_cached = prices_for(model)
+        call.cost = (
+            (call.prompt_tokens - call.cached_tokens) * price_input
+            + call.cached_tokens * price_cached
+            + call.candidate_tokens * price_output
+        ) / 1_000_000
+        self.add(call)
+        return call
+
+    def add(self, other: "TokenUsage") -> None:
+        """Add another usage to this one."""
+        self.calls += other.calls
+        self.prompt_tokens += other.prompt_tokens
+        self.candidate_tokens += other.candidate_tokens
+        self.cached_tokens += other.cached_tokens
+        self.cost += other.cost
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the counts and cost as a JSON-friendly dict."""
+        return {
+            "calls": self.calls,
+            "prompt_tokens": self.prompt_tokens,
+            "candidate_tokens": self.candidate_tokens,
+            "cached_tokens": self.cached_tokens,
+            "total_tokens": self.total_tokens,
+            "cost_usd": round(self.cost, 6)
+        }
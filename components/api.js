@@ -20,6 +20,8 @@ export const generatePlantGuide = async (formData) => {
     }
 
     const data = await response.json();
+    // Stable URL of this guide, fetchable later via getPlantGuide()
+    data.guideUrl = response.headers.get('Location');
     return data;
   } catch (error) {
     if (error.name === 'TypeError' && error.message.includes('fetch')) {
@@ -27,4 +29,21 @@ export const generatePlantGuide = async (formData) => {
     }
     throw error;
   }
+};
+
+// Fetch a previously generated guide. The backend sends ETag and
+// Cache-Control headers, so the browser (or a CDN) serves repeat reads
+// from its cache and revalidates with a conditional GET.
+export const getPlantGuide = async (guideId) => {
+  const response = await fetch(`${API_BASE_URL}/plant-guides/${encodeURIComponent(guideId)}`);
+
+  if (!response.ok) {
+    const errorData = await response.json().catch(() => ({}));
+    throw new Error(
+      errorData.detail ||
+      `Server error: ${response.status} ${response.statusText}`
+    );
+  }
+
+  return response.json();
 };
\ No newline at end of file
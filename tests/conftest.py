@@ -0,0 +1,41 @@
+"""
+Shared test setup.
+
+Services create their output and cache directories relative to the
+working directory at import time, so the tests run from a scratch
+directory with no API keys set (Gemini and NotebookLM fall back to
+their mock responses).
+"""
+
+import os
+import tempfile
+
+os.environ["GEMINI_API_KEY"] = ""
+os.environ["NOTEBOOKLM_API_KEY"] = ""
+os.chdir(tempfile.mkdtemp(prefix="plant-guide-tests-"))
+
+import pytest
+
+from app.schemas.plant import GeminiResponse, PlantInputData
+
+
+@pytest.fixture
+def plant_data() -> PlantInputData:
+    """Valid plant inputs."""
+    return PlantInputData(
+        plant_name="Tomato",
+        plant_type="Vegetable",
+        climate="Temperate",
+        sunlight_hours=6,
+        soil_type="Loamy",
+        watering_frequency="Daily",
+        experience_level="Beginner"
+    )
+
+
+@pytest.fixture
+def guide(plant_data) -> GeminiResponse:
+    """The mock Gemini guide for `plant_data`."""
+    from app.routes.gemini import gemini_service
+
+    return gemini_service._generate_mock_response(plant_data)
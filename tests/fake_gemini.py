@@ -0,0 +1,63 @@
+"""In-process stand-in for the Gemini generateContent and cachedContents APIs."""
+
+import json
+from typing import Callable, List, Optional, Union
+
+import httpx
+
+from app.routes.gemini import GeminiService
+from app.utils.model_router import ModelRouter
+
+
+class FakeGemini:
+    """
+    Answers generateContent with `reply` (a string, or a callable taking
+    the model and request payload and returning text or a
+    (text, finishReason) pair) and registers cachedContents until they
+    are expired with `expire`.
+    """
+
+    def __init__(self, reply: Union[str, Callable] = '{"ok": true}'):
+        self.reply = reply
+        self.failing_models = set()
+        self.generate_calls: List[dict] = []
+        self.cache_registrations: List[dict] = []
+        self.live_caches = set()
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        payload = json.loads(request.content) if request.content else {}
+        if path.endswith("/cachedContents"):
+            self.cache_registrations.append(payload)
+            name = f"cachedContents/c{len(self.cache_registrations)}"
+            self.live_caches.add(name)
+            return httpx.Response(200, json={"name": name})
+        if path.endswith(":generateContent"):
+            model = path.rsplit("/", 1)[1].split(":")[0]
+            self.generate_calls.append(dict(payload, model=model))
+            if model in self.failing_models:
+                return httpx.Response(503, json={"error": {"message": "overloaded"}})
+            cached = payload.get("cachedContent")
+            if cached is not None and cached not in self.live_caches:
+                return httpx.Response(404, json={"error": {"message": "cached content not found"}})
+            reply = self.reply(model, payload) if callable(self.reply) else self.reply
+            text, finish_reason = reply if isinstance(reply, tuple) else (reply, "STOP")
+            return httpx.Response(200, json={
+                "candidates": [{"content": {"parts": [{"text": text}]}, "finishReason": finish_reason}],
+                "usageMetadata": {"promptTokenCount": 100, "candidatesTokenCount": 50, "totalTokenCount": 150}
+            })
+        return httpx.Response(404)
+
+    def expire(self, name: str) -> None:
+        self.live_caches.discard(name)
+
+
+def gemini_service(fake: FakeGemini, models: Optional[List[str]] = None) -> GeminiService:
+    """A GeminiService that talks to `fake` instead of the real API."""
+    service = GeminiService()
+    service.api_key = "test-key"
+    if models is not None:
+        service.model = models[0]
+        service.router = ModelRouter(models)
+    service._client = httpx.AsyncClient(transport=httpx.MockTransport(fake.handler))
+    return service
@@ -0,0 +1,130 @@
+"""Tests for the plant guide endpoints."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.guide_pipeline import guide_pipeline
+
+REQUEST = {
+    "plant_name": "Api Basil",
+    "plant_type": "Herb",
+    "climate": "Temperate",
+    "sunlight_hours": 6,
+    "soil_type": "Loamy",
+    "watering_frequency": "Daily",
+    "experience_level": "Beginner",
+}
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+@pytest.fixture
+def pipeline_calls(monkeypatch):
+    calls = []
+    real_run = guide_pipeline.run
+
+    async def recording_run(plant_data, **kwargs):
+        calls.append(kwargs)
+        return await real_run(plant_data, **kwargs)
+
+    monkeypatch.setattr(guide_pipeline, "run", recording_run)
+    return calls
+
+
+def test_generate_then_fetch(client):
+    response = client.post("/generate-plant-guide", json=REQUEST)
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["success"] is True
+    assert body["metadata"]["plant_name"] == "Api basil"
+
+    fetched = client.get(response.headers["Location"])
+    assert fetched.status_code == 200
+    assert fetched.headers["ETag"] == response.headers["ETag"]
+
+
+def test_batch_priority_header(client, pipeline_calls):
+    response = client.post(
+        "/generate-plant-guide",
+        json=dict(REQUEST, plant_name="Batch Sage"),
+        headers={"X-Priority": "Batch"}
+    )
+    assert response.status_code == 200, response.text
+    assert pipeline_calls[0]["priority"] == "batch"
+
+
+def test_unknown_priority_is_rejected(client, pipeline_calls):
+    for priority in ("urgent", "prewarm"):
+        response = client.post("/generate-plant-guide", json=REQUEST, headers={"X-Priority": priority})
+        assert response.status_code == 400
+    assert pipeline_calls == []
+
+
+def test_guide_degraded_for_a_deadline_is_not_served_without_one(client):
+    request = dict(REQUEST, plant_name="Deadline Mint")
+    rushed = client.post("/generate-plant-guide", json=request, headers={"X-Request-Timeout": "0.5"})
+    assert rushed.status_code == 200, rushed.text
+    assert rushed.json()["visual_guide"]["status"] == "skipped"
+    assert "Location" not in rushed.headers
+
+    full = client.post("/generate-plant-guide", json=request)
+    assert full.status_code == 200, full.text
+    assert full.json()["visual_guide"]["status"] == "success"
+
+
+def test_cache_only_guide_is_not_served_to_clients_within_budget(client, monkeypatch):
+    from app.services.usage_ledger import usage_ledger
+
+    request = dict(REQUEST, plant_name="Budget Thyme")
+    monkeypatch.setattr(usage_ledger, "over_budget", lambda client_id, plant: "client")
+    capped = client.post("/generate-plant-guide", json=request)
+    assert capped.status_code == 200, capped.text
+    assert capped.json()["metadata"]["cache_only"] == "client budget exceeded"
+    assert "Location" not in capped.headers
+
+    monkeypatch.setattr(usage_ledger, "over_budget", lambda client_id, plant: None)
+    full = client.post("/generate-plant-guide", json=request)
+    assert full.status_code == 200, full.text
+    assert "cache_only" not in full.json()["metadata"]
+
+
+def test_conditional_get(client):
+    created = client.post("/generate-plant-guide", json=dict(REQUEST, plant_name="Etag Dill"))
+    location = created.headers["Location"]
+
+    by_etag = client.get(location, headers={"If-None-Match": created.headers["ETag"]})
+    assert by_etag.status_code == 304
+    assert by_etag.headers["ETag"] == created.headers["ETag"]
+
+    by_date = client.get(location, headers={"If-Modified-Since": created.headers["Last-Modified"]})
+    assert by_date.status_code == 304
+
+    stale = client.get(location, headers={"If-None-Match": '"other"'})
+    assert stale.status_code == 200
+
+
+def test_fieldsets_have_their_own_etags(client):
+    created = client.post("/generate-plant-guide", json=dict(REQUEST, plant_name="Etag Chive"))
+    location = created.headers["Location"]
+
+    overview = client.get(location, params={"fields": "plant_overview"})
+    tips = client.get(location, params={"fields": "additional_tips"})
+    assert len({created.headers["ETag"], overview.headers["ETag"], tips.headers["ETag"]}) == 3
+    assert list(overview.json()["plant_care_guidance"]) == ["plant_overview"]
+
+
+def test_unknown_guide_is_not_found(client):
+    assert client.get("/plant-guides/000000000000000000000000").status_code == 404
+
+
+def test_max_age_does_not_outlive_the_stored_guide(client):
+    from app.services.guide_store import CACHE_MAX_AGE, guide_store
+
+    guide_store.put("short-lived", b"{}", ttl=300)
+    response = client.get("/plant-guides/short-lived")
+    max_age = int(response.headers["Cache-Control"].rsplit("=", 1)[1])
+    assert 0 < max_age <= 300 < CACHE_MAX_AGE
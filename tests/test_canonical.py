@@ -0,0 +1,124 @@
+"""Tests for app.utils.canonical."""
+
+import pytest
+
+from app.schemas.plant import PlantInputData
+from app.utils.canonical import Canonicalizer, canonicalizer, singularize
+
+
+def plant(name: str, **overrides) -> PlantInputData:
+    """Build valid plant inputs with the given name."""
+    fields = {
+        "plant_name": name,
+        "plant_type": "Vegetable",
+        "climate": "Temperate",
+        "sunlight_hours": 6,
+        "soil_type": "Loamy",
+        "watering_frequency": "Daily",
+        "experience_level": "Beginner",
+    }
+    fields.update(overrides)
+    return PlantInputData(**fields)
+
+
+@pytest.mark.parametrize("word, singular", [
+    ("tomatoes", "tomato"),
+    ("lilies", "lily"),
+    ("peaches", "peach"),
+    ("grasses", "grass"),
+    ("roses", "rose"),
+    ("beans", "bean"),
+    ("aloes", "aloe"),
+    ("pothos", "pothos"),
+    ("cosmos", "cosmos"),
+    ("hibiscus", "hibiscus"),
+    ("cactus", "cactus"),
+    ("asparagus", "asparagus"),
+    ("iris", "iris"),
+    ("moss", "moss"),
+    ("basil", "basil"),
+])
+def test_singularize(word, singular):
+    assert singularize(word) == singular
+
+
+@pytest.mark.parametrize("name, canonical", [
+    ("Tomato", "Tomato"),
+    ("tomatoes", "Tomato"),
+    ("TOMATO ", "Tomato"),
+    ("Tomato plant", "Tomato"),
+    ("Tomato  seedlings", "Tomato"),
+    ("Pothos", "Pothos"),
+    ("Cosmos", "Cosmos"),
+    ("Spider plant", "Spider plant"),
+    ("Spider plants", "Spider plant"),
+    ("Jade plant", "Jade plant"),
+    ("Snake plant", "Sansevieria"),
+    ("snake plants", "Sansevieria"),
+    ("Money plant", "Pothos"),
+    ("Aubergines", "Eggplant"),
+])
+def test_plant_names(name, canonical):
+    assert canonicalizer.canonicalize(plant(name)).plant_name == canonical
+
+
+def test_display_name_is_what_the_user_typed():
+    canonical = canonicalizer.canonicalize(plant("  Snake   plant "))
+    assert canonical.plant_name == "Sansevieria"
+    assert canonical._display_name == "Snake plant"
+
+
+def test_idempotent():
+    once = canonicalizer.canonicalize(plant("Money plants", climate="humid", soil_type="loam"))
+    twice = canonicalizer.canonicalize(once)
+    assert twice == once
+    assert twice._display_name == "Money plants"
+
+
+def test_display_name_does_not_change_the_key():
+    a = canonicalizer.canonicalize(plant("Tomatoes"))
+    b = canonicalizer.canonicalize(plant("tomato plant"))
+    assert a.model_dump_json() == b.model_dump_json()
+
+
+def test_text_fields_and_enums():
+    canonical = canonicalizer.canonicalize(plant(
+        "Basil",
+        plant_type="veggie",
+        climate="Humid",
+        soil_type="Potting mix",
+        watering_frequency="every other day",
+        experience_level="novice",
+    ))
+    assert canonical.plant_type == "Vegetable"
+    assert canonical.climate == "Tropical"
+    assert canonical.soil_type == "Potting soil"
+    assert canonical.watering_frequency == "Every few days"
+    assert canonical.experience_level == "Beginner"
+
+
+@pytest.mark.parametrize("hours, bucketed", [(0, 1), (2, 1), (3, 4), (7, 7), (12, 13), (20, 20), (24, 20)])
+def test_sunlight_buckets(hours, bucketed):
+    assert canonicalizer.canonicalize(plant("Basil", sunlight_hours=hours)).sunlight_hours == bucketed
+
+
+def test_steps_can_be_disabled():
+    passthrough = Canonicalizer(
+        singularize_names=False,
+        use_synonyms=False,
+        sunlight_buckets=[],
+        normalize_enums=False,
+        synonyms_path=""
+    )
+    data = plant("Tomatoes", watering_frequency="every day", sunlight_hours=7)
+    canonical = passthrough.canonicalize(data)
+    assert canonical.plant_name == "Tomatoes"
+    assert canonical.watering_frequency == "every day"
+    assert canonical.sunlight_hours == 7
+
+
+def test_synonyms_file(tmp_path):
+    path = tmp_path / "synonyms.json"
+    path.write_text('{"plant_name": {"Love apple": "Tomato"}}', encoding="utf-8")
+    custom = Canonicalizer(synonyms_path=str(path))
+    assert custom.canonicalize(plant("love apple")).plant_name == "Tomato"
@@ -0,0 +1,94 @@
+"""Tests for recording and replaying Gemini cassettes."""
+
+import asyncio
+
+import httpx
+import pytest
+
+import app.routes.gemini as gemini
+from app.routes.gemini import gemini_service as mock_gemini
+from app.services.guide_store import GuideStore
+from app.utils.cassettes import CassetteStore
+from tests.fake_gemini import FakeGemini, gemini_service
+
+
+def offline(request: httpx.Request) -> httpx.Response:
+    raise AssertionError(f"Replay reached the network: {request.url}")
+
+
+@pytest.fixture
+def cassette_dir(tmp_path):
+    return str(tmp_path / "cassettes")
+
+
+@pytest.fixture(autouse=True)
+def single_call_mode(monkeypatch):
+    monkeypatch.setattr(gemini, "GENERATION_MODE", "single")
+
+
+def recorder(cassette_dir, plant_data):
+    fake = FakeGemini(reply=mock_gemini._generate_mock_response(plant_data).model_dump_json())
+    service = gemini_service(fake, models=["model-a", "model-b"])
+    service.cassette_mode = "record"
+    service.cassettes = CassetteStore(cassette_dir)
+    return fake, service
+
+
+def replayer(cassette_dir, models):
+    service = gemini_service(FakeGemini(), models=models)
+    service.api_key = ""
+    service.cassette_mode = "replay"
+    service.cassettes = CassetteStore(cassette_dir)
+    service._client = httpx.AsyncClient(transport=httpx.MockTransport(offline))
+    return service
+
+
+def test_key_ignores_the_model(cassette_dir):
+    store = CassetteStore(cassette_dir)
+    payload = {"contents": [{"role": "user", "parts": [{"text": "hi"}]}]}
+    store.save(store.key(payload), "model-a", payload, {"candidates": []}, 0.5)
+
+    cassette = store.load(store.key({"contents": [{"parts": [{"text": "hi"}], "role": "user"}]}))
+    assert cassette["model"] == "model-a"
+    assert cassette["elapsed_seconds"] == 0.5
+    assert store.load(store.key({"contents": []})) is None
+
+
+def test_every_replay_run_reads_the_cassettes(cassette_dir, plant_data, monkeypatch):
+    fake, service = recorder(cassette_dir, plant_data)
+    recorded = asyncio.run(service.generate_plant_guide(plant_data))
+    assert len(fake.generate_calls) == 1
+
+    loads = []
+    real_load = CassetteStore.load
+    monkeypatch.setattr(CassetteStore, "load", lambda self, key: loads.append(key) or real_load(self, key))
+
+    # A different routing order still finds the recording
+    for models in (["model-a", "model-b"], ["model-b", "model-a"]):
+        replayed = asyncio.run(replayer(cassette_dir, models).generate_plant_guide(plant_data))
+        assert replayed.model_dump() == recorded.model_dump()
+    assert len(loads) == 2
+
+
+def test_recording_bypasses_the_response_cache(cassette_dir, plant_data):
+    fake, service = recorder(cassette_dir, plant_data)
+    asyncio.run(service.generate_plant_guide(plant_data))
+    asyncio.run(service.generate_plant_guide(plant_data))
+
+    assert len(fake.generate_calls) == 2
+
+
+def test_missing_cassette_fails_without_network(cassette_dir, plant_data):
+    with pytest.raises(Exception, match="No Gemini cassette recorded"):
+        asyncio.run(replayer(cassette_dir, ["model-a"]).generate_plant_guide(plant_data))
+
+
+def test_guide_store_is_process_local_in_cassette_mode():
+    shared = GuideStore(shared=True)
+    shared.put("cassette-guide", b"{}")
+
+    local = GuideStore(shared=False)
+    assert local.get("cassette-guide") is None
+    local.put("local-guide", b"{}")
+    assert local.get("local-guide").body == b"{}"
+    assert GuideStore(shared=True).get("local-guide") is None
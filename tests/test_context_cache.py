@@ -0,0 +1,84 @@
+"""Tests for Gemini context caching against the stand-in API."""
+
+import asyncio
+import time
+
+from app.utils.context_cache import ContextCache
+from tests.fake_gemini import FakeGemini, gemini_service
+
+PREAMBLE = "Static instructions. " * 50
+
+
+def cached_service(fake, ttl=60, refresh=5, min_tokens=0):
+    service = gemini_service(fake)
+    service.use_context_cache = True
+    service.context_cache = ContextCache(ttl, refresh, retry_after=60, min_tokens=min_tokens)
+    return service
+
+
+def generate(service, suffix="Plant: Tomato"):
+    return asyncio.run(service._generate(service.model, PREAMBLE + suffix, PREAMBLE, [], 256))
+
+
+def test_preamble_is_registered_once_and_reused():
+    fake = FakeGemini()
+    service = cached_service(fake)
+
+    generate(service, "Plant: Tomato")
+    generate(service, "Plant: Basil")
+
+    assert len(fake.cache_registrations) == 1
+    assert fake.cache_registrations[0]["systemInstruction"]["parts"][0]["text"] == PREAMBLE
+    assert [call["cachedContent"] for call in fake.generate_calls] == ["cachedContents/c1"] * 2
+    # Only the part after the preamble is sent
+    assert fake.generate_calls[1]["contents"][0]["parts"][0]["text"] == "Plant: Basil"
+
+
+def test_handle_is_renewed_before_it_expires():
+    fake = FakeGemini()
+    service = cached_service(fake, ttl=1, refresh=0.4)
+
+    generate(service)
+    time.sleep(0.7)
+    generate(service)
+
+    assert len(fake.cache_registrations) == 2
+    assert fake.generate_calls[1]["cachedContent"] == "cachedContents/c2"
+
+
+def test_expired_upstream_content_falls_back_and_re_registers():
+    fake = FakeGemini()
+    service = cached_service(fake)
+
+    generate(service)
+    fake.expire("cachedContents/c1")
+    assert generate(service) == ('{"ok": true}', "STOP")
+    generate(service)
+
+    # Rejected call, full-prompt retry, then a fresh registration
+    assert [call.get("cachedContent") for call in fake.generate_calls] == [
+        "cachedContents/c1", "cachedContents/c1", None, "cachedContents/c2"
+    ]
+    assert fake.generate_calls[2]["contents"][0]["parts"][0]["text"] == PREAMBLE + "Plant: Tomato"
+
+
+def test_preamble_below_minimum_is_never_registered():
+    fake = FakeGemini()
+    service = cached_service(fake, min_tokens=len(PREAMBLE))
+
+    generate(service)
+    generate(service)
+
+    assert fake.cache_registrations == []
+    assert all("cachedContent" not in call for call in fake.generate_calls)
+
+
+def test_default_minimum_skips_this_repos_preambles():
+    fake = FakeGemini()
+    service = gemini_service(fake)
+    service.use_context_cache = True
+    preamble = service._guide_preamble()
+
+    asyncio.run(service._generate(service.model, preamble + "Plant: Tomato", preamble, [], 256))
+
+    assert fake.cache_registrations == []
@@ -0,0 +1,86 @@
+"""End-to-end tests for cancelling generations when clients disconnect."""
+
+import asyncio
+
+from starlette.requests import Request
+
+from app.schemas.plant import PlantInputData
+from app.services.guide_pipeline import guide_pipeline
+from app.services.inflight import inflight_registry
+from app.services.plant import generate_plant_guide
+from app.utils import disconnect
+from app.utils.metrics import metrics
+
+
+class Client:
+    """A connection whose `receive` reports http.disconnect once closed."""
+
+    def __init__(self):
+        self.gone = False
+
+    async def receive(self):
+        if self.gone:
+            return {"type": "http.disconnect"}
+        await asyncio.sleep(3600)
+
+    def request(self) -> Request:
+        scope = {
+            "type": "http",
+            "method": "POST",
+            "path": "/generate-plant-guide",
+            "headers": [],
+            "query_string": b"",
+            "client": ("127.0.0.1", 1234),
+        }
+        return Request(scope, self.receive)
+
+
+def test_shared_generation_is_cancelled_when_the_last_client_leaves(monkeypatch):
+    monkeypatch.setattr(disconnect, "POLL_INTERVAL", 0.01)
+    state = {"runs": 0, "cancelled": False}
+
+    async def slow_run(plant_data, **kwargs):
+        state["runs"] += 1
+        try:
+            await asyncio.sleep(3600)
+        except asyncio.CancelledError:
+            state["cancelled"] = True
+            raise
+
+    monkeypatch.setattr(guide_pipeline, "run", slow_run)
+    plant_data = PlantInputData(
+        plant_name="Disconnect Fennel",
+        plant_type="Herb",
+        climate="Temperate",
+        sunlight_hours=6,
+        soil_type="Loamy",
+        watering_frequency="Daily",
+        experience_level="Beginner"
+    )
+    cancelled_before = metrics.counters["requests_cancelled"]
+
+    async def scenario():
+        first, second = Client(), Client()
+        first_response = asyncio.ensure_future(
+            generate_plant_guide(plant_data, first.request(), fields=None, compact=False)
+        )
+        second_response = asyncio.ensure_future(
+            generate_plant_guide(plant_data, second.request(), fields=None, compact=False)
+        )
+        await asyncio.sleep(0.05)
+        assert state["runs"] == 1
+
+        first.gone = True
+        assert (await first_response).status_code == 499
+        await asyncio.sleep(0.05)
+        assert not state["cancelled"]
+        assert len(inflight_registry) == 1
+
+        second.gone = True
+        assert (await second_response).status_code == 499
+        await asyncio.sleep(0)
+        assert state["cancelled"]
+        assert len(inflight_registry) == 0
+
+    asyncio.run(scenario())
+    assert metrics.counters["requests_cancelled"] == cancelled_before + 2
@@ -0,0 +1,54 @@
+"""Tests for app.utils.fieldsets."""
+
+import json
+
+import pytest
+
+from app.utils.fieldsets import Fieldset
+
+
+BODY = json.dumps({
+    "plant_care_guidance": {"plant_overview": "fern", "daily_care": "mist", "additional_tips": "repot"},
+    "visual_guide": {"slides": []},
+    "visual_guides": [],
+    "metadata": {"model": "x"},
+}).encode("utf-8")
+
+
+def test_full_fieldset_returns_body_untouched():
+    fieldset = Fieldset.parse(None)
+    assert fieldset.is_full
+    assert fieldset.apply(BODY) is BODY
+
+
+def test_fields_prune_sections_and_visual_guide():
+    data = json.loads(Fieldset.parse("plant_overview, additional_tips").apply(BODY))
+    assert data["plant_care_guidance"] == {"plant_overview": "fern", "additional_tips": "repot"}
+    assert "visual_guide" not in data
+    assert "visual_guides" not in data
+    assert data["metadata"] == {"model": "x"}
+
+
+def test_visual_guide_kept_when_requested():
+    fieldset = Fieldset.parse("visual_guide")
+    assert fieldset.wants_visual
+    data = json.loads(fieldset.apply(BODY))
+    assert data["plant_care_guidance"] == {}
+    assert "visual_guide" in data and "visual_guides" in data
+
+
+def test_compact_drops_metadata_only():
+    data = json.loads(Fieldset.parse(None, compact=True).apply(BODY))
+    assert "metadata" not in data
+    assert data["plant_care_guidance"]["daily_care"] == "mist"
+
+
+def test_unknown_field_is_rejected():
+    with pytest.raises(ValueError, match="Unknown fields: bogus"):
+        Fieldset.parse("daily_care,bogus")
+
+
+def test_tag_ignores_field_order_but_not_compact():
+    assert Fieldset.parse("daily_care,plant_overview").tag() == Fieldset.parse("plant_overview,daily_care").tag()
+    assert Fieldset.parse("daily_care").tag() != Fieldset.parse("daily_care", compact=True).tag()
+    assert Fieldset.parse(None).tag() != Fieldset.parse("daily_care").tag()
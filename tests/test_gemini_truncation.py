@@ -0,0 +1,42 @@
+"""Tests for handling Gemini output cut off at maxOutputTokens."""
+
+import asyncio
+import time
+
+import app.routes.gemini as gemini
+from app.routes.gemini import gemini_service as mock_gemini
+from app.utils.shared_cache import shared_cache
+from tests.fake_gemini import FakeGemini, gemini_service
+
+
+def test_truncated_output_is_flagged_and_cached_briefly(plant_data, monkeypatch):
+    monkeypatch.setattr(gemini, "GENERATION_MODE", "single")
+    monkeypatch.setattr(gemini, "MAX_CONTINUATIONS", 1)
+    full = mock_gemini._generate_mock_response(plant_data).model_dump_json()
+    # Cut inside the last list, after the first tip
+    tips = full.index('"additional_tips":[') + len('"additional_tips":[')
+    cut = full[:full.index('"', tips + 1) + 1]
+    fake = FakeGemini(reply=lambda model, payload: (cut if len(payload["contents"]) == 1 else "", "MAX_TOKENS"))
+    service = gemini_service(fake)
+
+    guide = asyncio.run(service.generate_plant_guide(plant_data.model_copy(update={"plant_name": "Truncated"})))
+
+    # One continuation was requested before giving up
+    assert len(fake.generate_calls) == 2
+    assert len(guide.additional_tips) == 1
+    assert guide._truncated_sections == sorted(gemini.SECTIONS)
+    cached = [row for row in shared_cache._connection().execute(
+        "SELECT expires_at FROM cache WHERE namespace = 'gemini'"
+    )]
+    assert len(cached) == 1
+    assert cached[0][0] - time.time() <= gemini.TRUNCATED_TTL + 1
+
+
+def test_complete_output_is_not_flagged(plant_data, monkeypatch):
+    monkeypatch.setattr(gemini, "GENERATION_MODE", "single")
+    fake = FakeGemini(reply=mock_gemini._generate_mock_response(plant_data).model_dump_json())
+    service = gemini_service(fake)
+
+    guide = asyncio.run(service.generate_plant_guide(plant_data.model_copy(update={"plant_name": "Complete"})))
+
+    assert guide._truncated_sections == []
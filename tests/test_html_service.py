@@ -0,0 +1,39 @@
+"""Tests for app.services.html_service."""
+
+import asyncio
+
+import pytest
+
+from app.services import guide_pipeline as pipeline_module
+from app.services.guide_pipeline import guide_pipeline
+from app.services.html_service import html_service
+from app.utils.deadline import Deadline
+
+
+@pytest.fixture
+def output_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(html_service, "output_dir", str(tmp_path))
+    return tmp_path
+
+
+def test_generate_renders_a_page(guide, output_dir):
+    response = asyncio.run(html_service.generate(guide, "Tomato"))
+
+    assert response.status == "success"
+    filename = response.file_url.rsplit("/", 1)[1]
+    assert (output_dir / filename).read_text(encoding="utf-8").startswith("<!DOCTYPE html>")
+
+
+def test_deadline_skips_the_page(guide, output_dir):
+    response = asyncio.run(html_service.generate(guide, "Tomato", Deadline(0.1)))
+
+    assert response.status == "skipped"
+    assert list(output_dir.iterdir()) == []
+
+
+def test_pipeline_produces_the_html_artifact(plant_data, output_dir, monkeypatch):
+    monkeypatch.setattr(pipeline_module, "VISUAL_ARTIFACTS", ["html"])
+    stored = asyncio.run(guide_pipeline.run(plant_data, store=False))
+
+    assert b'"artifact":"html"' in stored.body
+    assert b'"file_type":"html"' in stored.body
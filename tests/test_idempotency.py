@@ -0,0 +1,100 @@
+"""Tests for app.services.idempotency."""
+
+import asyncio
+
+import pytest
+
+from app.services.guide_store import StoredGuide
+from app.services.idempotency import IdempotencyConflict, IdempotencyStore
+
+
+def _guide(guide_id="g1"):
+    return StoredGuide(guide_id=guide_id, body=b"{}", etag='"e"', created_at=0.0, expires_at=0.0)
+
+
+def test_retry_replays_the_first_result():
+    store = IdempotencyStore()
+    runs = []
+
+    async def generate():
+        runs.append(1)
+        return _guide()
+
+    async def scenario():
+        first = await store.run("key", "g1", generate)
+        second = await store.run("key", "g1", generate)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first == second
+    assert len(runs) == 1
+
+
+def test_key_reused_for_another_guide_conflicts():
+    store = IdempotencyStore()
+
+    async def generate():
+        return _guide()
+
+    async def scenario():
+        await store.run("key", "g1", generate)
+        await store.run("key", "g2", generate)
+
+    with pytest.raises(IdempotencyConflict):
+        asyncio.run(scenario())
+
+
+def test_generation_survives_a_cancelled_caller():
+    store = IdempotencyStore()
+    runs = []
+
+    async def generate():
+        runs.append(1)
+        await asyncio.sleep(0.02)
+        return _guide()
+
+    async def scenario():
+        caller = asyncio.ensure_future(store.run("key", "g1", generate))
+        await asyncio.sleep(0)
+        caller.cancel()
+        return await store.run("key", "g1", generate)
+
+    assert asyncio.run(scenario()).guide_id == "g1"
+    assert len(runs) == 1
+
+
+def test_failed_generation_is_forgotten():
+    store = IdempotencyStore()
+    attempts = []
+
+    async def generate():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("boom")
+        return _guide()
+
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            await store.run("key", "g1", generate)
+        return await store.run("key", "g1", generate)
+
+    assert asyncio.run(scenario()).guide_id == "g1"
+    assert len(attempts) == 2
+
+
+def test_expired_and_evicted_keys_run_again():
+    store = IdempotencyStore(max_keys=1, ttl=0)
+    runs = []
+
+    async def generate():
+        runs.append(1)
+        return _guide()
+
+    async def scenario():
+        await store.run("a", "g1", generate)
+        await store.run("a", "g1", generate)  # ttl=0: already expired
+        await store.run("b", "g1", generate)  # evicts "a"
+
+    asyncio.run(scenario())
+    assert len(runs) == 3
+    assert len(store) == 1
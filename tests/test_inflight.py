@@ -0,0 +1,50 @@
+"""Tests for app.services.inflight."""
+
+import asyncio
+
+from app.services.inflight import InflightRegistry
+
+
+def test_concurrent_callers_share_one_run():
+    registry = InflightRegistry()
+    runs = []
+
+    async def work():
+        runs.append(1)
+        await asyncio.sleep(0.01)
+        return "guide"
+
+    async def scenario():
+        return await asyncio.gather(*(registry.join("id", work) for _ in range(5)))
+
+    assert asyncio.run(scenario()) == ["guide"] * 5
+    assert len(runs) == 1
+    assert len(registry) == 0
+
+
+def test_work_is_cancelled_only_when_the_last_waiter_leaves():
+    registry = InflightRegistry()
+
+    async def scenario():
+        state = {"cancelled": False}
+
+        async def work():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                state["cancelled"] = True
+                raise
+
+        first = asyncio.ensure_future(registry.join("id", work))
+        second = asyncio.ensure_future(registry.join("id", work))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        await asyncio.sleep(0.01)
+        assert not state["cancelled"]
+
+        second.cancel()
+        await asyncio.sleep(0.01)
+        return state["cancelled"]
+
+    assert asyncio.run(scenario())
@@ -0,0 +1,49 @@
+"""Tests for app.utils.json_repair."""
+
+import json
+
+import pytest
+
+from app.utils.json_repair import loads_lenient, repair_json, strip_fences
+
+
+@pytest.mark.parametrize("text, value", [
+    ('{"a": 1}', {"a": 1}),
+    ('```json\n{"a": 1}\n```', {"a": 1}),
+    ('Here is the guide:\n{"a": 1}\nHope it helps!', {"a": 1}),
+    ('{"a": [1, 2,], "b": {"c": 3,},}', {"a": [1, 2], "b": {"c": 3}}),
+    ('{"a": "it\'s, [not] {a} bracket",}', {"a": "it's, [not] {a} bracket"}),
+])
+def test_malformed_but_complete(text, value):
+    assert loads_lenient(text) == value
+
+
+@pytest.mark.parametrize("text, value", [
+    ('{"a": "unfinished', {"a": "unfinished"}),
+    ('{"a": [1, 2, 3', {"a": [1, 2, 3]}),
+    ('{"a": tru', {"a": True}),
+    ('{"a": 1, "b": fal', {"a": 1, "b": False}),
+    ('{"a": [n', {"a": [None]}),
+    ('{"a": 1.', {"a": 1}),
+    ('{"a": 1, "b": -', {"a": 1}),
+    ('{"a": 1, "b":', {"a": 1}),
+    ('{"a": 1, "b"', {"a": 1}),
+    ('{"a": ', {}),
+    ('{"a": [{"b": 1}, {"c": ', {"a": [{"b": 1}, {}]}),
+    ('{"a": "escaped \\"quote', {"a": 'escaped "quote'}),
+])
+def test_truncated(text, value):
+    assert loads_lenient(text) == value
+
+
+def test_repair_result_is_valid_json():
+    assert json.loads(repair_json('{"tips": ["Water", "Prune'))["tips"] == ["Water", "Prune"]
+
+
+def test_unrepairable_raises():
+    with pytest.raises(json.JSONDecodeError):
+        loads_lenient("no json here")
+
+
+def test_strip_fences():
+    assert strip_fences("```JSON\n[1]\n```") == "[1]"
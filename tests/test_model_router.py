@@ -0,0 +1,87 @@
+"""Tests for app.utils.model_router."""
+
+import time
+
+import pytest
+
+from app.utils.model_router import ModelRouter
+
+
+def trip(router, target, failures=5):
+    for _ in range(failures):
+        router.record(target, 0.1, ok=False)
+
+
+def test_needs_a_target():
+    with pytest.raises(ValueError):
+        ModelRouter([])
+
+
+def test_untried_targets_keep_configured_order():
+    assert ModelRouter(["a", "b", "c"]).candidates() == ["a", "b", "c"]
+
+
+def test_fastest_healthy_target_first():
+    router = ModelRouter(["a", "b"])
+    router.record("a", 2.0, ok=True)
+    router.record("b", 0.5, ok=True)
+    assert router.candidates() == ["b", "a"]
+
+
+def test_targets_too_slow_for_the_budget_go_last():
+    router = ModelRouter(["fast-but-spiky", "steady"])
+    for seconds in [0.1, 0.1, 0.1, 0.1, 9.0]:
+        router.record("fast-but-spiky", seconds, ok=True)
+    for _ in range(5):
+        router.record("steady", 1.0, ok=True)
+    assert router.candidates() == ["fast-but-spiky", "steady"]
+    assert router.candidates(budget=5.0) == ["steady", "fast-but-spiky"]
+
+
+def test_failing_target_is_taken_out():
+    router = ModelRouter(["a", "b"], cooldown=30)
+    trip(router, "a", failures=4)
+    assert router.candidates() == ["a", "b"]
+    router.record("a", 0.1, ok=False)
+    assert router.candidates() == ["b", "a"]
+    assert router.snapshot()["a"]["state"] == "open"
+
+
+def test_half_open_target_gets_exactly_one_trial():
+    router = ModelRouter(["a", "b"], cooldown=0.05)
+    router.record("b", 0.1, ok=True)
+    trip(router, "a")
+    time.sleep(0.06)
+
+    # The first request after the cooldown carries the trial...
+    assert router.candidates() == ["a", "b"]
+    assert router.snapshot()["a"]["state"] == "probing"
+    # ...concurrent ones treat the target as still out of rotation
+    assert router.candidates() == ["b", "a"]
+    assert router.candidates() == ["b", "a"]
+
+    router.record("a", 0.05, ok=True)
+    assert router.snapshot()["a"]["state"] == "closed"
+    assert router.candidates() == ["a", "b"]
+
+
+def test_failed_trial_reopens_the_target():
+    router = ModelRouter(["a", "b"], cooldown=0.05)
+    trip(router, "a")
+    time.sleep(0.06)
+    assert router.candidates()[0] == "a"
+
+    router.record("a", 0.1, ok=False)
+    assert router.snapshot()["a"]["state"] == "open"
+    assert router.candidates() == ["b", "a"]
+
+
+def test_unanswered_trial_lapses():
+    router = ModelRouter(["a", "b"], cooldown=0.05)
+    trip(router, "a")
+    time.sleep(0.06)
+    assert router.candidates()[0] == "a"
+    assert router.candidates()[0] == "b"
+
+    time.sleep(0.06)
+    assert router.candidates()[0] == "a"
@@ -0,0 +1,152 @@
+"""Tests for the NotebookLM client against an in-process stand-in API."""
+
+import asyncio
+import json
+import os
+
+import httpx
+import pytest
+
+import app.routes.notebooklm as notebooklm
+from app.routes.notebooklm import NotebookLMService
+from app.utils.deadline import Deadline
+
+ARTIFACT = b"PK\x03\x04 fake pptx bytes"
+
+
+class FakeNotebookLM:
+    """
+    Stand-in for the NotebookLM API: operations finish after `polls_needed`
+    polls and their artifact is served from a download URL.
+    """
+
+    def __init__(self, polls_needed: int = 2, file_type: str = "pptx", error: str = None):
+        self.polls_needed = polls_needed
+        self.file_type = file_type
+        self.error = error
+        self.requests = []
+        self.polls = 0
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        path = request.url.path
+        if request.method == "POST" and path.endswith("/generate-presentation"):
+            return httpx.Response(200, json={"name": "operations/op-1", "done": False})
+        if request.method == "POST" and path.endswith("/operations/op-1:cancel"):
+            return httpx.Response(200, json={})
+        if request.method == "GET" and path.endswith("/operations/op-1"):
+            self.polls += 1
+            if self.polls < self.polls_needed:
+                return httpx.Response(200, json={"name": "operations/op-1", "done": False})
+            if self.error:
+                return httpx.Response(200, json={"name": "operations/op-1", "done": True, "error": {"message": self.error}})
+            return httpx.Response(200, json={
+                "name": "operations/op-1",
+                "done": True,
+                "response": {"file_url": "https://downloads.example/op-1", "file_type": self.file_type}
+            })
+        if request.method == "GET" and request.url.host == "downloads.example":
+            return httpx.Response(200, content=ARTIFACT)
+        return httpx.Response(404)
+
+    def paths(self):
+        return [f"{request.method} {request.url.path}" for request in self.requests]
+
+
+@pytest.fixture
+def fake():
+    return FakeNotebookLM()
+
+
+@pytest.fixture
+def service(fake, tmp_path, monkeypatch):
+    monkeypatch.setattr(notebooklm, "POLL_INITIAL", 0.01)
+    monkeypatch.setattr(notebooklm, "POLL_MAX", 0.04)
+    service = NotebookLMService()
+    service.api_key = "test-key"
+    service.base_url = "https://notebooklm.example/v1"
+    service.output_dir = str(tmp_path)
+    service._client = httpx.AsyncClient(transport=httpx.MockTransport(fake.handler))
+    return service
+
+
+def test_submit_poll_and_download(service, fake, guide, tmp_path):
+    response = asyncio.run(service.generate_visual_guide(guide, "Tomato"))
+
+    assert response.status == "success", response.message
+    assert response.file_type == "pptx"
+    assert fake.paths() == [
+        "POST /v1/generate-presentation",
+        "GET /v1/operations/op-1",
+        "GET /v1/operations/op-1",
+        "GET /op-1",
+    ]
+    submit = fake.requests[0]
+    assert submit.headers["Authorization"] == "Bearer test-key"
+    assert json.loads(submit.content)["format"] == "pptx"
+    # The download URL is signed; our credentials are not sent there
+    assert "Authorization" not in fake.requests[-1].headers
+
+    filename = response.file_url.rsplit("/", 1)[1]
+    assert os.listdir(tmp_path) == [filename]
+    assert (tmp_path / filename).read_bytes() == ARTIFACT
+
+
+def test_poll_interval_backs_off(service, fake, guide, monkeypatch):
+    fake.polls_needed = 6
+    sleeps = []
+    real_sleep = asyncio.sleep
+
+    async def recording_sleep(delay, *args, **kwargs):
+        sleeps.append(delay)
+        await real_sleep(0)
+
+    monkeypatch.setattr(asyncio, "sleep", recording_sleep)
+    response = asyncio.run(service.generate_visual_guide(guide, "Tomato"))
+
+    assert response.status == "success", response.message
+    assert sleeps == [0.01, 0.02, 0.04, 0.04, 0.04, 0.04]
+
+
+def test_operation_error(service, fake, guide, tmp_path):
+    fake.error = "quota exhausted"
+    response = asyncio.run(service.generate_visual_guide(guide, "Tomato"))
+
+    assert response.status == "error"
+    assert "quota exhausted" in response.message
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.mark.parametrize("file_type", ["../../escape", "html", "pptx/../x"])
+def test_unexpected_file_type_is_rejected(service, fake, guide, tmp_path, file_type):
+    fake.file_type = file_type
+    response = asyncio.run(service.generate_visual_guide(guide, "Tomato"))
+
+    assert response.status == "error"
+    assert "unexpected file type" in response.message
+    assert os.listdir(tmp_path) == []
+
+
+def test_abandoned_operation_is_cancelled(service, fake, guide):
+    fake.polls_needed = 10 ** 6
+    service.timeout = 0.2
+
+    async def scenario():
+        response = await service.generate_visual_guide(guide, "Tomato")
+        # Let the background cancel request go out
+        for _ in range(10):
+            await asyncio.sleep(0.01)
+        return response
+
+    response = asyncio.run(scenario())
+
+    assert response.status == "error"
+    assert "not ready" in response.message
+    assert "POST /v1/operations/op-1:cancel" in fake.paths()
+
+
+def test_skipped_when_deadline_is_too_short(service, fake, guide):
+    response = asyncio.run(service.generate_visual_guide(guide, "Tomato", Deadline(1)))
+
+    assert response.status == "skipped"
+    assert fake.requests == []
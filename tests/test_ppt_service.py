@@ -0,0 +1,36 @@
+"""Tests for app.services.ppt_service."""
+
+import asyncio
+
+import pytest
+
+from app.services.ppt_service import ppt_service
+from app.services.slide_service import slide_service
+from app.utils.deadline import Deadline
+
+
+@pytest.fixture
+def output_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(ppt_service, "output_dir", str(tmp_path))
+    return tmp_path
+
+
+def test_generate_renders_a_pptx(guide, output_dir):
+    response = asyncio.run(ppt_service.generate(guide, "Tomato"))
+
+    assert response.status == "success"
+    filename = response.file_url.rsplit("/", 1)[1]
+    assert (output_dir / filename).read_bytes()[:2] == b"PK"
+
+
+def test_deadline_reuses_only_a_file_of_the_same_guide(guide, output_dir):
+    asyncio.run(ppt_service.generate(guide, "Tomato"))
+    other = guide.model_copy(update={"additional_tips": ["Different advice"]})
+
+    same = asyncio.run(ppt_service.generate(guide, "Tomato", Deadline(0.1)))
+    different = asyncio.run(ppt_service.generate(other, "Tomato", Deadline(0.1)))
+
+    assert same.status == "cached"
+    assert same.file_url.rsplit("/", 1)[1] == f"{slide_service.build_deck(guide, 'Tomato').slug}_care_guide.pptx"
+    assert different.status == "skipped"
+    assert different.file_url is None
@@ -0,0 +1,89 @@
+"""Tests for the app.pregenerate CLI."""
+
+import json
+
+from app.pregenerate import main, read_catalog
+from app.schemas.plant import PlantInputData
+from app.services.guide_pipeline import guide_pipeline
+from app.services.guide_store import guide_store, guide_id_for
+from app.utils.canonical import canonicalizer
+
+RECORD = {
+    "plant_name": "Pregenerate Basil",
+    "plant_type": "Herb",
+    "climate": "Temperate",
+    "sunlight_hours": 6,
+    "soil_type": "Loamy",
+    "watering_frequency": "Daily",
+    "experience_level": "Beginner",
+}
+
+
+def write_catalog(path, lines):
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def test_malformed_lines_are_reported_and_skipped(tmp_path, capsys):
+    catalog = write_catalog(tmp_path / "catalog.jsonl", [
+        json.dumps(RECORD),
+        '{"plant_name": "Broken',
+        "[1, 2]",
+        json.dumps(dict(RECORD, sunlight_hours=99)),
+    ])
+    assert [line_no for line_no, _ in read_catalog(catalog)] == [1, 2, 3, 4]
+
+    assert main([catalog, "--rate", "0"]) == 0
+    out, err = capsys.readouterr()
+    assert "Skipping line 2: not a JSON object" in err
+    assert "Skipping line 3: not a JSON object" in err
+    assert "Skipping line 4" in err
+    assert "1 guides to generate (0 already done, 3 invalid)" in out
+
+
+def test_guides_without_decks_are_not_stored(tmp_path):
+    catalog = write_catalog(tmp_path / "catalog.jsonl", [json.dumps(RECORD)])
+    guide_id = guide_id_for(canonicalizer.canonicalize(PlantInputData(**RECORD)))
+
+    assert main([catalog, "--rate", "0"]) == 0
+    assert guide_store.get(guide_id) is None
+    # The run is still checkpointed, so it is not repeated
+    assert (tmp_path / "catalog.jsonl.done").read_text().split() == [guide_id]
+
+
+def test_guides_with_decks_are_stored(tmp_path):
+    record = dict(RECORD, plant_name="Pregenerate Thyme")
+    catalog = write_catalog(tmp_path / "catalog.csv", [",".join(record), ",".join(str(v) for v in record.values())])
+    guide_id = guide_id_for(canonicalizer.canonicalize(PlantInputData(**record)))
+
+    assert main([catalog, "--rate", "0", "--with-decks"]) == 0
+    stored = guide_store.get(guide_id)
+    assert stored is not None
+    assert json.loads(stored.body)["visual_guide"]["status"] != "skipped"
+
+
+def test_warm_run_does_not_mark_decks_done(tmp_path):
+    record = dict(RECORD, plant_name="Pregenerate Sorrel")
+    catalog = write_catalog(tmp_path / "catalog.jsonl", [json.dumps(record)])
+    guide_id = guide_id_for(canonicalizer.canonicalize(PlantInputData(**record)))
+
+    assert main([catalog, "--rate", "0"]) == 0
+    assert guide_store.get(guide_id) is None
+    assert main([catalog, "--rate", "0", "--with-decks"]) == 0
+    assert guide_store.get(guide_id) is not None
+    assert (tmp_path / "catalog.jsonl.decks.done").read_text().split() == [guide_id]
+
+
+def test_degraded_guides_are_not_checkpointed(tmp_path, monkeypatch, capsys):
+    record = dict(RECORD, plant_name="Pregenerate Lovage")
+    catalog = write_catalog(tmp_path / "catalog.jsonl", [json.dumps(record)])
+    guide_id = guide_id_for(canonicalizer.canonicalize(PlantInputData(**record)))
+
+    async def degraded_run(plant_data, **kwargs):
+        body = json.dumps({"metadata": {"fallback_sections": ["daily_care"]}}).encode("utf-8")
+        return guide_store.transient(guide_id, body)
+
+    monkeypatch.setattr(guide_pipeline, "run", degraded_run)
+    assert main([catalog, "--rate", "0"]) == 1
+    assert "Degraded Pregenerate lovage" in capsys.readouterr().err
+    assert (tmp_path / "catalog.jsonl.done").read_text() == ""
@@ -0,0 +1,118 @@
+"""Tests for app.utils.scheduler."""
+
+import asyncio
+
+import pytest
+
+from app.utils.scheduler import (
+    BATCH,
+    INTERACTIVE,
+    PREWARM,
+    PriorityScheduler,
+    current_priority,
+    priority_scope,
+)
+
+
+def test_priority_scope_is_inherited_by_tasks():
+    async def read_priority():
+        return current_priority()
+
+    async def scenario():
+        with priority_scope(BATCH):
+            inner = await asyncio.create_task(read_priority())
+        return inner, current_priority()
+
+    assert asyncio.run(scenario()) == (BATCH, INTERACTIVE)
+
+
+def test_unknown_priority_is_rejected():
+    with pytest.raises(ValueError):
+        with priority_scope("urgent"):
+            pass
+
+
+async def hold(scheduler, priority, order, release):
+    async with scheduler.slot(priority):
+        order.append(priority)
+        await release.wait()
+
+
+def test_waiters_are_granted_highest_class_first():
+    async def scenario():
+        scheduler = PriorityScheduler("test_order", capacity=1, reserved=0, starvation_limit=60)
+        order = []
+        release = asyncio.Event()
+        release.set()
+        gate = asyncio.Event()
+
+        first = asyncio.create_task(hold(scheduler, INTERACTIVE, order, gate))
+        await asyncio.sleep(0)
+        waiters = [
+            asyncio.create_task(hold(scheduler, priority, order, release))
+            for priority in (PREWARM, BATCH, INTERACTIVE)
+        ]
+        await asyncio.sleep(0)
+        assert scheduler.queue_lengths() == {INTERACTIVE: 1, BATCH: 1, PREWARM: 1}
+        gate.set()
+        await asyncio.gather(first, *waiters)
+        return order
+
+    assert asyncio.run(scenario()) == [INTERACTIVE, INTERACTIVE, BATCH, PREWARM]
+
+
+def test_background_work_never_takes_reserved_slots():
+    async def scenario():
+        scheduler = PriorityScheduler("test_reserved", capacity=2, reserved=1, starvation_limit=60)
+        order = []
+        gate = asyncio.Event()
+        tasks = [asyncio.create_task(hold(scheduler, BATCH, order, gate)) for _ in range(2)]
+        await asyncio.sleep(0)
+        assert scheduler.active == 1
+        interactive = asyncio.create_task(hold(scheduler, INTERACTIVE, order, gate))
+        await asyncio.sleep(0)
+        assert scheduler.active == 2
+        gate.set()
+        await asyncio.gather(*tasks, interactive)
+        return order
+
+    assert asyncio.run(scenario()) == [BATCH, INTERACTIVE, BATCH]
+
+
+def test_starving_waiter_jumps_the_queue():
+    async def scenario():
+        scheduler = PriorityScheduler("test_starve", capacity=1, reserved=0, starvation_limit=0.01)
+        order = []
+        release = asyncio.Event()
+        release.set()
+        gate = asyncio.Event()
+
+        first = asyncio.create_task(hold(scheduler, INTERACTIVE, order, gate))
+        await asyncio.sleep(0)
+        prewarm = asyncio.create_task(hold(scheduler, PREWARM, order, release))
+        await asyncio.sleep(0.02)
+        interactive = asyncio.create_task(hold(scheduler, INTERACTIVE, order, release))
+        await asyncio.sleep(0)
+        gate.set()
+        await asyncio.gather(first, prewarm, interactive)
+        return order
+
+    assert asyncio.run(scenario()) == [INTERACTIVE, PREWARM, INTERACTIVE]
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def scenario():
+        scheduler = PriorityScheduler("test_cancel", capacity=1, reserved=0, starvation_limit=60)
+        gate = asyncio.Event()
+        first = asyncio.create_task(hold(scheduler, INTERACTIVE, [], gate))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(hold(scheduler, BATCH, [], gate))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.sleep(0)
+        lengths = scheduler.queue_lengths()
+        gate.set()
+        await first
+        return lengths, scheduler.active
+
+    assert asyncio.run(scenario()) == ({INTERACTIVE: 0, BATCH: 0, PREWARM: 0}, 0)
@@ -0,0 +1,37 @@
+"""Tests for app.services.slide_service and the renderers' file names."""
+
+import os
+
+from app.services.html_service import html_service
+from app.services.slide_service import slide_service
+
+
+def test_deck_is_built_once_per_guide(guide):
+    deck = slide_service.build_deck(guide, "Tomato")
+    assert slide_service.build_deck(guide, "Tomato") is deck
+    assert deck.title == "Tomato Care Guide"
+    assert deck.slides[0].type == "title"
+
+
+def test_slug_is_safe(guide):
+    for name in ["../../escape", "Tomato/..\\x", "Rosé & Co.", "...", "a" * 100]:
+        slug = slide_service.build_deck(guide, name).slug
+        assert set(slug) <= set("abcdefghijklmnopqrstuvwxyz0123456789_"), slug
+        assert len(slug) <= 61
+
+
+def test_slug_depends_on_content(guide):
+    other = guide.model_copy(update={"additional_tips": ["Something else"]})
+    assert slide_service.build_deck(guide, "Tomato").slug != slide_service.build_deck(other, "Tomato").slug
+    assert slide_service.build_deck(guide, "Tomato").slug != slide_service.build_deck(guide, "tomato").slug
+    # Equal content in a different object maps to the same files
+    assert slide_service.build_deck(guide, "Tomato").slug == slide_service.build_deck(guide.model_copy(), "Tomato").slug
+
+
+def test_rendered_file_stays_in_output_dir(guide, tmp_path, monkeypatch):
+    monkeypatch.setattr(html_service, "output_dir", str(tmp_path))
+    response = html_service.render(slide_service.build_deck(guide, "../../escape"))
+    assert response.status == "success"
+    files = os.listdir(tmp_path)
+    assert len(files) == 1 and files[0].startswith("escape_")
+    assert response.file_url == f"/files/{files[0]}"
@@ -0,0 +1,74 @@
+"""Tests for token accounting and usage budgets."""
+
+import pytest
+
+from app.services.usage_ledger import UsageLedger, client_id_for
+from app.utils.token_usage import PRICE_INPUT, TokenUsage, prices_for
+
+
+def metadata(prompt=1_000_000, candidates=0, cached=0):
+    return {
+        "promptTokenCount": prompt,
+        "candidatesTokenCount": candidates,
+        "cachedContentTokenCount": cached,
+    }
+
+
+def test_prices_are_per_model():
+    assert prices_for("gemini-1.5-flash") == (0.075, 0.30, 0.01875)
+    assert prices_for("gemini-1.5-pro-002") == prices_for("gemini-1.5-pro")
+    assert prices_for("gemini-1.5-flash-8b-001") == prices_for("gemini-1.5-flash-8b")
+    assert prices_for("some-unknown-model")[0] == PRICE_INPUT
+
+
+def test_calls_are_priced_at_their_model():
+    usage = TokenUsage()
+    flash = usage.add_metadata(metadata(), "gemini-1.5-flash")
+    pro = usage.add_metadata(metadata(), "gemini-1.5-pro")
+
+    assert flash.cost == pytest.approx(0.075)
+    assert pro.cost == pytest.approx(1.25)
+    assert usage.cost == pytest.approx(1.325)
+    assert usage.calls == 2
+    assert usage.as_dict()["cost_usd"] == pytest.approx(1.325)
+
+
+def test_cached_and_output_tokens():
+    call = TokenUsage().add_metadata(
+        dict(metadata(prompt=1_000_000, candidates=1_000_000, cached=400_000), thoughtsTokenCount=1_000_000),
+        "gemini-1.5-flash"
+    )
+    assert call.candidate_tokens == 2_000_000
+    assert call.cost == pytest.approx(0.6 * 0.075 + 0.4 * 0.01875 + 2 * 0.30)
+
+
+def test_client_header_is_ignored_unless_trusted():
+    assert client_id_for("rotating-id", "10.0.0.1") == "addr:10.0.0.1"
+    assert client_id_for("team-a", "10.0.0.1", trust_header=True) == "id:team-a"
+    assert client_id_for(None, "10.0.0.1", trust_header=True) == "addr:10.0.0.1"
+    assert client_id_for("10.0.0.1", None, trust_header=True) != client_id_for(None, "10.0.0.1")
+    assert client_id_for(None, None) is None
+
+
+def test_budgets():
+    ledger = UsageLedger(window=3600, client_budget=1.0, plant_budget=2.0)
+    expensive = TokenUsage()
+    expensive.add_metadata(metadata(), "gemini-1.5-pro")
+
+    assert ledger.over_budget("addr:a", "Tomato") is None
+    ledger.record("addr:a", "Tomato", expensive)
+    assert ledger.over_budget("addr:a", "Basil") == "client"
+    assert ledger.over_budget("addr:b", "Tomato") is None
+    ledger.record("addr:b", "Tomato", expensive)
+    assert ledger.over_budget("addr:c", "Tomato") == "plant"
+    # Internal work has no client budget
+    assert ledger.over_budget(None, "Basil") is None
+    assert list(ledger.snapshot()["clients"]) == ["addr:a", "addr:b"]
+
+
+def test_budget_window_resets():
+    ledger = UsageLedger(window=0, client_budget=0.01)
+    usage = TokenUsage()
+    usage.add_metadata(metadata(), "gemini-1.5-flash")
+    ledger.record("addr:a", "Tomato", usage)
+    assert ledger.over_budget("addr:a", "Tomato") is None